@@ -34,6 +34,10 @@ from app.models.payment_event import PaymentEvent
 from app.models.user import User
 from app.models.end_user import EndUser
 from app.models.trip_image import TripImage
+from app.models.trip_inventory import TripInventory
+from app.models.trip_card import TripCard
+from app.models.trip_change import TripChangePurge, TripChangeRecord
+from app.models.idempotency_key import IdempotencyKey
 
 target_metadata = Base.metadata
 
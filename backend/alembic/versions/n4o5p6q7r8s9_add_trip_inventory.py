@@ -0,0 +1,45 @@
+"""add trip inventory counters
+
+Revision ID: n4o5p6q7r8s9
+Revises: m3n4o5p6q7r8
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "n4o5p6q7r8s9"
+down_revision = "m3n4o5p6q7r8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "trip_inventory",
+        sa.Column("trip_id", sa.String(), nullable=False),
+        sa.Column("held_seats", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.CheckConstraint("held_seats >= 0", name="ck_trip_inventory_held_seats_non_negative"),
+        sa.ForeignKeyConstraint(["trip_id"], ["trips.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("trip_id"),
+    )
+
+    # Backfill counters from the bookings that currently hold inventory.
+    op.execute(
+        """
+        INSERT INTO trip_inventory (trip_id, held_seats)
+        SELECT t.id, COALESCE(SUM(b.seats_booked), 0)
+        FROM trips t
+        LEFT JOIN bookings b
+            ON b.trip_id = t.id
+           AND b.status IN ('PAYMENT_PENDING', 'CONFIRMED')
+        GROUP BY t.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("trip_inventory")
@@ -0,0 +1,101 @@
+"""add weighted full-text and trigram search on trips
+
+Revision ID: o5p6q7r8s9t0
+Revises: n4o5p6q7r8s9
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "o5p6q7r8s9t0"
+down_revision = "n4o5p6q7r8s9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.add_column("trips", sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True))
+
+    # Title/destination weigh most, then tags, description and itinerary text.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION trips_search_vector_refresh() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(NEW.destination, '')), 'A') ||
+                setweight(
+                    to_tsvector('english', replace(coalesce(array_to_string(NEW.tags, ' '), ''), '_', ' ')),
+                    'B'
+                ) ||
+                setweight(to_tsvector('english', coalesce(NEW.description, '')), 'C') ||
+                setweight(
+                    to_tsvector(
+                        'english',
+                        coalesce(
+                            (
+                                SELECT string_agg(concat_ws(' ', item ->> 'title', item ->> 'description'), ' ')
+                                FROM jsonb_array_elements(
+                                    CASE
+                                        WHEN jsonb_typeof(NEW.itinerary) = 'array' THEN NEW.itinerary
+                                        ELSE '[]'::jsonb
+                                    END
+                                ) AS item
+                            ),
+                            ''
+                        )
+                    ),
+                    'D'
+                );
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trips_search_vector_refresh
+        BEFORE INSERT OR UPDATE OF title, destination, description, tags, itinerary
+        ON trips
+        FOR EACH ROW EXECUTE FUNCTION trips_search_vector_refresh()
+        """
+    )
+
+    # Backfill existing rows through the trigger.
+    op.execute("UPDATE trips SET title = title")
+
+    op.create_index(
+        "ix_trips_search_vector",
+        "trips",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_trips_title_trgm",
+        "trips",
+        ["title"],
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_trips_destination_trgm",
+        "trips",
+        ["destination"],
+        postgresql_using="gin",
+        postgresql_ops={"destination": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_trips_destination_trgm", table_name="trips")
+    op.drop_index("ix_trips_title_trgm", table_name="trips")
+    op.drop_index("ix_trips_search_vector", table_name="trips")
+    op.execute("DROP TRIGGER IF EXISTS trips_search_vector_refresh ON trips")
+    op.execute("DROP FUNCTION IF EXISTS trips_search_vector_refresh()")
+    op.drop_column("trips", "search_vector")
@@ -0,0 +1,24 @@
+"""add keyset pagination index on trips
+
+Revision ID: p6q7r8s9t0u1
+Revises: o5p6q7r8s9t0
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "p6q7r8s9t0u1"
+down_revision = "o5p6q7r8s9t0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Serves ORDER BY start_date, id and the (start_date, id) > cursor predicate.
+    op.create_index("ix_trips_start_date_id", "trips", ["start_date", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_trips_start_date_id", table_name="trips")
@@ -0,0 +1,54 @@
+"""add partial and GIN indexes for public trip discovery
+
+Revision ID: q7r8s9t0u1v2
+Revises: p6q7r8s9t0u1
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "q7r8s9t0u1v2"
+down_revision = "p6q7r8s9t0u1"
+branch_labels = None
+depends_on = None
+
+
+# Must match the public query predicates (Trip.is_active.is_(True),
+# Trip.status == PUBLISHED) so the planner can prove the index applies.
+# `start_date >= today` cannot be part of a partial index predicate
+# (it is not immutable); the range scan on start_date covers it instead.
+PUBLISHED_ACTIVE = sa.text("is_active IS true AND status = 'PUBLISHED'")
+
+
+def upgrade() -> None:
+    # Listing/search/weekend: ORDER BY start_date, id with the keyset cursor.
+    # Replaces the full-table ix_trips_start_date_id for public queries.
+    op.create_index(
+        "ix_trips_published_start_date_id",
+        "trips",
+        ["start_date", "id"],
+        postgresql_where=PUBLISHED_ACTIVE,
+    )
+    op.drop_index("ix_trips_start_date_id", table_name="trips")
+
+    # tags @> ARRAY[...] / tags && ARRAY[...]
+    op.create_index(
+        "ix_trips_published_tags",
+        "trips",
+        ["tags"],
+        postgresql_using="gin",
+        postgresql_where=PUBLISHED_ACTIVE,
+    )
+
+    # get_trip_by_slug filters on slug alone; uq_trip_slug leads with organizer_id.
+    op.create_index("ix_trips_slug", "trips", ["slug"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_trips_slug", table_name="trips")
+    op.drop_index("ix_trips_published_tags", table_name="trips")
+    op.create_index("ix_trips_start_date_id", "trips", ["start_date", "id"])
+    op.drop_index("ix_trips_published_start_date_id", table_name="trips")
@@ -0,0 +1,92 @@
+"""add trip_cards listing projection
+
+Revision ID: r8s9t0u1v2w3
+Revises: q7r8s9t0u1v2
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "r8s9t0u1v2w3"
+down_revision = "q7r8s9t0u1v2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "trip_cards",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("organizer_id", sa.String(), nullable=False),
+        sa.Column("slug", sa.String(), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("destination", sa.String(), nullable=False),
+        sa.Column("price", sa.Integer(), nullable=False),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=False),
+        sa.Column("duration_days", sa.Integer(), nullable=False),
+        sa.Column("tags", postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column("cover_image_url", sa.String(), nullable=True),
+        sa.Column("total_seats", sa.Integer(), nullable=False),
+        sa.Column("seats_available", sa.Integer(), nullable=False),
+        sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["id"], ["trips.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    # Every card is published and active, so plain indexes serve the public queries.
+    op.create_index("ix_trip_cards_start_date_id", "trip_cards", ["start_date", "id"])
+    op.create_index("ix_trip_cards_tags", "trip_cards", ["tags"], postgresql_using="gin")
+    op.create_index("ix_trip_cards_search_vector", "trip_cards", ["search_vector"], postgresql_using="gin")
+    op.create_index(
+        "ix_trip_cards_title_trgm",
+        "trip_cards",
+        ["title"],
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_trip_cards_destination_trgm",
+        "trip_cards",
+        ["destination"],
+        postgresql_using="gin",
+        postgresql_ops={"destination": "gin_trgm_ops"},
+    )
+
+    # Backfill from published, active trips (same projection as app.crud.trip_card).
+    op.execute(
+        """
+        INSERT INTO trip_cards (
+            id, organizer_id, slug, title, destination, price, start_date, end_date,
+            duration_days, tags, cover_image_url, total_seats, seats_available, search_vector
+        )
+        SELECT
+            t.id, t.organizer_id, t.slug, t.title, t.destination, t.price, t.start_date, t.end_date,
+            t.end_date - t.start_date + 1,
+            t.tags,
+            COALESCE(
+                (SELECT i.image_url FROM trip_images i WHERE i.trip_id = t.id ORDER BY i.position LIMIT 1),
+                t.cover_image_url
+            ),
+            t.total_seats,
+            GREATEST(t.total_seats - COALESCE(inv.held_seats, 0), 0),
+            t.search_vector
+        FROM trips t
+        LEFT JOIN trip_inventory inv ON inv.trip_id = t.id
+        WHERE t.is_active IS true AND t.status = 'PUBLISHED'
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_trip_cards_destination_trgm", table_name="trip_cards")
+    op.drop_index("ix_trip_cards_title_trgm", table_name="trip_cards")
+    op.drop_index("ix_trip_cards_search_vector", table_name="trip_cards")
+    op.drop_index("ix_trip_cards_tags", table_name="trip_cards")
+    op.drop_index("ix_trip_cards_start_date_id", table_name="trip_cards")
+    op.drop_table("trip_cards")
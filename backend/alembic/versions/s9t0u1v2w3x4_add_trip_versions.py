@@ -0,0 +1,26 @@
+"""add trip version counters for conditional GET
+
+Revision ID: s9t0u1v2w3x4
+Revises: r8s9t0u1v2w3
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "s9t0u1v2w3x4"
+down_revision = "r8s9t0u1v2w3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("trips", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+    op.add_column("trip_cards", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    op.drop_column("trip_cards", "version")
+    op.drop_column("trips", "version")
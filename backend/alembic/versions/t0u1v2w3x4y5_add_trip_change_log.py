@@ -0,0 +1,66 @@
+"""add trips.updated_at, the trip_changes log and its purge watermark
+
+Revision ID: t0u1v2w3x4y5
+Revises: s9t0u1v2w3x4
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "t0u1v2w3x4y5"
+down_revision = "s9t0u1v2w3x4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("trips", sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE trips SET updated_at = COALESCE(created_at, now())")
+    op.alter_column(
+        "trips",
+        "updated_at",
+        nullable=False,
+        server_default=sa.text("now()"),
+    )
+
+    # Readers page on (txid, id), the writing transaction then the row,
+    # up to the oldest running transaction; retention deletes by changed_at.
+    op.create_table(
+        "trip_changes",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "txid",
+            sa.BigInteger(),
+            nullable=False,
+            server_default=sa.text("(pg_current_xact_id()::text)::bigint"),
+        ),
+        sa.Column("trip_id", sa.String(), nullable=False),
+        sa.Column("kind", sa.String(length=16), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=True),
+        sa.Column("version", sa.Integer(), nullable=True),
+        sa.Column("seats_available", sa.Integer(), nullable=True),
+        sa.Column("changed_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+    )
+    op.create_index("ix_trip_changes_changed_at", "trip_changes", ["changed_at"])
+    op.create_index("ix_trip_changes_txid_id", "trip_changes", ["txid", "id"])
+
+    # Feed position of each purged batch; readers take the latest row
+    # (highest id).
+    op.create_table(
+        "trip_change_purges",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("txid", sa.BigInteger(), nullable=False),
+        sa.Column("change_id", sa.BigInteger(), nullable=False),
+        sa.Column("purged_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("trip_change_purges")
+    op.drop_index("ix_trip_changes_txid_id", table_name="trip_changes")
+    op.drop_index("ix_trip_changes_changed_at", table_name="trip_changes")
+    op.drop_table("trip_changes")
+    op.drop_column("trips", "updated_at")
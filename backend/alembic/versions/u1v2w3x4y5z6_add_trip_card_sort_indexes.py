@@ -0,0 +1,36 @@
+"""add trip_cards indexes for listing sort orders
+
+Revision ID: u1v2w3x4y5z6
+Revises: t0u1v2w3x4y5
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "u1v2w3x4y5z6"
+down_revision = "t0u1v2w3x4y5"
+branch_labels = None
+depends_on = None
+
+
+# One index per keyset sort (ORDER BY <column>, start_date, id); price_desc
+# scans ix_trip_cards_price_start_date_id backwards. start_date keeps using
+# ix_trip_cards_start_date_id, and relevance is a computed score ordered
+# after filtering.
+SORT_INDEXES = {
+    "ix_trip_cards_price_start_date_id": ["price", "start_date", "id"],
+    "ix_trip_cards_duration_start_date_id": ["duration_days", "start_date", "id"],
+    "ix_trip_cards_seats_start_date_id": ["seats_available", "start_date", "id"],
+}
+
+
+def upgrade() -> None:
+    for name, columns in SORT_INDEXES.items():
+        op.create_index(name, "trip_cards", columns)
+
+
+def downgrade() -> None:
+    for name in reversed(list(SORT_INDEXES)):
+        op.drop_index(name, table_name="trip_cards")
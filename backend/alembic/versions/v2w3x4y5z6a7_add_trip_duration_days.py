@@ -0,0 +1,35 @@
+"""add stored generated trips.duration_days
+
+Revision ID: v2w3x4y5z6a7
+Revises: u1v2w3x4y5z6
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "v2w3x4y5z6a7"
+down_revision = "u1v2w3x4y5z6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Adding a stored generated column rewrites trips once.
+    op.add_column(
+        "trips",
+        sa.Column(
+            "duration_days",
+            sa.Integer(),
+            sa.Computed("end_date - start_date + 1", persisted=True),
+        ),
+    )
+    # Public duration filters and sorting read the copy in trip_cards,
+    # through ix_trip_cards_duration_start_date_id (u1v2w3x4y5z6), so trips
+    # itself gets no index on it.
+
+
+def downgrade() -> None:
+    op.drop_column("trips", "duration_days")
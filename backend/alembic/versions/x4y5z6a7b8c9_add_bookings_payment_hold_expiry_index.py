@@ -0,0 +1,31 @@
+"""add partial index for expiring payment holds
+
+Revision ID: x4y5z6a7b8c9
+Revises: w3x4y5z6a7b8
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "x4y5z6a7b8c9"
+down_revision = "w3x4y5z6a7b8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The expiry worker scans open holds by expires_at; only PAYMENT_PENDING
+    # rows are indexed, so the index stays as small as the set of open holds.
+    op.create_index(
+        "ix_bookings_payment_pending_expires_at",
+        "bookings",
+        ["expires_at"],
+        postgresql_where=sa.text("status = 'PAYMENT_PENDING'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bookings_payment_pending_expires_at", table_name="bookings")
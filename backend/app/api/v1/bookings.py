@@ -1,11 +1,12 @@
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, conint
-from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.core.auth import get_current_end_user, require_organizer
+from app.crud.availability import reserve_seats
 from app.db.deps import get_db
 from app.models.booking import Booking, BookingStatus
 from app.models.end_user import EndUser
@@ -19,6 +20,7 @@ from app.schemas.booking import (
 )
 from app.schemas.payment import PaymentOrderInfo, PaymentResponse
 from app.services.booking_service import BookingService
+from app.services.idempotency import idempotency_key_header, run_idempotent
 from app.services.payment_service import PaymentService
 
 router = APIRouter()
@@ -34,7 +36,25 @@ def create_booking(
     db: Session = Depends(get_db),
     current_user: EndUser = Depends(get_current_end_user),
     provider: PaymentProvider = Depends(get_payment_provider),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header),
 ):
+    return run_idempotent(
+        db,
+        key=idempotency_key,
+        user_id=current_user.id,
+        scope="POST /bookings",
+        request=payload,
+        handler=lambda: _create_booking(db, payload, current_user, provider),
+        status_code=status.HTTP_201_CREATED,
+    )
+
+
+def _create_booking(
+    db: Session,
+    payload: BookingCreateRequest,
+    current_user: EndUser,
+    provider: PaymentProvider,
+) -> BookingWithPaymentOrderResponse:
     booking_service = BookingService(db)
     payment_service = PaymentService(db, provider)
 
@@ -96,32 +116,14 @@ def add_offline_booking(
 ):
     now = datetime.now(timezone.utc)
 
-    trip = db.query(Trip).filter(Trip.id == trip_id).with_for_update().first()
+    trip = db.query(Trip).filter(Trip.id == trip_id).first()
     if not trip:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
     if trip.organizer_id != organizer_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
 
-    db.query(Booking).filter(
-        Booking.trip_id == trip_id,
-        Booking.status == BookingStatus.PAYMENT_PENDING,
-        Booking.expires_at.is_not(None),
-        Booking.expires_at < now,
-    ).update(
-        {Booking.status: BookingStatus.EXPIRED},
-        synchronize_session=False,
-    )
-
-    booked = (
-        db.query(func.coalesce(func.sum(Booking.seats_booked), 0))
-        .filter(
-            Booking.trip_id == trip_id,
-            Booking.status.in_([BookingStatus.PAYMENT_PENDING, BookingStatus.CONFIRMED]),
-        )
-        .scalar()
-    )
-    available = trip.total_seats - int(booked or 0)
-    if payload.seats > available:
+    if not reserve_seats(db, trip_id, payload.seats):
+        db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Not enough seats")
 
     booking = Booking(
@@ -0,0 +1,66 @@
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.orm import Session
+from typing import List, NamedTuple
+
+from app.core.config import settings
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.responses import PreSerializedJSONResponse
+from app.db.deps import get_db
+from app.schemas.trip import HOME_FEED_ADAPTER, HomeFeedResponse, map_trip_card_responses
+from app.services.discovery_cache import discovery_cache, discovery_cache_key
+from app.services.home_feed import load_home_feed
+
+router = APIRouter()
+
+
+class HomeFeedPage(NamedTuple):
+    body: bytes  # HomeFeedResponse JSON
+    trip_ids: List[str]
+    etag: str
+
+
+def _home_feed_trip_ids(page: HomeFeedPage) -> List[str]:
+    return page.trip_ids
+
+
+@router.get("", response_model=HomeFeedResponse)
+def get_home_feed_api(
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    """
+    Every homepage section (weekend, upcoming, curated tags, budget) in one
+    response. Sections list trip ids in display order; each trip appears
+    once in `trips`, however many sections show it. Cached for
+    HOME_FEED_CACHE_TTL_SECONDS and dropped early when a listed trip changes.
+    """
+    def load() -> HomeFeedPage:
+        feed = load_home_feed(db)
+        response = HOME_FEED_ADAPTER.validate_python(
+            {
+                "sections": [
+                    {"id": section.id, "title": section.title, "trip_ids": trip_ids}
+                    for section, trip_ids in feed.sections
+                ],
+                "trips": map_trip_card_responses(feed.cards),
+            }
+        )
+        return HomeFeedPage(
+            body=HOME_FEED_ADAPTER.dump_json(response),
+            trip_ids=[card.id for card in feed.cards],
+            etag=make_etag(
+                "home-feed",
+                *(f"{section.id}:{','.join(trip_ids)}" for section, trip_ids in feed.sections),
+                *(f"{card.id}:{card.version}:{card.seats_available}" for card in feed.cards),
+            ),
+        )
+
+    page = discovery_cache.get_or_load(
+        discovery_cache_key("home-feed"),
+        load,
+        trip_ids_of=_home_feed_trip_ids,
+        ttl_seconds=settings.HOME_FEED_CACHE_TTL_SECONDS,
+    )
+    if etag_matches(request.headers.get("if-none-match"), page.etag):
+        return not_modified(page.etag)
+    return PreSerializedJSONResponse(page.body, headers={"ETag": page.etag})
@@ -22,6 +22,7 @@ from app.schemas.payment import (
     PaymentVerifyRequest,
     WebhookAckResponse,
 )
+from app.services.idempotency import idempotency_key_header, run_idempotent
 from app.services.payment_service import PaymentService
 
 router = APIRouter()
@@ -113,7 +114,24 @@ def create_payment(
     db: Session = Depends(get_db),
     current_user: EndUser = Depends(get_current_end_user),
     provider: PaymentProvider = Depends(get_payment_provider),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header),
 ):
+    return run_idempotent(
+        db,
+        key=idempotency_key,
+        user_id=current_user.id,
+        scope="POST /payments",
+        request=payload,
+        handler=lambda: _create_payment(db, payload, current_user, provider),
+    )
+
+
+def _create_payment(
+    db: Session,
+    payload: PaymentCreateRequest,
+    current_user: EndUser,
+    provider: PaymentProvider,
+) -> PaymentCreateResponse:
     service = PaymentService(db, provider)
     payment, order = service.create_payment(
         booking_id=payload.booking_id,
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 
 from app.db.deps import get_db
 from app.core.auth import require_organizer
+from app.core.etag import etag_matches, make_etag, not_modified
 from app.core.storage import get_storage_backend
 from app.schemas.trip_image import (
     TripImageResponse,
@@ -20,7 +21,7 @@ from app.crud.trip_image import (
     verify_trip_draft_status,
     get_trip_image_by_id,
 )
-from app.crud.trip import get_trip_by_id
+from app.crud.trip import get_trip_version
 from app.models.trip import TripStatus
 
 router = APIRouter()
@@ -137,19 +138,26 @@ async def upload_trip_image(
 )
 def get_trip_images_api(
     trip_id: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
 ):
     """
     Get all images for a trip (public endpoint).
     Returns images ordered by position.
+    Image changes bump the trip version, which is used as the ETag.
     """
     # Verify trip exists (but don't require auth)
-    trip = get_trip_by_id(db, trip_id)
-    if not trip:
+    version = get_trip_version(db, trip_id)
+    if version is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Trip not found",
         )
+    etag = make_etag("trip-images", trip_id, version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     
     images = get_trip_images(db, trip_id)
     return TripImageListResponse(
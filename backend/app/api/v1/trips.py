@@ -1,35 +1,80 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.crud.trip import list_trips_filtered
+from typing import Callable, List, NamedTuple, Optional
 from datetime import date, datetime, timedelta, timezone
 from pydantic import BaseModel, conint, EmailStr, Field
 
 from app.db.deps import get_db
-from app.schemas.trip import TripCreate, TripResponse
+from app.schemas.trip import (
+    TRIP_LIST_ADAPTER,
+    TRIP_RESPONSE_ADAPTER,
+    TRIP_SUGGESTION_LIST_ADAPTER,
+    TripCalendarResponse,
+    TripChangesResponse,
+    TripCreate,
+    TripFacetsResponse,
+    TripResponse,
+    TripSuggestion,
+    map_trip_card_responses,
+)
 from app.crud.trip import (
     create_trip,
     get_trip_by_slug,
-    get_trip_by_id,
-    list_trips,
     soft_delete_trip,
     publish_trip,
     archive_trip,
     unarchive_trip,
-    get_weekend_getaways,
-    search_trips,
+    get_public_trip_version,
+    build_weekend_getaways_query,
+    build_trips_filtered_query,
+    build_search_trips_query,
+    fetch_trip_page,
+    trips_filtered_relevance,
+    TripPage,
 )
 from app.crud.availability import get_available_seats
+from app.crud.booking import BookingRequestOutcome, create_booking_request as insert_booking_request
 from app.core.auth import get_current_end_user, require_organizer
-from app.models.booking import Booking, BookingStatus
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.responses import PreSerializedJSONResponse
 from app.models.end_user import EndUser
-from app.models.organizer import Organizer
-from app.models.trip import Trip, TripStatus
+from app.models.trip import TripStatus
+from app.models.trip_card import TripCard
+from app.crud.trip_calendar import get_trip_calendar
+from app.crud.trip_card import get_trip_cards
+from app.crud.trip_change_log import (
+    ChangeCursorExpired,
+    decode_change_cursor,
+    encode_change_cursor,
+    get_trip_changes,
+)
 from app.crud.trip_image import get_trip_images
+from app.crud.trip_facets import get_trip_facets
+from app.crud.trip_search import TagMode, TripSort
+from app.services.discovery_cache import (
+    discovery_cache,
+    discovery_cache_key,
+    seconds_until_tomorrow,
+)
+from app.services.idempotency import idempotency_key_header, run_idempotent
+from app.services.similar_trips import similar_trips_index
+from app.services.trip_admission import admit_booking
+from app.services.trip_export import MEDIA_TYPES, ExportFormat, stream_trip_export
+from app.services.trip_suggestions import MAX_SUGGESTIONS, trip_suggestions
 
 router = APIRouter()
 
+# Upper bound for the weekend feed prefetch window.
+MAX_WEEKENDS_AHEAD = 8
+_SORT_DESCRIPTION = (
+    "start_date, price_asc, price_desc, duration (shortest first), "
+    "seats_left (fewest free seats first) or relevance."
+)
+# Sorts whose order moves with seat inventory (relevance includes fill rate).
+_SEAT_ORDERED_SORTS = (TripSort.SEATS_LEFT, TripSort.RELEVANCE)
+MAX_SIMILAR_TRIPS = 24
+
 @router.post(
     "",
     response_model=TripResponse,
@@ -47,33 +92,70 @@ def create_trip_api(trip: TripCreate, db: Session = Depends(get_db)):
 
 @router.get("", response_model=List[TripResponse])
 def list_trips_api(
+    request: Request,
     db: Session = Depends(get_db),
     destination: Optional[str] = Query(None),
     min_price: Optional[int] = Query(None, ge=0),
     max_price: Optional[int] = Query(None, ge=0),
     start_date: Optional[date] = Query(None),
     tag: Optional[List[str]] = Query(None),
+    tag_mode: TagMode = Query(TagMode.ANY, description="any: at least one tag; all: every tag"),
+    sort: TripSort = Query(TripSort.START_DATE, description=_SORT_DESCRIPTION),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor; replaces offset"),
 ):
-    trips = list_trips_filtered(
-        db,
-        destination=destination,
-        min_price=min_price,
-        max_price=max_price,
-        start_date=start_date,
-        tags=tag,
-        limit=limit,
-        offset=offset,
-    )
+    """
+    List published upcoming trips, ordered by start date unless `sort` says otherwise.
+    Pagination: pass the X-Next-Cursor header of the previous page as `cursor`
+    for stable keyset paging (same `sort`); offset paging is kept for older
+    clients and is the only paging for sort=relevance.
+    """
+    def fetch(*columns) -> TripPage:
+        query = build_trips_filtered_query(
+            db,
+            destination=destination,
+            min_price=min_price,
+            max_price=max_price,
+            start_date=start_date,
+            tags=tag,
+            tag_mode=tag_mode,
+        )
+        return _fetch_listing_page(
+            query,
+            columns,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            sort=sort,
+            relevance=trips_filtered_relevance(start_date),
+        )
 
-    return [map_trip_response(db, trip) for trip in trips]
+    return _serve_listing(
+        request,
+        fetch,
+        cache_key=discovery_cache_key(
+            "trips",
+            destination=destination,
+            min_price=min_price,
+            max_price=max_price,
+            start_date=start_date,
+            tag=tag,
+            tag_mode=tag_mode,
+            sort=sort,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        ),
+        seat_sensitive=sort in _SEAT_ORDERED_SORTS,
+    )
 
 
 @router.get("/search", response_model=List[TripResponse])
 def search_trips_api(
+    request: Request,
     db: Session = Depends(get_db),
-    q: Optional[str] = Query(None, description="Search query matching title or destination"),
+    q: Optional[str] = Query(None, description="Full-text query over title, destination, tags, description and itinerary"),
     start_date: Optional[date] = Query(None, description="Exact minimum start date"),
     end_date: Optional[date] = Query(None, description="Exact maximum end date"),
     range_start: Optional[date] = Query(None, description="Flexible range start date"),
@@ -84,8 +166,12 @@ def search_trips_api(
     max_price: Optional[int] = Query(None, ge=0, description="Maximum price"),
     min_days: Optional[int] = Query(None, ge=1, description="Minimum trip duration in days"),
     max_days: Optional[int] = Query(None, ge=1, description="Maximum trip duration in days"),
+    tag: Optional[List[str]] = Query(None, description="Trip tags to filter by"),
+    tag_mode: TagMode = Query(TagMode.ANY, description="any: at least one tag; all: every tag"),
+    sort: Optional[TripSort] = Query(None, description=_SORT_DESCRIPTION + " Default: relevance with q, else start_date."),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor; replaces offset"),
 ):
     """
     Optimized trip search endpoint with structured filters.
@@ -99,11 +185,77 @@ def search_trips_api(
     
     Duration filtering: min_days/max_days (calculated as end_date - start_date + 1)
     
+    Tag filtering: tag (repeatable) with tag_mode=any (default) or all
+    
+    Sort: start_date, price_asc, price_desc, duration, seats_left or
+    relevance. Relevance is scored in SQL from the text rank of q, closeness
+    of the start date to the requested dates and the fill rate. Defaults to
+    relevance when q is given, start_date otherwise.
+    
+    Pagination: X-Has-More is always set. X-Next-Cursor can be passed back
+    as `cursor` with the same sort; relevance-sorted results page with offset.
+    
     Future-proofing: Structure allows vector search to be added later
     without breaking this API.
     """
-    trips = search_trips(
-        db,
+    filters = dict(
+        q=q,
+        start_date=start_date,
+        end_date=end_date,
+        range_start=range_start,
+        range_end=range_end,
+        month=month,
+        people=people,
+        min_price=min_price,
+        max_price=max_price,
+        min_days=min_days,
+        max_days=max_days,
+        tags=tag,
+        tag_mode=tag_mode,
+    )
+
+    if sort is None:
+        sort = TripSort.RELEVANCE if q and q.strip() else TripSort.START_DATE
+
+    def fetch(*columns) -> TripPage:
+        query, relevance = build_search_trips_query(db, **filters)
+        return _fetch_listing_page(
+            query, columns, limit=limit, offset=offset, cursor=cursor, sort=sort, relevance=relevance
+        )
+
+    return _serve_listing(
+        request,
+        fetch,
+        cache_key=discovery_cache_key(
+            "trips/search", sort=sort, limit=limit, offset=offset, cursor=cursor, **filters
+        ),
+        seat_sensitive=people is not None or sort in _SEAT_ORDERED_SORTS,
+    )
+
+
+@router.get("/search/facets", response_model=TripFacetsResponse)
+def search_trip_facets_api(
+    db: Session = Depends(get_db),
+    q: Optional[str] = Query(None, description="Full-text query over title, destination, tags, description and itinerary"),
+    start_date: Optional[date] = Query(None, description="Exact minimum start date"),
+    end_date: Optional[date] = Query(None, description="Exact maximum end date"),
+    range_start: Optional[date] = Query(None, description="Flexible range start date"),
+    range_end: Optional[date] = Query(None, description="Flexible range end date"),
+    month: Optional[str] = Query(None, description="Month filter in YYYY-MM format"),
+    people: Optional[int] = Query(None, ge=1, description="Minimum number of available seats"),
+    min_price: Optional[int] = Query(None, ge=0, description="Minimum price"),
+    max_price: Optional[int] = Query(None, ge=0, description="Maximum price"),
+    min_days: Optional[int] = Query(None, ge=1, description="Minimum trip duration in days"),
+    max_days: Optional[int] = Query(None, ge=1, description="Maximum trip duration in days"),
+    tag: Optional[List[str]] = Query(None, description="Trip tags to filter by"),
+    tag_mode: TagMode = Query(TagMode.ANY, description="any: at least one tag; all: every tag"),
+):
+    """
+    Facet counts for the search sidebar.
+    Takes the same filters as /trips/search and returns how many matching trips
+    fall under each tag, price bucket, duration bucket and start month.
+    """
+    filters = dict(
         q=q,
         start_date=start_date,
         end_date=end_date,
@@ -115,33 +267,325 @@ def search_trips_api(
         max_price=max_price,
         min_days=min_days,
         max_days=max_days,
-        limit=limit,
-        offset=offset,
+        tags=tag,
+        tag_mode=tag_mode,
     )
 
-    return [map_trip_response(db, trip) for trip in trips]
+    def load() -> dict:
+        query, _ = build_search_trips_query(db, **filters)
+        return get_trip_facets(db, query)
+
+    return discovery_cache.get_or_load(
+        discovery_cache_key("trips/search/facets", **filters),
+        load,
+        seat_sensitive=people is not None,
+        aggregate=True,
+    )
+
+
+class ListingPage(NamedTuple):
+    body: bytes  # JSON array of TripResponse
+    trip_ids: List[str]
+    next_cursor: Optional[str]
+    has_more: bool
+    etag: str
+
+
+# Card columns that identify a listing entry's content (trips.version covers
+# the trip and its images, seats_available the inventory).
+# The remaining columns build the page's next cursor under every sort.
+_CARD_VERSION_COLUMNS = (
+    TripCard.id,
+    TripCard.version,
+    TripCard.seats_available,
+    TripCard.start_date,
+    TripCard.price,
+    TripCard.duration_days,
+)
+
+
+def _listing_etag(cards, has_more: bool) -> str:
+    return make_etag(
+        "listing",
+        has_more,
+        *(f"{card.id}:{card.version}:{card.seats_available}" for card in cards),
+    )
+
+
+def _fetch_listing_page(
+    query,
+    columns,
+    *,
+    limit: int,
+    offset: int,
+    cursor: Optional[str],
+    sort: TripSort = TripSort.START_DATE,
+    relevance=None,
+) -> TripPage:
+    if columns:
+        query = query.with_entities(*columns)
+    try:
+        return fetch_trip_page(
+            query, limit=limit, offset=offset, cursor=cursor, sort=sort, relevance=relevance
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+
+def _serve_listing(
+    request: Request,
+    fetch: Callable[..., TripPage],
+    *,
+    cache_key,
+    seat_sensitive: bool = False,
+    ttl_seconds: Optional[float] = None,
+):
+    """
+    Serve a cached listing page with a strong ETag.
+    `fetch(*columns)` runs the listing query, optionally restricted to columns.
+    With If-None-Match, a version-only query over the same page answers 304
+    without loading or serializing cards. Pages are cached already serialized,
+    so a cache hit sends stored bytes.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        versions = fetch(*_CARD_VERSION_COLUMNS)
+        etag = _listing_etag(versions.items, versions.has_more)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    def load() -> ListingPage:
+        page = fetch()
+        trips = TRIP_LIST_ADAPTER.validate_python(map_trip_card_responses(page.items))
+        return ListingPage(
+            body=TRIP_LIST_ADAPTER.dump_json(trips),
+            trip_ids=[card.id for card in page.items],
+            next_cursor=page.next_cursor,
+            has_more=page.has_more,
+            etag=_listing_etag(page.items, page.has_more),
+        )
+
+    page = discovery_cache.get_or_load(
+        cache_key,
+        load,
+        trip_ids_of=_listing_trip_ids,
+        seat_sensitive=seat_sensitive,
+        ttl_seconds=ttl_seconds,
+    )
+    return PreSerializedJSONResponse(page.body, headers=_listing_headers(page))
+
+
+def _listing_trip_ids(page: ListingPage) -> List[str]:
+    return page.trip_ids
+
+
+def _listing_headers(page: ListingPage) -> dict:
+    headers = {
+        "ETag": page.etag,
+        "X-Has-More": "true" if page.has_more else "false",
+    }
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    return headers
 
 
 @router.get("/weekend-getaways", response_model=List[TripResponse])
 def get_weekend_getaways_api(
+    request: Request,
+    weekends_ahead: int = Query(1, ge=1, le=MAX_WEEKENDS_AHEAD),
     db: Session = Depends(get_db),
 ):
     """
-    Get weekend getaways for the next upcoming weekend.
+    Get weekend getaways for the next upcoming weekend(s).
     Returns PUBLISHED trips that start on Friday/Saturday and end on Sunday/Monday,
-    with duration <= 4 days, occurring in the next upcoming weekend only.
+    with duration <= 4 days, occurring in the next `weekends_ahead` weekends
+    (default: the next upcoming weekend only).
+    The feed is cached until the day rolls over or a listed trip changes.
+    """
+    def fetch(*columns) -> TripPage:
+        query = build_weekend_getaways_query(db, weekends_ahead=weekends_ahead)
+        if columns:
+            query = query.with_entities(*columns)
+        return TripPage(items=query.all(), next_cursor=None, has_more=False)
+
+    return _serve_listing(
+        request,
+        fetch,
+        cache_key=discovery_cache_key("trips/weekend-getaways", weekends_ahead=weekends_ahead),
+        ttl_seconds=seconds_until_tomorrow(),
+    )
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_trips_api(
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="ndjson (one trip per line) or csv"),
+):
+    """
+    Stream every listed trip that has not ended, ordered by start date, for
+    partners and the sitemap job. Replaces paging through GET /trips: rows
+    are read with a server-side cursor and written as they arrive, so memory
+    stays flat whatever the catalog size.
     """
-    trips = get_weekend_getaways(db)
-    return [map_trip_response(db, trip) for trip in trips]
+    return StreamingResponse(
+        stream_trip_export(format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="trips.{format.value}"'},
+    )
+
+
+@router.get("/changes", response_model=TripChangesResponse)
+def get_trip_changes_api(
+    since: Optional[str] = Query(None, description="next_cursor of the previous response; omit to start at the oldest retained change"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
+    """
+    Incremental change feed for catalog mirrors.
+    Returns committed trip changes (creation, edits, status transitions,
+    image and seat changes) in feed order with the trip's status, version
+    and free seats at that point. Pass next_cursor back as `since` to resume.
+    Answers 410 when the cursor is older than the feed's retention; mirror
+    again from /trips/export and resume from a fresh cursor.
+    """
+    try:
+        cursor = decode_change_cursor(since) if since else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+    try:
+        page = get_trip_changes(db, since=cursor, limit=limit)
+    except ChangeCursorExpired as e:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail=str(e),
+        )
+
+    return {
+        "changes": [
+            {
+                "seq": change.id,
+                "trip_id": change.trip_id,
+                "kind": change.kind,
+                "status": change.status,
+                "version": change.version,
+                "seats_available": change.seats_available,
+                "changed_at": change.changed_at,
+            }
+            for change in page.items
+        ],
+        "next_cursor": encode_change_cursor(page.next_cursor),
+        "has_more": page.has_more,
+    }
+
+
+@router.get("/calendar", response_model=TripCalendarResponse)
+def get_trip_calendar_api(
+    month: str = Query(..., pattern=r"^\d{4}-(0[1-9]|1[0-2])$", description="Month in YYYY-MM format"),
+    people: int = Query(1, ge=1, description="Party size; only trips with this many free seats count"),
+    db: Session = Depends(get_db),
+):
+    """
+    Availability heatmap for the flexible-date picker: for each day of the
+    month, the number of upcoming departures with enough free seats and
+    their lowest price. Cached per month and party size.
+    """
+    year, month_number = map(int, month.split("-"))
+
+    def load() -> dict:
+        return {
+            "month": month,
+            "people": people,
+            "days": get_trip_calendar(db, year, month_number, people=people),
+        }
+
+    return discovery_cache.get_or_load(
+        discovery_cache_key("trips/calendar", month=month, people=people),
+        load,
+        seat_sensitive=True,
+        aggregate=True,
+    )
+
+
+@router.get("/suggest", response_model=List[TripSuggestion])
+def suggest_trips_api(
+    prefix: str = Query(..., min_length=1, max_length=64),
+    limit: int = Query(8, ge=1, le=MAX_SUGGESTIONS),
+):
+    """
+    Typeahead for the hero and discovery search boxes.
+    Destinations and titles of upcoming trips with a word starting with
+    `prefix` (case- and accent-insensitive), ranked by trip count and booked
+    seats. Served from memory (app.services.trip_suggestions); titles of a
+    single trip carry its slug.
+    """
+    suggestions = trip_suggestions.suggest(prefix, limit=limit)
+    return PreSerializedJSONResponse(
+        TRIP_SUGGESTION_LIST_ADAPTER.dump_json(
+            [
+                TripSuggestion(
+                    label=suggestion.label,
+                    kind=suggestion.kind,
+                    trip_count=suggestion.trip_count,
+                    slug=suggestion.slug,
+                )
+                for suggestion in suggestions
+            ]
+        )
+    )
 
 
 @router.get("/{slug}", response_model=TripResponse)
-def get_trip_api(slug: str, db: Session = Depends(get_db)):
+def get_trip_api(
+    slug: str,
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    """
+    Public trip page. Sends a strong ETag; If-None-Match is answered with 304
+    after a version lookup, without loading the trip or its images.
+    """
+    version = get_public_trip_version(db, slug)
+    if not version:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    etag = make_etag("trip", version.trip_id, version.version, version.held_seats)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    trip = get_trip_by_slug(db, slug)
+    if not trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    trip_response = TRIP_RESPONSE_ADAPTER.validate_python(map_trip_response(db, trip))
+    return PreSerializedJSONResponse(
+        TRIP_RESPONSE_ADAPTER.dump_json(trip_response),
+        headers={"ETag": etag},
+    )
+
+
+@router.get("/{slug}/similar", response_model=List[TripResponse])
+def get_similar_trips_api(
+    slug: str,
+    limit: int = Query(8, ge=1, le=MAX_SIMILAR_TRIPS),
+    db: Session = Depends(get_db),
+):
+    """
+    Upcoming listed trips whose title, destination, description, tags and
+    itinerary are most similar to this trip's, best match first.
+    Scored in process against the similar-trips index (app.services.similar_trips).
+    """
     trip = get_trip_by_slug(db, slug)
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
-    trip.available_seats = get_available_seats(db, trip.id)
-    return map_trip_response(db, trip)
+
+    matches = similar_trips_index.similar(db, trip, limit=limit)
+    cards = get_trip_cards(db, [trip_id for trip_id, _ in matches])
+    trips = TRIP_LIST_ADAPTER.validate_python(map_trip_card_responses(cards))
+    return PreSerializedJSONResponse(TRIP_LIST_ADAPTER.dump_json(trips))
 
 
 @router.delete("/{slug}", status_code=status.HTTP_204_NO_CONTENT)
@@ -277,52 +721,40 @@ def create_booking_request(
     payload: BookingRequest,
     db: Session = Depends(get_db),
     current_user: EndUser = Depends(get_current_end_user),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header),
 ):
     """
     Create a booking request for a trip.
     Requires user authentication.
     Creates a booking with status = REVIEW_PENDING.
+    Retries sent with the same Idempotency-Key replay the first response.
     """
-    # Get trip
-    trip = get_trip_by_id(db, trip_id)
-    if not trip:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Trip not found"
-        )
-    
-    # Check if trip is active
-    if not trip.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Trip is not active"
-        )
+    return run_idempotent(
+        db,
+        key=idempotency_key,
+        user_id=current_user.id,
+        scope="POST /trips/{trip_id}/bookings",
+        request={"trip_id": trip_id, "payload": payload},
+        handler=lambda: _create_booking_request(db, trip_id, payload, current_user),
+        status_code=status.HTTP_201_CREATED,
+    )
 
-    # Booking allowed only for PUBLISHED trips
-    if trip.status != TripStatus.PUBLISHED:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Trip is not open for bookings",
-        )
-    
-    # Booking guard: prevent booking if today >= start_date
-    from datetime import date
-    today = date.today()
-    if today >= trip.start_date:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Bookings are closed for this trip",
-        )
-    
-    # Prevent organizer from booking their own trip
-    # Check if the trip's organizer email matches the current user's email
-    organizer = db.query(Organizer).filter(Organizer.id == trip.organizer_id).first()
-    if organizer and organizer.email.lower() == current_user.email.lower():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Organizers cannot book their own trips"
-        )
-    
+
+# HTTP error for each rejected booking request outcome.
+_BOOKING_REQUEST_ERRORS = {
+    BookingRequestOutcome.NOT_FOUND: (status.HTTP_404_NOT_FOUND, "Trip not found"),
+    BookingRequestOutcome.INACTIVE: (status.HTTP_400_BAD_REQUEST, "Trip is not active"),
+    BookingRequestOutcome.NOT_PUBLISHED: (status.HTTP_400_BAD_REQUEST, "Trip is not open for bookings"),
+    BookingRequestOutcome.CLOSED: (status.HTTP_400_BAD_REQUEST, "Bookings are closed for this trip"),
+    BookingRequestOutcome.OWN_TRIP: (status.HTTP_400_BAD_REQUEST, "Organizers cannot book their own trips"),
+    BookingRequestOutcome.PRICE_MISMATCH: (status.HTTP_400_BAD_REQUEST, "Price per person does not match trip price"),
+    BookingRequestOutcome.DUPLICATE: (status.HTTP_400_BAD_REQUEST, "You already have an active booking for this trip"),
+    BookingRequestOutcome.SOLD_OUT: (status.HTTP_409_CONFLICT, "Not enough seats available"),
+}
+
+
+def _create_booking_request(db: Session, trip_id: str, payload: BookingRequest, current_user: EndUser) -> dict:
+    # Payload-only checks run before touching the database.
     # Validate number of travelers matches traveler details
     if len(payload.travelers) != payload.num_travelers:
         raise HTTPException(
@@ -330,13 +762,6 @@ def create_booking_request(
             detail="Number of travelers must match the number of traveler details provided"
         )
     
-    # Validate price matches trip price
-    if payload.price_per_person != trip.price:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Price per person does not match trip price"
-        )
-    
     # Validate total price calculation
     expected_total = payload.price_per_person * payload.num_travelers
     if payload.total_price != expected_total:
@@ -344,78 +769,36 @@ def create_booking_request(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Total price calculation is incorrect"
         )
-    
-    # Prevent duplicate active bookings for the same trip.
-    from app.crud.booking import get_user_booking_for_trip
-    existing_booking = get_user_booking_for_trip(db, current_user.id, trip_id)
-    
-    if existing_booking and existing_booking.status in (
-        BookingStatus.REVIEW_PENDING,
-        BookingStatus.PAYMENT_PENDING,
-        BookingStatus.CONFIRMED,
-    ):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="You already have an active booking for this trip"
-        )
-    
-    # Convert traveler details to JSONB format
-    traveler_details_json = [traveler.model_dump() for traveler in payload.travelers]
-    
-    # Lock trip row and re-check capacity just before insert.
-    locked_trip = (
-        db.query(Trip)
-        .filter(Trip.id == trip_id)
-        .with_for_update()
-        .first()
-    )
-    if not locked_trip:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Trip not found",
-        )
 
-    held_seats = (
-        db.query(func.coalesce(func.sum(Booking.seats_booked), 0))
-        .filter(
-            Booking.trip_id == trip_id,
-            Booking.status.in_([BookingStatus.PAYMENT_PENDING, BookingStatus.CONFIRMED]),
+    # Trip eligibility, duplicate and capacity checks and the insert of the
+    # review-stage booking run as one statement. Inventory is only held
+    # after organizer approval. Requests for a hot trip are admitted a few
+    # at a time (app.services.trip_admission).
+    with admit_booking(db, trip_id):
+        result = insert_booking_request(
+            db,
+            trip_id=trip_id,
+            user_id=current_user.id,
+            user_email=current_user.email,
+            seats=payload.num_travelers,
+            price_per_person=payload.price_per_person,
+            total_price=payload.total_price,
+            currency=payload.currency,
+            traveler_details=[traveler.model_dump() for traveler in payload.travelers],
+            contact_name=payload.contact_name,
+            contact_phone=payload.contact_phone,
+            contact_email=payload.contact_email,
         )
-        .scalar()
-    )
-    if int(held_seats or 0) + payload.num_travelers > locked_trip.total_seats:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Not enough seats available",
-        )
-
-    # Create review-stage booking. Inventory is only held after organizer approval.
-    booking = Booking(
-        trip_id=trip_id,
-        user_id=current_user.id,
-        seats_booked=payload.num_travelers,
-        amount_snapshot=locked_trip.price * payload.num_travelers,
-        source="user",
-        status=BookingStatus.REVIEW_PENDING,
-        expires_at=None,
-        num_travelers=payload.num_travelers,
-        traveler_details=traveler_details_json,
-        contact_name=payload.contact_name,
-        contact_phone=payload.contact_phone,
-        contact_email=payload.contact_email,
-        price_per_person=payload.price_per_person,
-        total_price=payload.total_price,
-        currency=payload.currency,
-    )
-    
-    db.add(booking)
-    db.commit()
-    db.refresh(booking)
+        if result.outcome != BookingRequestOutcome.OK:
+            db.rollback()
+            status_code, detail = _BOOKING_REQUEST_ERRORS[result.outcome]
+            raise HTTPException(status_code=status_code, detail=detail)
+        db.commit()
 
     return {
         "message": "Booking request submitted successfully",
-        "booking_id": booking.id,
-        "status": booking.status,
+        "booking_id": result.booking_id,
+        "status": result.status,
     }
 
 
@@ -427,7 +810,15 @@ def map_trip_response(db: Session, trip):
         # Find image with position 0 (cover image)
         cover_image = next((img for img in images if img.position == 0), images[0])
         cover_image_url = cover_image.image_url if cover_image else None
-    
+
+    return _build_trip_response(
+        trip,
+        cover_image_url=cover_image_url,
+        available_seats=get_available_seats(db, trip.id),
+    )
+
+
+def _build_trip_response(trip, *, cover_image_url: Optional[str], available_seats: int) -> dict:
     # Fallback to legacy cover_image_url if no images in new table
     if not cover_image_url:
         cover_image_url = trip.cover_image_url
@@ -443,7 +834,7 @@ def map_trip_response(db: Session, trip):
         "start_date": trip.start_date,
         "end_date": trip.end_date,
         "total_seats": trip.total_seats,
-        "available_seats": get_available_seats(db, trip.id),
+        "available_seats": available_seats,
         "status": getattr(trip, "status", TripStatus.DRAFT),
         "tags": trip.tags,
         "cover_image_url": cover_image_url,
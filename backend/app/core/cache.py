@@ -0,0 +1,191 @@
+"""
+Bounded, thread-safe in-process result cache with TTL and trip-based invalidation.
+
+Each entry remembers the trip ids it contains so a change to one trip only
+drops the results that show it. Entries can also be marked seat-sensitive
+when their filters depend on seat availability, or as aggregates when they
+summarize every matching trip (facet counts) rather than list a few.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Iterable, Optional, Set, Tuple
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    trip_ids: FrozenSet[str]
+    seat_sensitive: bool
+    aggregate: bool
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+class ResultCache:
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._keys_by_trip: Dict[str, Set[Hashable]] = {}
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so a load that raced with one is not stored.
+        self._generation = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (hit, value). Expired entries count as misses."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return False, None
+            if entry.expires_at <= self.clock():
+                self._remove(key)
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return True, entry.value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        *,
+        trip_ids: Iterable[str] = (),
+        seat_sensitive: bool = False,
+        aggregate: bool = False,
+        ttl_seconds: Optional[float] = None,
+        generation: Optional[int] = None,
+    ) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        entry = _Entry(
+            value=value,
+            expires_at=self.clock() + ttl,
+            trip_ids=frozenset(trip_ids),
+            seat_sensitive=seat_sensitive,
+            aggregate=aggregate,
+        )
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            for trip_id in entry.trip_ids:
+                self._keys_by_trip.setdefault(trip_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._stats.evictions += 1
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        *,
+        trip_ids_of: Callable[[Any], Iterable[str]] = lambda value: (),
+        seat_sensitive: bool = False,
+        aggregate: bool = False,
+        ttl_seconds: Optional[float] = None,
+    ) -> Any:
+        hit, value = self.get(key)
+        if hit:
+            return value
+        with self._lock:
+            generation = self._generation
+        value = loader()
+        self.set(
+            key,
+            value,
+            trip_ids=trip_ids_of(value),
+            seat_sensitive=seat_sensitive,
+            aggregate=aggregate,
+            ttl_seconds=ttl_seconds,
+            generation=generation,
+        )
+        return value
+
+    def invalidate_trips(
+        self,
+        trip_ids: Iterable[str],
+        *,
+        include_seat_sensitive: bool = False,
+        include_aggregates: bool = False,
+    ) -> int:
+        """Drop entries containing any of the trips, plus seat-sensitive or aggregate entries if asked."""
+        with self._lock:
+            keys: Set[Hashable] = set()
+            for trip_id in trip_ids:
+                keys.update(self._keys_by_trip.get(trip_id, ()))
+            if include_seat_sensitive or include_aggregates:
+                keys.update(
+                    key
+                    for key, entry in self._entries.items()
+                    if (include_seat_sensitive and entry.seat_sensitive)
+                    or (include_aggregates and entry.aggregate)
+                )
+            for key in keys:
+                self._remove(key)
+            self._generation += 1
+            self._stats.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stats.invalidations += len(self._entries)
+            self._generation += 1
+            self._entries.clear()
+            self._keys_by_trip.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                **self._stats.as_dict(),
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for trip_id in entry.trip_ids:
+            keys = self._keys_by_trip.get(trip_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_trip[trip_id]
@@ -40,6 +40,51 @@ class Settings(BaseSettings):
     RAZORPAY_WEBHOOK_SECRET: str = ""
     ORGANIZER_PLATFORM_FEE_PERCENT: float = 12.0
     ORGANIZER_PAYOUT_DELAY_DAYS: int = 7
+
+    # Public discovery result cache (per process)
+    DISCOVERY_CACHE_MAX_ENTRIES: int = 512
+    DISCOVERY_CACHE_TTL_SECONDS: int = 60
+    # Day-scoped feeds (weekend getaways) live until midnight, capped here
+    DAY_SCOPED_CACHE_MAX_TTL_SECONDS: int = 3600
+    # GET /home-feed is cached briefly: it mixes every homepage section
+    HOME_FEED_CACHE_TTL_SECONDS: int = 30
+
+    # Similar-trips index (per process): hashed vector width, and how often
+    # trip_cards versions are re-checked for changes made by other workers
+    SIMILAR_TRIPS_DIMENSIONS: int = 256
+    SIMILAR_TRIPS_SYNC_SECONDS: int = 300
+    # A query over more trips than SIMILAR_TRIPS_CANDIDATES first scores only
+    # its heaviest SIMILAR_TRIPS_QUERY_BUCKETS buckets, then ranks that many
+    # candidates exactly (0 buckets always scores every trip exactly)
+    SIMILAR_TRIPS_QUERY_BUCKETS: int = 32
+    SIMILAR_TRIPS_CANDIDATES: int = 2048
+    # Full reload interval of the typeahead index (changes in this process
+    # are applied as they commit)
+    SUGGEST_REBUILD_SECONDS: int = 300
+
+    # GET /trips/changes keeps this much history (purged by scripts/purge_trip_changes.py)
+    TRIP_CHANGES_RETENTION_DAYS: int = 30
+
+    # Idempotency-Key replays are kept this long (purged by
+    # scripts/purge_idempotency_keys.py); a retry waits this long for the
+    # original request to finish; a claim whose request never finished is
+    # taken over after IDEMPOTENCY_CLAIM_SECONDS
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0
+    IDEMPOTENCY_CLAIM_SECONDS: int = 300
+
+    # Booking admission control per trip: concurrent booking requests per
+    # process, FIFO queue behind them and its maximum wait, and advisory-lock
+    # slots shared by all workers (0 gates each process on its own)
+    ADMISSION_MAX_ACTIVE_PER_TRIP: int = 4
+    ADMISSION_MAX_QUEUED_PER_TRIP: int = 16
+    ADMISSION_MAX_WAIT_SECONDS: float = 2.0
+    ADMISSION_CLUSTER_SLOTS_PER_TRIP: int = 8
+
+    # Expired payment holds are released by a background thread this often
+    # (0 leaves it to scripts/expire_payment_holds.py), this many per transaction
+    BOOKING_EXPIRY_INTERVAL_SECONDS: int = 30
+    BOOKING_EXPIRY_BATCH_SIZE: int = 500
     
     # Pydantic v2 model configuration
     # Conditionally load .env file based on ENV variable (evaluated at import time)
@@ -0,0 +1,32 @@
+"""
+Strong ETags and If-None-Match handling for conditional GETs.
+"""
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Response, status
+
+
+def make_etag(*parts: Any) -> str:
+    """Build an opaque strong ETag from the values that identify a representation."""
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison, so W/ prefixes are ignored."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
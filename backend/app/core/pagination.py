@@ -0,0 +1,44 @@
+"""
+Opaque keyset cursors for public trip listings.
+A cursor encodes the (start_date, id) of the last row on a page and, for
+sort orders led by another column, that sort and the row's value for it.
+"""
+import base64
+import json
+from datetime import date
+from typing import NamedTuple, Optional
+
+
+class ListingCursor(NamedTuple):
+    start_date: date
+    trip_id: str
+    sort: str = "start_date"
+    sort_value: Optional[int] = None
+
+
+def encode_cursor(
+    start_date: date,
+    trip_id: str,
+    *,
+    sort: str = "start_date",
+    sort_value: Optional[int] = None,
+) -> str:
+    payload = [start_date.isoformat(), trip_id]
+    if sort_value is not None:
+        payload += [sort, sort_value]
+    data = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> ListingCursor:
+    """Decode a cursor. Raises ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if len(payload) == 2:
+            start_date, trip_id = payload
+            return ListingCursor(date.fromisoformat(start_date), str(trip_id))
+        start_date, trip_id, sort, sort_value = payload
+        return ListingCursor(date.fromisoformat(start_date), str(trip_id), str(sort), int(sort_value))
+    except (ValueError, TypeError, UnicodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
@@ -0,0 +1,22 @@
+"""
+JSON response classes.
+
+ORJSONResponse is the app's default response class: FastAPI still validates
+and converts the endpoint's return value, and orjson renders the result.
+Hot endpoints serialize once with a pydantic TypeAdapter instead and send the
+bytes in a PreSerializedJSONResponse, which FastAPI passes through untouched
+(no response_model validation, no second encoder).
+"""
+import orjson
+from starlette.responses import JSONResponse, Response
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class PreSerializedJSONResponse(Response):
+    """Response whose content is JSON bytes that were already serialized."""
+
+    media_type = "application/json"
@@ -0,0 +1,77 @@
+"""
+Trip change notifications tied to the database transaction.
+
+Write paths call record_trip_change() before committing. Once the session
+commits, every registered listener receives the batch of changes; a
+rollback discards them. Listeners run after the data is durable, so they
+are the place to drop caches or refresh in-memory indexes, never to issue
+SQL on the committing session.
+"""
+import enum
+import logging
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "pending_trip_changes"
+
+
+class TripChangeKind(str, enum.Enum):
+    CREATED = "CREATED"
+    UPDATED = "UPDATED"
+    PUBLISHED = "PUBLISHED"
+    ARCHIVED = "ARCHIVED"
+    UNARCHIVED = "UNARCHIVED"
+    DELETED = "DELETED"
+    IMAGES = "IMAGES"
+    INVENTORY = "INVENTORY"
+
+
+class TripChange(NamedTuple):
+    trip_id: str
+    kind: TripChangeKind
+
+
+TripChangeListener = Callable[[List[TripChange]], None]
+
+_listeners: List[TripChangeListener] = []
+
+
+def add_trip_change_listener(listener: TripChangeListener) -> None:
+    """Register a callback invoked with each committed batch of trip changes."""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def record_trip_change(db: Session, trip_id: str, kind: TripChangeKind) -> None:
+    """Queue a trip change to be published when the session commits."""
+    changes = db.info.setdefault(_PENDING_KEY, [])
+    change = TripChange(trip_id=trip_id, kind=kind)
+    if change not in changes:
+        changes.append(change)
+
+
+def pending_trip_changes(db: Session) -> List[TripChange]:
+    """Changes recorded in the session's current transaction."""
+    return list(db.info.get(_PENDING_KEY, ()))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_trip_changes(session: Session) -> None:
+    changes = session.info.pop(_PENDING_KEY, None)
+    if not changes:
+        return
+    for listener in list(_listeners):
+        try:
+            listener(changes)
+        except Exception:
+            # A failing listener must not turn a committed write into an error.
+            logger.exception("Trip change listener %r failed", listener)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_trip_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -1,25 +1,271 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, insert, select, update
 
+from app.core.trip_events import TripChangeKind, record_trip_change
+from app.crud.trip_card import sync_trip_card_seats
 from app.models.booking import Booking, BookingStatus
+from app.models.payment import Payment, PaymentStatus
+from app.models.payment_event import PaymentEvent
 from app.models.trip import Trip
+from app.models.trip_inventory import TripInventory
+
+# Booking states that hold inventory on a trip.
+HELD_BOOKING_STATUSES = (BookingStatus.PAYMENT_PENDING, BookingStatus.CONFIRMED)
+
+# Payment attempts still waiting on the provider.
+OPEN_PAYMENT_STATUSES = (PaymentStatus.ORDER_CREATED, PaymentStatus.PENDING)
+
+
+def get_held_seats(db: Session, trip_id: str) -> int:
+    """Get seats held by approved payment holds or confirmed bookings for a trip."""
+    held = (
+        db.query(TripInventory.held_seats)
+        .filter(TripInventory.trip_id == trip_id)
+        .scalar()
+    )
+    return int(held or 0)
 
 
 def get_available_seats(db: Session, trip_id: str) -> int:
     """
-    Calculate available seats from bookings table.
+    Read available seats from the trip inventory counter.
     Only approved payment holds and confirmed bookings hold inventory.
     """
-    booked = (
+    row = (
+        db.query(Trip.total_seats, TripInventory.held_seats)
+        .outerjoin(TripInventory, TripInventory.trip_id == Trip.id)
+        .filter(Trip.id == trip_id)
+        .first()
+    )
+    if row is None or row[0] is None:
+        return 0
+    total, held = row
+    return max(int(total) - int(held or 0), 0)
+
+
+def get_available_seats_for_trips(db: Session, trips: List[Trip]) -> Dict[str, int]:
+    """
+    Read available seats for a page of trips with one query.
+    Uses the already-loaded total_seats of each trip.
+    """
+    if not trips:
+        return {}
+    rows = (
+        db.query(TripInventory.trip_id, TripInventory.held_seats)
+        .filter(TripInventory.trip_id.in_([trip.id for trip in trips]))
+        .all()
+    )
+    held = {trip_id: int(held_seats or 0) for trip_id, held_seats in rows}
+    return {
+        trip.id: max(int(trip.total_seats or 0) - held.get(trip.id, 0), 0)
+        for trip in trips
+    }
+
+
+def create_trip_inventory(db: Session, trip_id: str) -> TripInventory:
+    """Add an empty inventory counter for a new trip. Caller commits."""
+    inventory = TripInventory(trip_id=trip_id, held_seats=0)
+    db.add(inventory)
+    return inventory
+
+
+def reserve_seats(db: Session, trip_id: str, seats: int) -> bool:
+    """
+    Atomically hold seats on a trip if capacity allows.
+    The conditional UPDATE locks only the inventory row, so concurrent
+    reservations serialize without locking the trip or summing bookings.
+    Returns False when the trip does not have enough free seats.
+    Caller commits.
+    """
+    total_seats = (
+        db.query(Trip.total_seats)
+        .filter(Trip.id == trip_id)
+        .scalar_subquery()
+    )
+    result = db.execute(
+        update(TripInventory)
+        .where(
+            TripInventory.trip_id == trip_id,
+            TripInventory.held_seats + seats <= total_seats,
+        )
+        .values(
+            held_seats=TripInventory.held_seats + seats,
+            updated_at=func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return False
+    sync_trip_card_seats(db, trip_id)
+    record_trip_change(db, trip_id, TripChangeKind.INVENTORY)
+    return True
+
+
+def release_seats(db: Session, trip_id: str, seats: int) -> None:
+    """Return held seats to a trip. Caller commits."""
+    if seats <= 0:
+        return
+    db.execute(
+        update(TripInventory)
+        .where(TripInventory.trip_id == trip_id)
+        .values(
+            held_seats=func.greatest(TripInventory.held_seats - seats, 0),
+            updated_at=func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    sync_trip_card_seats(db, trip_id)
+    record_trip_change(db, trip_id, TripChangeKind.INVENTORY)
+
+
+def expire_stale_holds(db: Session, *, now: datetime, batch_size: int = 500) -> int:
+    """
+    Expire one batch of PAYMENT_PENDING bookings whose hold window has passed:
+    their open payment attempts are marked FAILED and their seats released.
+    Rows another transaction has locked (a booking being paid for or
+    reviewed) are skipped and left for a later batch, so concurrent callers
+    never wait on each other or on the request path.
+    Returns the number of expired bookings. Caller commits.
+    """
+    stale_ids = db.execute(
+        select(Booking.id)
+        .where(
+            Booking.status == BookingStatus.PAYMENT_PENDING,
+            Booking.expires_at < now,
+        )
+        .order_by(Booking.expires_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not stale_ids:
+        return 0
+
+    # Payment attempts lock the payment before the booking, so they are taken
+    # with SKIP LOCKED too; a booking whose payment is being verified right
+    # now is left to the verification.
+    open_payments = db.execute(
+        select(Payment.id, Payment.booking_id).where(
+            Payment.booking_id.in_(stale_ids),
+            Payment.status.in_(OPEN_PAYMENT_STATUSES),
+        )
+    ).all()
+    locked_payments = set()
+    if open_payments:
+        locked_payments = set(
+            db.execute(
+                select(Payment.id)
+                .where(
+                    Payment.id.in_([payment_id for payment_id, _ in open_payments]),
+                    Payment.status.in_(OPEN_PAYMENT_STATUSES),
+                )
+                .order_by(Payment.id)
+                .with_for_update(skip_locked=True)
+            ).scalars()
+        )
+    busy = {
+        booking_id
+        for payment_id, booking_id in open_payments
+        if payment_id not in locked_payments
+    }
+    expiring = [booking_id for booking_id in stale_ids if booking_id not in busy]
+    if not expiring:
+        return 0
+
+    released: Dict[str, int] = defaultdict(int)
+    for trip_id, seats in db.execute(
+        update(Booking)
+        .where(Booking.id.in_(expiring))
+        .values(status=BookingStatus.EXPIRED)
+        .returning(Booking.trip_id, Booking.seats_booked)
+        .execution_options(synchronize_session=False)
+    ).all():
+        released[trip_id] += int(seats or 0)
+
+    failed = [
+        payment_id
+        for payment_id, booking_id in open_payments
+        if payment_id in locked_payments and booking_id not in busy
+    ]
+    if failed:
+        db.execute(
+            update(Payment)
+            .where(Payment.id.in_(failed))
+            .values(status=PaymentStatus.FAILED)
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            insert(PaymentEvent),
+            [
+                {
+                    "payment_id": payment_id,
+                    "event_type": "HOLD_EXPIRED",
+                    "raw_payload": {"expired_at": now.isoformat()},
+                }
+                for payment_id in failed
+            ],
+        )
+
+    # Inventory rows in id order, like every other multi-trip writer.
+    for trip_id, seats in sorted(released.items()):
+        release_seats(db, trip_id, seats)
+    return len(expiring)
+
+
+def recompute_trip_inventory(db: Session, trip_id: str) -> bool:
+    """
+    Recompute a trip's held seats from the bookings table.
+    Locks the inventory row first so the recount cannot interleave with a
+    concurrent reservation. Returns True if the counter was corrected.
+    Caller commits.
+    """
+    inventory = (
+        db.query(TripInventory)
+        .filter(TripInventory.trip_id == trip_id)
+        .with_for_update()
+        .first()
+    )
+    if inventory is None:
+        inventory = create_trip_inventory(db, trip_id)
+        db.flush()
+
+    held = (
         db.query(func.coalesce(func.sum(Booking.seats_booked), 0))
         .filter(
             Booking.trip_id == trip_id,
-            Booking.status.in_([BookingStatus.PAYMENT_PENDING, BookingStatus.CONFIRMED]),
+            Booking.status.in_(HELD_BOOKING_STATUSES),
         )
         .scalar()
     )
+    held = int(held or 0)
+    if inventory.held_seats == held:
+        return False
+    inventory.held_seats = held
+    db.flush()
+    sync_trip_card_seats(db, trip_id)
+    record_trip_change(db, trip_id, TripChangeKind.INVENTORY)
+    return True
 
-    total = db.query(Trip.total_seats).filter(Trip.id == trip_id).scalar()
-    if total is None:
-        return 0
-    return max(int(total) - int(booked or 0), 0)
+
+def repair_trip_inventory(db: Session, trip_ids: Optional[List[str]] = None) -> int:
+    """
+    Recompute inventory counters for the given trips (or every trip),
+    committing per trip to keep lock windows short.
+    Returns the number of corrected counters.
+    """
+    if trip_ids is None:
+        trip_ids = [trip_id for (trip_id,) in db.query(Trip.id).order_by(Trip.id).all()]
+
+    corrected = 0
+    for trip_id in trip_ids:
+        try:
+            if recompute_trip_inventory(db, trip_id):
+                corrected += 1
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    return corrected
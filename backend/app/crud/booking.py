@@ -1,8 +1,22 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime, timedelta, timezone
+import enum
+import uuid
+from collections import defaultdict
+from sqlalchemy import case, exists, func, insert, literal, select, true, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session, joinedload
+from typing import Any, List, NamedTuple, Optional
+from datetime import date, datetime, timedelta, timezone
 from app.models.booking import Booking, BookingStatus
-from app.models.trip import Trip
+from app.models.organizer import Organizer
+from app.models.trip import Trip, TripStatus
+from app.models.trip_inventory import TripInventory
+
+# A user may hold only one booking in these states per trip.
+ACTIVE_BOOKING_STATUSES = (
+    BookingStatus.REVIEW_PENDING,
+    BookingStatus.PAYMENT_PENDING,
+    BookingStatus.CONFIRMED,
+)
 
 
 def list_bookings_for_organizer(
@@ -94,6 +108,114 @@ def get_user_booking_for_trip(
     )
 
 
+class BookingRequestOutcome(str, enum.Enum):
+    OK = "ok"
+    NOT_FOUND = "not_found"
+    INACTIVE = "inactive"
+    NOT_PUBLISHED = "not_published"
+    CLOSED = "closed"
+    OWN_TRIP = "own_trip"
+    PRICE_MISMATCH = "price_mismatch"
+    DUPLICATE = "duplicate"
+    SOLD_OUT = "sold_out"
+
+
+class BookingRequestResult(NamedTuple):
+    outcome: BookingRequestOutcome
+    booking_id: Optional[str] = None
+    status: Optional[BookingStatus] = None
+
+
+def create_booking_request(
+    db: Session,
+    *,
+    trip_id: str,
+    user_id: str,
+    user_email: str,
+    seats: int,
+    price_per_person: int,
+    total_price: int,
+    currency: str,
+    traveler_details: List[dict[str, Any]],
+    contact_name: str,
+    contact_phone: str,
+    contact_email: str,
+    today: Optional[date] = None,
+) -> BookingRequestResult:
+    """
+    Insert a REVIEW_PENDING booking request in one statement.
+    A CTE reads the trip with its inventory counter, organizer email and the
+    user's active bookings, decides the outcome (checked in the order of
+    BookingRequestOutcome), and the INSERT ... SELECT only writes a row when
+    that outcome is OK. Review-stage bookings hold no inventory, so the seat
+    check reads the counter without locking.
+    Returns the outcome, plus the new booking's id and status when OK.
+    Caller commits.
+    """
+    today = today or date.today()
+    has_active_booking = exists().where(
+        Booking.user_id == user_id,
+        Booking.trip_id == Trip.id,
+        Booking.status.in_(ACTIVE_BOOKING_STATUSES),
+    )
+    outcome = case(
+        (Trip.is_active.is_not(True), BookingRequestOutcome.INACTIVE.value),
+        (Trip.status != TripStatus.PUBLISHED, BookingRequestOutcome.NOT_PUBLISHED.value),
+        (Trip.start_date <= today, BookingRequestOutcome.CLOSED.value),
+        (func.lower(Organizer.email) == user_email.lower(), BookingRequestOutcome.OWN_TRIP.value),
+        (Trip.price != price_per_person, BookingRequestOutcome.PRICE_MISMATCH.value),
+        (has_active_booking, BookingRequestOutcome.DUPLICATE.value),
+        (
+            Trip.total_seats - func.coalesce(TripInventory.held_seats, 0) < seats,
+            BookingRequestOutcome.SOLD_OUT.value,
+        ),
+        else_=BookingRequestOutcome.OK.value,
+    )
+    candidate = (
+        select(Trip.id.label("trip_id"), Trip.price.label("price"), outcome.label("outcome"))
+        .outerjoin(TripInventory, TripInventory.trip_id == Trip.id)
+        .outerjoin(Organizer, Organizer.id == Trip.organizer_id)
+        .where(Trip.id == trip_id)
+        .cte("candidate")
+    )
+
+    # status takes its REVIEW_PENDING server default.
+    values = {
+        Booking.id: literal(str(uuid.uuid4())),
+        Booking.trip_id: candidate.c.trip_id,
+        Booking.user_id: literal(user_id),
+        Booking.seats_booked: literal(seats),
+        Booking.amount_snapshot: candidate.c.price * seats,
+        Booking.source: literal("user"),
+        Booking.num_travelers: literal(seats),
+        Booking.traveler_details: literal(traveler_details, JSONB),
+        Booking.contact_name: literal(contact_name),
+        Booking.contact_phone: literal(contact_phone),
+        Booking.contact_email: literal(contact_email),
+        Booking.price_per_person: literal(price_per_person),
+        Booking.total_price: literal(total_price),
+        Booking.currency: literal(currency),
+    }
+    inserted = (
+        insert(Booking)
+        .from_select(
+            [column.key for column in values],
+            select(*values.values()).where(candidate.c.outcome == BookingRequestOutcome.OK.value),
+        )
+        .returning(Booking.id, Booking.status)
+        .cte("inserted")
+    )
+    row = db.execute(
+        select(candidate.c.outcome, inserted.c.id, inserted.c.status)
+        .select_from(candidate)
+        .outerjoin(inserted, true())
+    ).first()
+
+    if row is None:
+        return BookingRequestResult(BookingRequestOutcome.NOT_FOUND)
+    return BookingRequestResult(BookingRequestOutcome(row.outcome), row.id, row.status)
+
+
 def get_booking_with_trip(db: Session, booking_id: str):
     """Get a booking with its associated trip. Returns (Booking, Trip) or None."""
     booking = (
@@ -107,6 +229,56 @@ def get_booking_with_trip(db: Session, booking_id: str):
     return (booking, booking.trip)
 
 
+# Approved bookings hold their seats for this long awaiting payment.
+PAYMENT_HOLD_MINUTES = 10
+
+
+def _lock_booking_for_review(db: Session, booking_id: str) -> Optional[Booking]:
+    """
+    Lock a booking's trip, then the booking. Every review path (single and
+    bulk) locks trips before bookings so concurrent reviews cannot deadlock.
+    """
+    trip_id = db.query(Booking.trip_id).filter(Booking.id == booking_id).scalar()
+    if trip_id is None:
+        return None
+    db.query(Trip.id).filter(Trip.id == trip_id).with_for_update().first()
+    return db.query(Booking).filter(Booking.id == booking_id).with_for_update().first()
+
+
+def _approval_error(status: BookingStatus) -> Optional[str]:
+    """Why a booking in `status` cannot be approved, or None if it can."""
+    # Status transition guard: Only REVIEW_PENDING can be approved for payment.
+    if status == BookingStatus.CONFIRMED:
+        return "Booking is already confirmed"
+    if status == BookingStatus.CANCELLED:
+        return "Cannot approve a cancelled booking"
+    if status == BookingStatus.PAYMENT_PENDING:
+        return "Booking is already approved and awaiting payment"
+    if status == BookingStatus.EXPIRED:
+        return "Cannot approve an expired booking"
+    if status != BookingStatus.REVIEW_PENDING:
+        return f"Cannot approve booking with status: {status}"
+    return None
+
+
+def _rejection_error(status: BookingStatus) -> Optional[str]:
+    """Why a booking in `status` cannot be rejected, or None if it can."""
+    # Status transition guard: REVIEW_PENDING and PAYMENT_PENDING can be cancelled by organizer
+    if status == BookingStatus.CANCELLED:
+        return "Booking is already cancelled"
+    if status == BookingStatus.CONFIRMED:
+        return "Cannot cancel a confirmed booking"
+    if status == BookingStatus.EXPIRED:
+        return "Booking is already expired"
+    if status not in (BookingStatus.REVIEW_PENDING, BookingStatus.PAYMENT_PENDING):
+        return f"Cannot reject booking with status: {status}"
+    return None
+
+
+def _not_enough_seats(available: int, requested: int) -> str:
+    return f"Not enough seats available. Available: {available}, Requested: {requested}"
+
+
 def approve_booking(
     db: Session,
     booking_id: str,
@@ -122,26 +294,16 @@ def approve_booking(
     Returns the updated booking.
     Raises exceptions for validation failures.
     """
-    from app.crud.availability import get_available_seats
+    from app.crud.availability import get_available_seats, reserve_seats
     
     # Use a transaction to ensure atomicity
     try:
-        # Get booking with trip (lock the booking row for update)
-        booking = (
-            db.query(Booking)
-            .join(Trip, Booking.trip_id == Trip.id)
-            .filter(Booking.id == booking_id)
-            .with_for_update()  # Row-level lock to prevent race conditions
-            .first()
-        )
+        booking = _lock_booking_for_review(db, booking_id)
         
         if not booking:
             raise ValueError("Booking not found")
         
         trip = booking.trip
-        if not trip:
-            raise ValueError("Trip not found for this booking")
-        trip = db.query(Trip).filter(Trip.id == trip.id).with_for_update().first()
         if not trip:
             raise ValueError("Trip not found for this booking")
         
@@ -149,43 +311,20 @@ def approve_booking(
         if trip.organizer_id != organizer_id:
             raise PermissionError("You do not have permission to approve this booking")
         
-        # Expire stale approved holds before capacity checks.
-        now = datetime.now(timezone.utc)
-        db.query(Booking).filter(
-            Booking.trip_id == trip.id,
-            Booking.status == BookingStatus.PAYMENT_PENDING,
-            Booking.expires_at.is_not(None),
-            Booking.expires_at < now,
-        ).update(
-            {Booking.status: BookingStatus.EXPIRED},
-            synchronize_session=False,
-        )
-
-        # Status transition guard: Only REVIEW_PENDING can be approved for payment.
-        if booking.status == BookingStatus.CONFIRMED:
-            raise ValueError("Booking is already confirmed")
-        if booking.status == BookingStatus.CANCELLED:
-            raise ValueError("Cannot approve a cancelled booking")
-        if booking.status == BookingStatus.PAYMENT_PENDING:
-            raise ValueError("Booking is already approved and awaiting payment")
-        if booking.status == BookingStatus.EXPIRED:
-            raise ValueError("Cannot approve an expired booking")
-        if booking.status != BookingStatus.REVIEW_PENDING:
-            raise ValueError(f"Cannot approve booking with status: {booking.status}")
-        
-        # Re-check seat availability atomically within transaction
-        # Use num_travelers if available, otherwise fall back to seats_booked
-        requested_seats = booking.num_travelers if booking.num_travelers else booking.seats_booked
-        available = get_available_seats(db, trip.id)
+        error = _approval_error(booking.status)
+        if error:
+            raise ValueError(error)
         
-        if requested_seats > available:
-            raise ValueError(
-                f"Not enough seats available. Available: {available}, Requested: {requested_seats}"
-            )
+        # Hold the seats atomically on the trip inventory counter.
+        requested_seats = booking.seats_booked
+        if not reserve_seats(db, trip.id, requested_seats):
+            available = get_available_seats(db, trip.id)
+            raise ValueError(_not_enough_seats(available, requested_seats))
         
         # Move booking into a time-boxed payment hold.
+        now = datetime.now(timezone.utc)
         booking.status = BookingStatus.PAYMENT_PENDING
-        booking.expires_at = now + timedelta(minutes=10)
+        booking.expires_at = now + timedelta(minutes=PAYMENT_HOLD_MINUTES)
         booking.organizer_note = note.strip() if note else booking.organizer_note
         booking.decision_reason = reason.strip() if reason else booking.decision_reason
         booking.decision_at = now
@@ -213,15 +352,10 @@ def reject_booking(
     Returns the updated booking.
     Raises exceptions for validation failures.
     """
+    from app.crud.availability import release_seats
+
     try:
-        # Get booking with trip
-        booking = (
-            db.query(Booking)
-            .join(Trip, Booking.trip_id == Trip.id)
-            .filter(Booking.id == booking_id)
-            .with_for_update()  # Row-level lock
-            .first()
-        )
+        booking = _lock_booking_for_review(db, booking_id)
         
         if not booking:
             raise ValueError("Booking not found")
@@ -234,15 +368,13 @@ def reject_booking(
         if trip.organizer_id != organizer_id:
             raise PermissionError("You do not have permission to reject this booking")
         
-        # Status transition guard: REVIEW_PENDING and PAYMENT_PENDING can be cancelled by organizer
-        if booking.status == BookingStatus.CANCELLED:
-            raise ValueError("Booking is already cancelled")
-        if booking.status == BookingStatus.CONFIRMED:
-            raise ValueError("Cannot cancel a confirmed booking")
-        if booking.status == BookingStatus.EXPIRED:
-            raise ValueError("Booking is already expired")
-        if booking.status not in (BookingStatus.REVIEW_PENDING, BookingStatus.PAYMENT_PENDING):
-            raise ValueError(f"Cannot reject booking with status: {booking.status}")
+        error = _rejection_error(booking.status)
+        if error:
+            raise ValueError(error)
+
+        # Cancelling an approved hold returns its seats to the trip.
+        if booking.status == BookingStatus.PAYMENT_PENDING:
+            release_seats(db, trip.id, booking.seats_booked)
 
         # Update status to CANCELLED
         booking.status = BookingStatus.CANCELLED
@@ -268,23 +400,140 @@ def bulk_review_bookings(
     note: Optional[str] = None,
     reason: Optional[str] = None,
 ) -> tuple[List[Booking], List[dict[str, str]]]:
-    processed: List[Booking] = []
-    errors: List[dict[str, str]] = []
-
-    for booking_id in booking_ids:
-        try:
-            if action == "approve":
-                processed.append(
-                    approve_booking(db, booking_id, organizer_id, note=note, reason=reason)
-                )
-            elif action == "reject":
-                processed.append(
-                    reject_booking(db, booking_id, organizer_id, note=note, reason=reason)
+    """
+    Approve or reject many bookings in one transaction.
+    Trips, then bookings, then inventory counters are locked in id order;
+    capacity is allocated in memory in request order; every transition is one UPDATE and the whole review
+    commits once. Each failing id gets the same message approve_booking or
+    reject_booking would raise, and a failure does not affect the others.
+    Returns (reviewed bookings, per-booking errors).
+    """
+    from app.crud.availability import release_seats, reserve_seats
+
+    if action not in ("approve", "reject"):
+        return [], [
+            {"booking_id": booking_id, "message": "Unsupported bulk action"}
+            for booking_id in booking_ids
+        ]
+    approving = action == "approve"
+    requested = list(dict.fromkeys(booking_ids))
+    now = datetime.now(timezone.utc)
+
+    try:
+        targets = (
+            db.query(Booking.id, Booking.trip_id, Trip.organizer_id)
+            .join(Trip, Booking.trip_id == Trip.id)
+            .filter(Booking.id.in_(requested))
+            .all()
+        )
+        owners = {booking_id: owner for booking_id, _, owner in targets}
+        owned = [booking_id for booking_id, _, owner in targets if owner == organizer_id]
+        trip_ids = sorted({trip_id for _, trip_id, owner in targets if owner == organizer_id})
+
+        bookings: dict[str, Booking] = {}
+        statuses: dict[str, BookingStatus] = {}
+        if owned:
+            # Same lock order as approve_booking: trips, bookings, then inventory.
+            db.query(Trip.id).filter(Trip.id.in_(trip_ids)).order_by(Trip.id).with_for_update().all()
+            bookings = {
+                booking.id: booking
+                for booking in (
+                    db.query(Booking)
+                    .filter(Booking.id.in_(owned))
+                    .order_by(Booking.id)
+                    .with_for_update()
+                    .populate_existing()
+                    .all()
                 )
-            else:
-                errors.append({"booking_id": booking_id, "message": "Unsupported bulk action"})
-        except (ValueError, PermissionError) as exc:
-            errors.append({"booking_id": booking_id, "message": str(exc)})
+            }
+            statuses = {booking_id: booking.status for booking_id, booking in bookings.items()}
+
+        available: dict[str, int] = {}
+        if approving and trip_ids:
+            for trip_id, total_seats, held_seats in (
+                db.query(TripInventory.trip_id, Trip.total_seats, TripInventory.held_seats)
+                .join(Trip, Trip.id == TripInventory.trip_id)
+                .filter(TripInventory.trip_id.in_(trip_ids))
+                .order_by(TripInventory.trip_id)
+                .with_for_update(of=TripInventory)
+                .all()
+            ):
+                available[trip_id] = max(int(total_seats or 0) - int(held_seats or 0), 0)
+
+        # Decide every booking in request order; repeated ids see the earlier decision.
+        reviewed: List[str] = []
+        seat_changes: dict[str, int] = defaultdict(int)
+        errors: List[dict[str, str]] = []
+        for booking_id in booking_ids:
+            booking = bookings.get(booking_id)
+            if booking is None:
+                if booking_id in owners:
+                    errors.append({
+                        "booking_id": booking_id,
+                        "message": f"You do not have permission to {action} this booking",
+                    })
+                else:
+                    errors.append({"booking_id": booking_id, "message": "Booking not found"})
+                continue
+
+            status = statuses[booking_id]
+            error = _approval_error(status) if approving else _rejection_error(status)
+            if error is None and approving:
+                free = available.get(booking.trip_id, 0)
+                if booking.seats_booked > free:
+                    error = _not_enough_seats(free, booking.seats_booked)
+                else:
+                    available[booking.trip_id] = free - booking.seats_booked
+                    seat_changes[booking.trip_id] += booking.seats_booked
+            elif error is None and status == BookingStatus.PAYMENT_PENDING:
+                # Cancelling an approved hold returns its seats to the trip.
+                seat_changes[booking.trip_id] += booking.seats_booked
+            if error:
+                errors.append({"booking_id": booking_id, "message": error})
+                continue
+            statuses[booking_id] = (
+                BookingStatus.PAYMENT_PENDING if approving else BookingStatus.CANCELLED
+            )
+            reviewed.append(booking_id)
 
-    return processed, errors
+        if reviewed:
+            values = {
+                "status": BookingStatus.PAYMENT_PENDING if approving else BookingStatus.CANCELLED,
+                "expires_at": now + timedelta(minutes=PAYMENT_HOLD_MINUTES) if approving else None,
+                "decision_at": now,
+            }
+            if note:
+                values["organizer_note"] = note.strip()
+            if reason:
+                values["decision_reason"] = reason.strip()
+            db.execute(
+                update(Booking)
+                .where(Booking.id.in_(reviewed))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            for trip_id, seats in sorted(seat_changes.items()):
+                if not approving:
+                    release_seats(db, trip_id, seats)
+                elif not reserve_seats(db, trip_id, seats):
+                    # The counters are locked above, so this means a corrupt counter.
+                    raise RuntimeError(f"Inventory changed during bulk review of trip {trip_id}")
 
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    if not reviewed:
+        return [], errors
+    processed = {
+        booking.id: booking
+        for booking in (
+            db.query(Booking)
+            .options(joinedload(Booking.trip))
+            .filter(Booking.id.in_(reviewed))
+            .populate_existing()
+            .all()
+        )
+    }
+    return [processed[booking_id] for booking_id in reviewed], errors
@@ -0,0 +1,111 @@
+"""
+Storage for Idempotency-Key replays (see app.services.idempotency).
+
+A key is claimed by inserting its row without a response and committing
+at once; the claim expires after a short lease in case the request never
+finishes. The stored response is written into the same row at the end,
+which also extends it to the full retention. A retry that finds a claim
+without a response knows the original is still running.
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.idempotency_key import IdempotencyKey
+
+
+def claim_idempotency_key(
+    db: Session,
+    *,
+    user_id: str,
+    key: str,
+    scope: str,
+    request_hash: str,
+    expires_at: datetime,
+) -> bool:
+    """
+    Insert the key, or take over an expired row (or lapsed claim) with it,
+    valid until `expires_at`. Returns False if a live row already exists.
+    Caller commits.
+    """
+    statement = insert(IdempotencyKey).values(
+        user_id=user_id,
+        key=key,
+        scope=scope,
+        request_hash=request_hash,
+        expires_at=expires_at,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[IdempotencyKey.user_id, IdempotencyKey.key],
+        set_={
+            "scope": statement.excluded.scope,
+            "request_hash": statement.excluded.request_hash,
+            "status_code": None,
+            "response_body": None,
+            "created_at": func.now(),
+            "expires_at": statement.excluded.expires_at,
+        },
+        where=IdempotencyKey.expires_at <= func.now(),
+    ).returning(IdempotencyKey.key)
+    return db.execute(statement).first() is not None
+
+
+def get_idempotency_record(db: Session, *, user_id: str, key: str) -> Optional[IdempotencyKey]:
+    return db.get(IdempotencyKey, (user_id, key))
+
+
+def store_idempotent_response(
+    db: Session,
+    *,
+    user_id: str,
+    key: str,
+    status_code: int,
+    body: bytes,
+    expires_at: datetime,
+) -> None:
+    """Record the response of a claimed key, kept until `expires_at`. Caller commits."""
+    db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        .values(status_code=status_code, response_body=body, expires_at=expires_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def release_idempotency_key(db: Session, *, user_id: str, key: str) -> None:
+    """Drop an unanswered claim so a retry runs the request again. Caller commits."""
+    db.execute(
+        delete(IdempotencyKey)
+        .where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.status_code.is_(None),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def purge_expired_idempotency_keys(db: Session, *, now: datetime, batch_size: int = 10000) -> int:
+    """
+    Delete keys that expired before `now`, in batches, committing after each.
+    Returns the number of rows deleted.
+    """
+    deleted = 0
+    while True:
+        batch = (
+            select(IdempotencyKey.user_id, IdempotencyKey.key)
+            .where(IdempotencyKey.expires_at < now)
+            .limit(batch_size)
+        )
+        result = db.execute(
+            delete(IdempotencyKey)
+            .where(tuple_(IdempotencyKey.user_id, IdempotencyKey.key).in_(batch))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
@@ -1,14 +1,22 @@
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from typing import List, Optional, Tuple
-from datetime import date
-from sqlalchemy import func, or_, literal
-
+from typing import List, NamedTuple, Optional, Tuple
+from datetime import date, timedelta
+from sqlalchemy import extract, func, tuple_, update
+from sqlalchemy.orm import Query
+
+from app.crud import trip_change_log  # noqa: F401  (logs recorded trip changes on commit)
+from app.crud.availability import create_trip_inventory, get_held_seats
+from app.crud.trip_card import sync_trip_cards
 from app.crud.organizer import organizer_profile_gaps, get_organizer_by_id
+from app.crud.trip_search import TagMode, TripSort, relevance_score, tag_filter, text_search
 from app.models.trip import Trip, TripStatus
-from app.models.booking import Booking, BookingStatus
+from app.models.trip_card import TripCard
+from app.models.trip_inventory import TripInventory
 from app.schemas.trip import TripCreate, TripUpdate
 from app.core.slug import slugify
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.trip_events import TripChangeKind, record_trip_change
 
 def create_trip(db: Session, trip: TripCreate) -> Trip:
     slug_source = f"{trip.title}-{trip.destination}-{trip.start_date}"
@@ -84,6 +92,9 @@ def create_trip(db: Session, trip: TripCreate) -> Trip:
 
     db.add(db_trip)
     try:
+        db.flush()
+        create_trip_inventory(db, db_trip.id)
+        record_trip_change(db, db_trip.id, TripChangeKind.CREATED)
         db.commit()
     except IntegrityError as e:
         db.rollback()
@@ -93,22 +104,60 @@ def create_trip(db: Session, trip: TripCreate) -> Trip:
     return db_trip
 
 
+def _public_trip_filters(slug: str):
+    """Never shows DRAFT trips or past trips."""
+    return (
+        Trip.slug == slug,
+        Trip.is_active.is_(True),
+        Trip.status != TripStatus.DRAFT,
+        Trip.end_date >= date.today(),  # Never show past trips
+    )
+
+
 def get_trip_by_slug(db: Session, slug: str) -> Optional[Trip]:
     """
     Get trip by slug for public display.
     Never shows DRAFT trips or past trips.
     """
-    today = date.today()
-    return (
-        db.query(Trip)
-        .filter(
-            Trip.slug == slug,
-            Trip.is_active.is_(True),
-            Trip.status != TripStatus.DRAFT,
-            Trip.end_date >= today,  # Never show past trips
-        )
+    return db.query(Trip).filter(*_public_trip_filters(slug)).first()
+
+
+class TripVersion(NamedTuple):
+    trip_id: str
+    version: int
+    held_seats: int
+
+
+def get_public_trip_version(db: Session, slug: str) -> Optional[TripVersion]:
+    """
+    Cheap validator lookup for the public trip page (same visibility as
+    get_trip_by_slug). trips.version covers the trip and its images; held
+    seats are included because the page shows availability.
+    """
+    row = (
+        db.query(Trip.id, Trip.version, TripInventory.held_seats)
+        .outerjoin(TripInventory, TripInventory.trip_id == Trip.id)
+        .filter(*_public_trip_filters(slug))
         .first()
     )
+    if row is None:
+        return None
+    trip_id, version, held_seats = row
+    return TripVersion(trip_id=trip_id, version=version, held_seats=int(held_seats or 0))
+
+
+def get_trip_version(db: Session, trip_id: str) -> Optional[int]:
+    return db.query(Trip.version).filter(Trip.id == trip_id).scalar()
+
+
+def bump_trip_version(db: Session, trip_id: str) -> None:
+    """Increment a trip's version after a change to it or its images. Caller commits."""
+    db.execute(
+        update(Trip)
+        .where(Trip.id == trip_id)
+        .values(version=Trip.version + 1, updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
 
 
 def list_trips(db: Session):
@@ -135,9 +184,93 @@ def soft_delete_trip(db: Session, slug: str) -> bool:
         return False
 
     trip.is_active = False
+    bump_trip_version(db, trip.id)
+    sync_trip_cards(db, [trip.id])
+    record_trip_change(db, trip.id, TripChangeKind.DELETED)
     db.commit()
     return True
 
+
+class TripPage(NamedTuple):
+    items: List[TripCard]
+    next_cursor: Optional[str]
+    has_more: bool
+
+
+# Leading column of each keyset sort order; rows are then ordered by
+# (start_date, id). Each order has a matching trip_cards index.
+_SORT_COLUMNS = {
+    TripSort.PRICE_ASC: TripCard.price,
+    TripSort.PRICE_DESC: TripCard.price,
+    TripSort.DURATION: TripCard.duration_days,
+    TripSort.SEATS_LEFT: TripCard.seats_available,
+}
+
+
+def fetch_trip_page(
+    query: Query,
+    *,
+    limit: int = 20,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    sort: TripSort = TripSort.START_DATE,
+    relevance=None,
+) -> TripPage:
+    """
+    Fetch one page of a public trip listing query.
+    Rows are ordered by `sort`, then (start_date, id); price_desc walks the
+    whole key backwards. A cursor continues after the last row of the
+    previous page with a keyset predicate on the same key, served by the
+    matching trip_cards index; offset is ignored then. sort=relevance orders
+    by the `relevance` score and pages with offset only.
+    One extra row is fetched so has_more needs no COUNT.
+    Raises ValueError for a malformed cursor, a cursor from another sort
+    order or a cursor on a relevance sort.
+    """
+    sort_column = _SORT_COLUMNS.get(sort)
+    if sort == TripSort.RELEVANCE:
+        if relevance is None:
+            raise ValueError("Relevance sort is not available for this listing")
+        if cursor:
+            raise ValueError("Cursor pagination is not available for relevance sort")
+        query = query.order_by(relevance.desc(), TripCard.start_date.asc(), TripCard.id.asc())
+    else:
+        key = (TripCard.start_date, TripCard.id)
+        if sort_column is not None:
+            key = (sort_column,) + key
+        if cursor:
+            after = decode_cursor(cursor)
+            if after.sort != sort.value:
+                raise ValueError("Cursor does not match the sort order")
+            after_key = (after.start_date, after.trip_id)
+            if sort_column is not None:
+                after_key = (after.sort_value,) + after_key
+            if sort == TripSort.PRICE_DESC:
+                query = query.filter(tuple_(*key) < tuple_(*after_key))
+            else:
+                query = query.filter(tuple_(*key) > tuple_(*after_key))
+            offset = 0
+        if sort == TripSort.PRICE_DESC:
+            query = query.order_by(*(column.desc() for column in key))
+        else:
+            query = query.order_by(*(column.asc() for column in key))
+
+    rows = query.limit(limit + 1).offset(offset).all()
+    has_more = len(rows) > limit
+    items = rows[:limit]
+
+    next_cursor = None
+    if has_more and sort != TripSort.RELEVANCE:
+        last = items[-1]
+        next_cursor = encode_cursor(
+            last.start_date,
+            last.id,
+            sort=sort.value,
+            sort_value=getattr(last, sort_column.key) if sort_column is not None else None,
+        )
+    return TripPage(items=items, next_cursor=next_cursor, has_more=has_more)
+
+
 def list_trips_filtered(
     db: Session,
     *,
@@ -146,48 +279,73 @@ def list_trips_filtered(
     max_price: Optional[int] = None,
     start_date: Optional[date] = None,
     tags: Optional[List[str]] = None,
+    tag_mode: TagMode = TagMode.ANY,
+    sort: TripSort = TripSort.START_DATE,
     limit: int = 20,
     offset: int = 0,
-) -> List[Trip]:
+) -> List[TripCard]:
     """
     List published trips for public display.
     Never shows DRAFT trips or past trips.
     """
-    today = date.today()
-    query = (
-        db.query(Trip)
-        .filter(
-            Trip.is_active.is_(True),
-            Trip.status == TripStatus.PUBLISHED,
-            Trip.end_date >= today,  # Never show past trips
-        )
+    query = build_trips_filtered_query(
+        db,
+        destination=destination,
+        min_price=min_price,
+        max_price=max_price,
+        start_date=start_date,
+        tags=tags,
+        tag_mode=tag_mode,
     )
+    return fetch_trip_page(
+        query,
+        limit=limit,
+        offset=offset,
+        sort=sort,
+        relevance=trips_filtered_relevance(start_date),
+    ).items
+
+
+def trips_filtered_relevance(start_date: Optional[date] = None):
+    """sort=relevance score for list_trips_filtered: closeness to start_date (or today) and fill rate."""
+    today = date.today()
+    return relevance_score(None, max(start_date, today) if start_date else today)
+
+
+def build_trips_filtered_query(
+    db: Session,
+    *,
+    destination: Optional[str] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    start_date: Optional[date] = None,
+    tags: Optional[List[str]] = None,
+    tag_mode: TagMode = TagMode.ANY,
+) -> Query:
+    """
+    Build the unordered query behind list_trips_filtered.
+    Reads the trip_cards projection, which only holds published, active trips.
+    """
+    today = date.today()
+    query = db.query(TripCard).filter(TripCard.end_date >= today)  # Never show past trips
 
     if destination:
-        query = query.filter(Trip.destination.ilike(f"%{destination}%"))
+        query = query.filter(TripCard.destination.ilike(f"%{destination}%"))
 
     if min_price is not None:
-        query = query.filter(Trip.price >= min_price)
+        query = query.filter(TripCard.price >= min_price)
 
     if max_price is not None:
-        query = query.filter(Trip.price <= max_price)
+        query = query.filter(TripCard.price <= max_price)
 
     if start_date:
-        query = query.filter(Trip.start_date >= start_date)
+        query = query.filter(TripCard.start_date >= start_date)
 
-    # Tag filtering with OR operation (trip must have at least one of the tags)
-    if tags and len(tags) > 0:
-        # Create OR conditions: trip.tags contains any of the requested tags
-        tag_conditions = [Trip.tags.contains([tag]) for tag in tags]
-        query = query.filter(or_(*tag_conditions))
+    # Tag filtering: any (&&) or all (@>) of the requested tags
+    if tags:
+        query = query.filter(tag_filter(tags, tag_mode))
 
-    return (
-        query
-        .order_by(Trip.start_date.asc())
-        .limit(limit)
-        .offset(offset)
-        .all()
-    )
+    return query
 
 
 def search_trips(
@@ -204,14 +362,24 @@ def search_trips(
     max_price: Optional[int] = None,
     min_days: Optional[int] = None,
     max_days: Optional[int] = None,
+    tags: Optional[List[str]] = None,
+    tag_mode: TagMode = TagMode.ANY,
+    sort: Optional[TripSort] = None,
     limit: int = 20,
     offset: int = 0,
-) -> List[Trip]:
+) -> List[TripCard]:
     """
     Optimized trip search with structured filters.
     Only returns PUBLISHED trips with start_date >= today.
     Uses indexed fields only and avoids unnecessary joins.
     
+    Text search: q is matched against the weighted full-text document
+    (title, destination, tags, description, itinerary) with a trigram
+    fallback for typos and partial words.
+
+    Sort: `sort` (see TripSort); defaults to relevance when q is given and
+    to start_date otherwise.
+    
     Supports flexible date filtering:
     - Exact dates: start_date, end_date
     - Flexible range: range_start, range_end (trip dates within range)
@@ -219,33 +387,69 @@ def search_trips(
     
     Duration filtering: min_days, max_days (calculated as end_date - start_date + 1)
     
+    Tag filtering: tags with tag_mode "any" (at least one) or "all" (every tag)
+    
     Future-proofing: Structure allows vector search to be added later
     by extending the query conditions without breaking this API.
     """
-    from datetime import timedelta
+    query, relevance = build_search_trips_query(
+        db,
+        q=q,
+        start_date=start_date,
+        end_date=end_date,
+        range_start=range_start,
+        range_end=range_end,
+        month=month,
+        people=people,
+        min_price=min_price,
+        max_price=max_price,
+        min_days=min_days,
+        max_days=max_days,
+        tags=tags,
+        tag_mode=tag_mode,
+    )
+    if sort is None:
+        sort = TripSort.RELEVANCE if q and q.strip() else TripSort.START_DATE
+    return fetch_trip_page(query, limit=limit, offset=offset, sort=sort, relevance=relevance).items
+
+
+def build_search_trips_query(
+    db: Session,
+    *,
+    q: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    range_start: Optional[date] = None,
+    range_end: Optional[date] = None,
+    month: Optional[str] = None,
+    people: Optional[int] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    min_days: Optional[int] = None,
+    max_days: Optional[int] = None,
+    tags: Optional[List[str]] = None,
+    tag_mode: TagMode = TagMode.ANY,
+):
+    """
+    Build the unordered query behind search_trips over the trip_cards projection.
+    Returns (query, relevance): the sort=relevance score, combining the text
+    rank for q with closeness to the requested dates and the fill rate.
+    """
     from calendar import monthrange
     
     today = date.today()
     
-    # Base query: only PUBLISHED trips with start_date >= today
-    query = (
-        db.query(Trip)
-        .filter(
-            Trip.is_active.is_(True),
-            Trip.status == TripStatus.PUBLISHED,
-            Trip.start_date >= today,  # Only future trips
-        )
-    )
+    # Base query: trip cards (PUBLISHED, active trips) with start_date >= today
+    query = db.query(TripCard).filter(TripCard.start_date >= today)  # Only future trips
     
-    # Text search: q matches title or destination (ILIKE for case-insensitive)
-    if q:
-        q_pattern = f"%{q}%"
-        query = query.filter(
-            or_(
-                Trip.title.ilike(q_pattern),
-                Trip.destination.ilike(q_pattern),
-            )
-        )
+    # Text search: full-text match with trigram fallback, ranked by relevance
+    text_rank = None
+    if q and q.strip():
+        condition, text_rank = text_search(q)
+        query = query.filter(condition)
+
+    # Date the relevance score measures proximity to
+    target_date = today
     
     # Date filtering: Priority order
     # 1. Month filter (YYYY-MM)
@@ -257,72 +461,51 @@ def search_trips(
             last_day = date(year, month_num, monthrange(year, month_num)[1])
             # Trip start_date should be within the month
             query = query.filter(
-                Trip.start_date >= first_day,
-                Trip.start_date <= last_day,
+                TripCard.start_date >= first_day,
+                TripCard.start_date <= last_day,
             )
+            target_date = max(first_day, today)
         except (ValueError, IndexError):
             # Invalid month format, ignore
             pass
     # 2. Flexible range (range_start, range_end)
     elif range_start or range_end:
         if range_start:
-            query = query.filter(Trip.start_date >= range_start)
+            query = query.filter(TripCard.start_date >= range_start)
+            target_date = max(range_start, today)
         if range_end:
-            query = query.filter(Trip.end_date <= range_end)
+            query = query.filter(TripCard.end_date <= range_end)
     # 3. Exact dates (start_date, end_date)
     else:
         if start_date:
-            query = query.filter(Trip.start_date >= start_date)
+            query = query.filter(TripCard.start_date >= start_date)
+            target_date = max(start_date, today)
         if end_date:
-            query = query.filter(Trip.end_date <= end_date)
+            query = query.filter(TripCard.end_date <= end_date)
     
     # Price range filters
     if min_price is not None:
-        query = query.filter(Trip.price >= min_price)
+        query = query.filter(TripCard.price >= min_price)
     
     if max_price is not None:
-        query = query.filter(Trip.price <= max_price)
+        query = query.filter(TripCard.price <= max_price)
     
     # Duration filters: min_days, max_days
-    # Duration = (end_date - start_date + 1)
-    # In PostgreSQL, DATE - DATE returns an INTEGER (number of days)
-    if min_days is not None or max_days is not None:
-        # Calculate duration: PostgreSQL date subtraction returns integer days
-        # We add 1 to include both start and end dates in the count
-        # Using literal(1) to ensure proper SQL generation
-        duration_days = (Trip.end_date - Trip.start_date) + literal(1)
-        
-        if min_days is not None:
-            query = query.filter(duration_days >= min_days)
-        if max_days is not None:
-            query = query.filter(duration_days <= max_days)
+    # duration_days = end_date - start_date + 1 (both dates included), stored
+    if min_days is not None:
+        query = query.filter(TripCard.duration_days >= min_days)
+    if max_days is not None:
+        query = query.filter(TripCard.duration_days <= max_days)
+    
+    # Tag filtering: any (&&) or all (@>) of the requested tags
+    if tags:
+        query = query.filter(tag_filter(tags, tag_mode))
     
     # Availability filter: available_seats >= people
-    # Uses a correlated subquery for efficient filtering
     if people is not None and people > 0:
-        # Correlated subquery to calculate booked seats for each trip
-        booked_seats_subquery = (
-            db.query(func.coalesce(func.sum(Booking.seats_booked), 0))
-            .filter(
-                Booking.trip_id == Trip.id,
-                Booking.status.in_([BookingStatus.PAYMENT_PENDING, BookingStatus.CONFIRMED])
-            )
-            .correlate(Trip)
-            .as_scalar()
-        )
-        
-        # Filter: total_seats - booked_seats >= people
-        query = query.filter(
-            Trip.total_seats - func.coalesce(booked_seats_subquery, 0) >= people
-        )
+        query = query.filter(TripCard.seats_available >= people)
     
-    return (
-        query
-        .order_by(Trip.start_date.asc())
-        .limit(limit)
-        .offset(offset)
-        .all()
-    )
+    return query, relevance_score(text_rank, target_date)
 
 
 def get_trip_by_id(db: Session, trip_id: str) -> Optional[Trip]:
@@ -371,15 +554,7 @@ def list_organizer_trips(
 
 def get_booked_seats_count(db: Session, trip_id: str) -> int:
     """Get count of seats held by approved payment holds or confirmed bookings for a trip."""
-    booked = (
-        db.query(func.coalesce(func.sum(Booking.seats_booked), 0))
-        .filter(
-            Booking.trip_id == trip_id,
-            Booking.status.in_([BookingStatus.PAYMENT_PENDING, BookingStatus.CONFIRMED]),
-        )
-        .scalar()
-    )
-    return int(booked)
+    return get_held_seats(db, trip_id)
 
 
 def update_trip(
@@ -472,6 +647,9 @@ def update_trip(
         trip.slug = new_slug
     
     try:
+        bump_trip_version(db, trip.id)
+        sync_trip_cards(db, [trip.id])
+        record_trip_change(db, trip.id, TripChangeKind.UPDATED)
         db.commit()
         db.refresh(trip)
         return trip
@@ -501,6 +679,9 @@ def publish_trip(db: Session, trip_id: str, organizer_id: str) -> Trip:
         raise ValueError("Trip cannot be published yet: " + "; ".join(blockers))
 
     trip.status = TripStatus.PUBLISHED
+    bump_trip_version(db, trip.id)
+    sync_trip_cards(db, [trip.id])
+    record_trip_change(db, trip.id, TripChangeKind.PUBLISHED)
     db.commit()
     db.refresh(trip)
     return trip
@@ -523,6 +704,9 @@ def archive_trip(db: Session, trip_id: str, organizer_id: str) -> Trip:
         raise ValueError("Only PUBLISHED trips can be archived")
 
     trip.status = TripStatus.ARCHIVED
+    bump_trip_version(db, trip.id)
+    sync_trip_cards(db, [trip.id])
+    record_trip_change(db, trip.id, TripChangeKind.ARCHIVED)
     db.commit()
     db.refresh(trip)
     return trip
@@ -545,6 +729,8 @@ def unarchive_trip(db: Session, trip_id: str, organizer_id: str) -> Trip:
         raise ValueError("Only ARCHIVED trips can be unarchived")
 
     trip.status = TripStatus.DRAFT
+    bump_trip_version(db, trip.id)
+    record_trip_change(db, trip.id, TripChangeKind.UNARCHIVED)
     db.commit()
     db.refresh(trip)
     return trip
@@ -618,80 +804,58 @@ def get_trip_publish_blockers(db: Session, trip: Trip) -> List[str]:
     return blockers
 
 
-def get_weekend_getaways(db: Session) -> List[Trip]:
+# Postgres EXTRACT(dow): 0=Sunday ... 6=Saturday
+_WEEKEND_START_DOWS = (5, 6)  # Friday, Saturday
+_WEEKEND_END_DOWS = (0, 1)  # Sunday, Monday
+WEEKEND_MAX_DAYS = 4
+
+
+def next_weekend_friday(today: date) -> date:
+    """First Friday strictly after `today` (a Friday maps to the following week)."""
+    days_until_friday = (4 - today.weekday()) % 7 or 7
+    return today + timedelta(days=days_until_friday)
+
+
+def get_weekend_getaways(
+    db: Session,
+    *,
+    weekends_ahead: int = 1,
+    today: Optional[date] = None,
+) -> List[TripCard]:
     """
-    Get weekend getaways for the next upcoming weekend.
+    Get weekend getaways for the next `weekends_ahead` upcoming weekends.
     Definition:
     - status == PUBLISHED
     - Starts on Friday or Saturday
     - Ends on Sunday or Monday
     - Duration <= 4 days
-    - Occurs in the NEXT upcoming weekend only
+    - Occurs in one of the next `weekends_ahead` weekends (default: the next one)
+    Reads the trip_cards projection; weekday and duration predicates run in
+    SQL and results are ordered by start date.
     """
-    from datetime import date, timedelta
-    
-    today = date.today()
-    today_weekday = today.weekday()  # 0=Monday, 4=Friday, 6=Sunday
-    
-    # Find next Friday
-    # If today is Friday (4), we want next Friday (7 days away)
-    # If today is Saturday (5), we want next Friday (6 days away)
-    # If today is Sunday (6), we want next Friday (5 days away)
-    # If today is Monday (0), we want next Friday (4 days away)
-    # If today is Tuesday (1), we want next Friday (3 days away)
-    # If today is Wednesday (2), we want next Friday (2 days away)
-    # If today is Thursday (3), we want next Friday (1 day away)
-    
-    if today_weekday == 4:  # Today is Friday
-        days_until_friday = 7
-    elif today_weekday == 5:  # Today is Saturday
-        days_until_friday = 6
-    elif today_weekday == 6:  # Today is Sunday
-        days_until_friday = 5
-    else:  # Monday (0) through Thursday (3)
-        days_until_friday = (4 - today_weekday) % 7
-        if days_until_friday == 0:
-            days_until_friday = 7
-    
-    next_friday = today + timedelta(days=days_until_friday)
-    
-    # Next Monday is 3 days after Friday
-    next_monday = next_friday + timedelta(days=3)
-    
-    # Query trips that:
-    # - Are PUBLISHED and active
-    # - Start date is within the weekend range (Friday to Saturday)
-    # - End date is within the weekend range (Sunday to Monday)
-    # - Start date >= next_friday and end_date <= next_monday
-    query = (
-        db.query(Trip)
+    return build_weekend_getaways_query(db, weekends_ahead=weekends_ahead, today=today).all()
+
+
+def build_weekend_getaways_query(
+    db: Session,
+    *,
+    weekends_ahead: int = 1,
+    today: Optional[date] = None,
+) -> Query:
+    """Build the ordered query behind get_weekend_getaways."""
+    first_friday = next_weekend_friday(today or date.today())
+    last_saturday = first_friday + timedelta(weeks=weekends_ahead - 1, days=1)
+    last_monday = last_saturday + timedelta(days=2)
+
+    return (
+        db.query(TripCard)
         .filter(
-            Trip.is_active.is_(True),
-            Trip.status == TripStatus.PUBLISHED,
-            Trip.start_date >= next_friday,
-            Trip.start_date <= next_friday + timedelta(days=1),  # Friday or Saturday
-            Trip.end_date >= next_monday - timedelta(days=1),  # Sunday or Monday
-            Trip.end_date <= next_monday,
+            # Bounded start_date range, so the index scan stops at the last weekend
+            TripCard.start_date.between(first_friday, last_saturday),
+            TripCard.end_date <= last_monday,
+            extract("dow", TripCard.start_date).in_(_WEEKEND_START_DOWS),
+            extract("dow", TripCard.end_date).in_(_WEEKEND_END_DOWS),
+            TripCard.duration_days <= WEEKEND_MAX_DAYS,
         )
+        .order_by(TripCard.start_date, TripCard.id)
     )
-    
-    trips = query.all()
-    
-    # Filter by:
-    # 1. Start date is Friday (4) or Saturday (5)
-    # 2. End date is Sunday (6) or Monday (0)
-    # 3. Duration <= 4 days
-    weekend_trips = []
-    for trip in trips:
-        start_weekday = trip.start_date.weekday()
-        end_weekday = trip.end_date.weekday()
-        duration = (trip.end_date - trip.start_date).days + 1
-        
-        if (
-            start_weekday in [4, 5]  # Friday or Saturday
-            and end_weekday in [6, 0]  # Sunday or Monday
-            and duration <= 4
-        ):
-            weekend_trips.append(trip)
-    
-    return weekend_trips
@@ -0,0 +1,51 @@
+"""
+Per-day departures for the flexible-date calendar.
+
+One statement: generate_series() produces every day of the month and
+trip_cards is LEFT JOINed on start_date, so days without departures come
+back with a count of 0.
+"""
+from calendar import monthrange
+from datetime import date
+from typing import List
+
+from sqlalchemy import Date, and_, cast, func, select, text
+from sqlalchemy.orm import Session
+
+from app.models.trip_card import TripCard
+
+
+def get_trip_calendar(db: Session, year: int, month: int, *, people: int = 1) -> List[dict]:
+    """
+    For every day of the month: how many listed trips depart that day with
+    at least `people` free seats, and the lowest price among them.
+    Past days have no departures.
+    """
+    first_day = date(year, month, 1)
+    last_day = date(year, month, monthrange(year, month)[1])
+
+    days = func.generate_series(first_day, last_day, text("interval '1 day'")).table_valued("day").alias("days")
+    day = cast(days.c.day, Date)
+
+    statement = (
+        select(
+            day.label("day"),
+            func.count(TripCard.id).label("departures"),
+            func.min(TripCard.price).label("min_price"),
+        )
+        .select_from(days)
+        .outerjoin(
+            TripCard,
+            and_(
+                TripCard.start_date == day,
+                TripCard.start_date >= date.today(),
+                TripCard.seats_available >= people,
+            ),
+        )
+        .group_by(days.c.day)
+        .order_by(days.c.day)
+    )
+    return [
+        {"date": row_day, "departures": departures, "min_price": min_price}
+        for row_day, departures, min_price in db.execute(statement)
+    ]
@@ -0,0 +1,158 @@
+"""
+Maintenance of the trip_cards listing projection.
+
+Write paths call these helpers in the same transaction as the change they
+make, so a committed trip, image or seat change is always visible to the
+public listings. Only published, active trips have a card.
+"""
+from datetime import date
+from typing import Iterable, Iterator, List
+
+from sqlalchemy import delete, exists, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.trip import Trip, TripStatus
+from app.models.trip_card import TripCard
+from app.models.trip_image import TripImage
+from app.models.trip_inventory import TripInventory
+
+# Columns copied from the source select, in insert order.
+_CARD_COLUMNS = (
+    "id",
+    "organizer_id",
+    "slug",
+    "title",
+    "destination",
+    "price",
+    "start_date",
+    "end_date",
+    "duration_days",
+    "tags",
+    "cover_image_url",
+    "total_seats",
+    "seats_available",
+    "version",
+    "search_vector",
+)
+
+
+def _is_listable():
+    return (Trip.is_active.is_(True), Trip.status == TripStatus.PUBLISHED)
+
+
+def _seats_available(total_seats, held_seats):
+    return func.greatest(total_seats - func.coalesce(held_seats, 0), 0)
+
+
+def sync_trip_cards(db: Session, trip_ids: Iterable[str]) -> None:
+    """
+    Upsert the cards of listable trips among `trip_ids` and delete the cards
+    of trips that are no longer listable. Flushes pending ORM changes first.
+    Caller commits.
+    """
+    trip_ids = sorted(set(trip_ids))
+    if not trip_ids:
+        return
+    db.flush()
+
+    cover_image_url = (
+        select(TripImage.image_url)
+        .where(TripImage.trip_id == Trip.id)
+        .order_by(TripImage.position)
+        .limit(1)
+        .scalar_subquery()
+    )
+    source = (
+        select(
+            Trip.id,
+            Trip.organizer_id,
+            Trip.slug,
+            Trip.title,
+            Trip.destination,
+            Trip.price,
+            Trip.start_date,
+            Trip.end_date,
+            Trip.duration_days,
+            Trip.tags,
+            func.coalesce(cover_image_url, Trip.cover_image_url),
+            Trip.total_seats,
+            _seats_available(Trip.total_seats, TripInventory.held_seats),
+            Trip.version,
+            Trip.search_vector,
+        )
+        .outerjoin(TripInventory, TripInventory.trip_id == Trip.id)
+        .where(Trip.id.in_(trip_ids), *_is_listable())
+    )
+    statement = insert(TripCard).from_select(list(_CARD_COLUMNS), source)
+    statement = statement.on_conflict_do_update(
+        index_elements=[TripCard.id],
+        set_={
+            **{name: statement.excluded[name] for name in _CARD_COLUMNS if name != "id"},
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(statement)
+
+    db.execute(
+        delete(TripCard)
+        .where(
+            TripCard.id.in_(trip_ids),
+            ~exists().where(Trip.id == TripCard.id, *_is_listable()),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def sync_trip_card_seats(db: Session, trip_id: str) -> None:
+    """Refresh a card's free seats from the inventory counter. Caller commits."""
+    db.execute(
+        update(TripCard)
+        .where(TripCard.id == trip_id, TripInventory.trip_id == TripCard.id)
+        .values(
+            seats_available=_seats_available(TripCard.total_seats, TripInventory.held_seats),
+            updated_at=func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def get_trip_cards(db: Session, trip_ids: List[str]) -> List[TripCard]:
+    """Cards for `trip_ids` in the given order; ids without a card are skipped."""
+    if not trip_ids:
+        return []
+    cards = {card.id: card for card in db.query(TripCard).filter(TripCard.id.in_(trip_ids))}
+    return [cards[trip_id] for trip_id in trip_ids if trip_id in cards]
+
+
+# Columns of the catalog export, in output order.
+EXPORT_COLUMNS = (
+    TripCard.id,
+    TripCard.slug,
+    TripCard.title,
+    TripCard.destination,
+    TripCard.price,
+    TripCard.start_date,
+    TripCard.end_date,
+    TripCard.duration_days,
+    TripCard.tags,
+    TripCard.cover_image_url,
+    TripCard.total_seats,
+    TripCard.seats_available,
+)
+
+
+def iter_export_batches(db: Session, *, batch_size: int = 500) -> Iterator[list]:
+    """
+    Every listed trip that has not ended, ordered by start date, as batches
+    of EXPORT_COLUMNS rows read through a server-side cursor, so memory use
+    does not grow with the catalog.
+    """
+    statement = (
+        select(*EXPORT_COLUMNS)
+        .where(TripCard.end_date >= date.today())
+        .order_by(TripCard.start_date, TripCard.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for partition in db.execute(statement).partitions():
+        yield partition
@@ -0,0 +1,178 @@
+"""
+Append-only trip change log behind GET /trips/changes.
+
+Every commit that recorded trip changes (see app.core.trip_events) appends
+one trip_changes row per change in the same transaction, just before it
+commits. Writers take no shared lock, so seat reservations on different
+trips never wait on each other to log their changes.
+
+Sequence ids are handed out before commit, so on their own they do not
+commit in order. The feed is therefore ordered by (txid, id), the writing
+transaction's id first, and a reader only returns rows written by
+transactions older than the oldest one still in flight
+(pg_snapshot_xmin). Every transaction that could still add rows has a
+larger txid, so a reader that has passed a position will never later find
+a row appear behind it. A long-running write transaction anywhere in the
+database holds the feed back until it ends.
+"""
+from datetime import datetime
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import BigInteger, String, Text, cast, column, delete, event, func, insert, select, tuple_, values
+from sqlalchemy.orm import Session
+
+from app.core.trip_events import TripChange, pending_trip_changes
+from app.models.trip import Trip
+from app.models.trip_change import TripChangePurge, TripChangeRecord
+from app.models.trip_inventory import TripInventory
+
+class ChangeCursorExpired(ValueError):
+    """The cursor points at changes that retention has already purged."""
+
+
+class ChangeCursor(NamedTuple):
+    """Feed position of the last change a reader has seen."""
+    txid: int
+    change_id: int
+
+
+class TripChangesPage(NamedTuple):
+    items: List[TripChangeRecord]
+    next_cursor: ChangeCursor
+    has_more: bool
+
+
+def encode_change_cursor(cursor: ChangeCursor) -> str:
+    return f"{cursor.txid}-{cursor.change_id}"
+
+
+def decode_change_cursor(cursor: str) -> ChangeCursor:
+    """Raises ValueError if the cursor is malformed."""
+    txid, separator, change_id = cursor.partition("-")
+    if not separator:
+        raise ValueError("Invalid cursor")
+    return ChangeCursor(int(txid), int(change_id))
+
+
+def _visible_horizon():
+    """Transaction id below which every writer has finished."""
+    return select(
+        cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger)
+    ).scalar_subquery()
+
+
+def append_trip_changes(db: Session, changes: List[TripChange]) -> None:
+    """Log `changes` with snapshots of the trips' status, version and free seats. Caller commits."""
+    if not changes:
+        return
+
+    changed = values(
+        column("trip_id", String),
+        column("kind", String),
+        name="changed",
+    ).data([(change.trip_id, change.kind.value) for change in changes])
+    source = (
+        select(
+            changed.c.trip_id,
+            changed.c.kind,
+            cast(Trip.status, String),
+            Trip.version,
+            func.greatest(Trip.total_seats - func.coalesce(TripInventory.held_seats, 0), 0),
+        )
+        .select_from(changed)
+        .outerjoin(Trip, Trip.id == changed.c.trip_id)
+        .outerjoin(TripInventory, TripInventory.trip_id == changed.c.trip_id)
+    )
+    db.execute(
+        insert(TripChangeRecord).from_select(
+            ["trip_id", "kind", "status", "version", "seats_available"], source
+        )
+    )
+
+
+@event.listens_for(Session, "before_commit")
+def _log_pending_trip_changes(session: Session) -> None:
+    changes = pending_trip_changes(session)
+    if not changes:
+        return
+    # Flush first so the snapshots below see this transaction's writes.
+    session.flush()
+    append_trip_changes(session, changes)
+
+
+def get_trip_changes(db: Session, *, since: Optional[ChangeCursor], limit: int) -> TripChangesPage:
+    """
+    Changes after `since` in feed order, oldest first.
+    Raises ChangeCursorExpired if changes after `since` may have been purged.
+    """
+    position = tuple_(TripChangeRecord.txid, TripChangeRecord.id)
+    purged = get_purge_watermark(db)
+    if since and purged and since < purged:
+        # A cursor at the last purged change has missed nothing.
+        raise ChangeCursorExpired("Cursor is older than the change feed retention")
+
+    query = db.query(TripChangeRecord).filter(TripChangeRecord.txid < _visible_horizon())
+    if since:
+        query = query.filter(position > tuple_(since.txid, since.change_id))
+    rows = (
+        query.order_by(TripChangeRecord.txid, TripChangeRecord.id)
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return TripChangesPage(
+        items=rows,
+        next_cursor=ChangeCursor(rows[-1].txid, rows[-1].id) if rows else since or purged or ChangeCursor(0, 0),
+        has_more=has_more,
+    )
+
+
+def get_purge_watermark(db: Session) -> Optional[ChangeCursor]:
+    """Feed position of the last purged change, if anything was purged."""
+    row = (
+        db.query(TripChangePurge.txid, TripChangePurge.change_id)
+        .order_by(TripChangePurge.id.desc())
+        .first()
+    )
+    return ChangeCursor(*row) if row else None
+
+
+def purge_trip_changes(db: Session, *, older_than: datetime, batch_size: int = 10000) -> int:
+    """
+    Delete the transactions logged before `older_than`, oldest first, in
+    batches, committing after each. Whole transactions at the head of the
+    feed are removed, so what remains is always a suffix of it, and each
+    batch records the position of its last deleted change as the purge
+    watermark. Returns the number of rows deleted.
+    """
+    first_kept = (
+        select(TripChangeRecord.txid)
+        .where(TripChangeRecord.changed_at >= older_than)
+        .order_by(TripChangeRecord.changed_at)
+        .limit(1)
+        .scalar_subquery()
+    )
+    horizon = _visible_horizon()
+    bound = func.least(func.coalesce(first_kept, horizon), horizon)
+    deleted = 0
+    while True:
+        batch = (
+            select(TripChangeRecord.id)
+            .where(TripChangeRecord.txid < bound)
+            .order_by(TripChangeRecord.txid, TripChangeRecord.id)
+            .limit(batch_size)
+        )
+        removed = db.execute(
+            delete(TripChangeRecord)
+            .where(TripChangeRecord.id.in_(batch))
+            .returning(TripChangeRecord.txid, TripChangeRecord.id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        if removed:
+            last = max(removed)
+            db.add(TripChangePurge(txid=last[0], change_id=last[1]))
+        db.commit()
+        deleted += len(removed)
+        if len(removed) < batch_size:
+            return deleted
@@ -0,0 +1,123 @@
+"""
+Facet counts for the public search sidebar.
+
+Counts are computed over the same filtered set as search_trips in a single
+statement: tags are expanded with a LEFT JOIN LATERAL unnest() and every
+facet is one GROUPING SETS branch, so trips without tags still count
+towards the price, duration and month facets.
+"""
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import case, func, literal, select, true, tuple_
+from sqlalchemy.orm import Query, Session
+
+from app.models.trip_card import TripCard
+from app.models.trip_tag import TripTag
+
+
+class FacetBucket(NamedTuple):
+    key: str
+    min: Optional[int]
+    max: Optional[int]
+
+
+# Inclusive bounds; None means open-ended.
+PRICE_BUCKETS: List[FacetBucket] = [
+    FacetBucket("under_5000", None, 4999),
+    FacetBucket("5000_9999", 5000, 9999),
+    FacetBucket("10000_19999", 10000, 19999),
+    FacetBucket("20000_49999", 20000, 49999),
+    FacetBucket("50000_plus", 50000, None),
+]
+
+DURATION_BUCKETS: List[FacetBucket] = [
+    FacetBucket("1_day", 1, 1),
+    FacetBucket("2_3_days", 2, 3),
+    FacetBucket("4_7_days", 4, 7),
+    FacetBucket("8_plus_days", 8, None),
+]
+
+
+def _bucket_case(column, buckets: List[FacetBucket]):
+    whens = []
+    for bucket in buckets:
+        if bucket.max is None:
+            continue
+        whens.append((column <= bucket.max, literal(bucket.key)))
+    return case(*whens, else_=literal(buckets[-1].key))
+
+
+def _empty_counts(buckets: List[FacetBucket]) -> Dict[str, int]:
+    return {bucket.key: 0 for bucket in buckets}
+
+
+def get_trip_facets(db: Session, query: Query) -> dict:
+    """
+    Count trips per tag, price bucket, duration bucket and start month
+    for a filtered trip_cards query (see build_search_trips_query).
+    Every known tag and bucket is returned, with 0 when nothing matches.
+    """
+    filtered = query.with_entities(
+        TripCard.id.label("trip_id"),
+        TripCard.tags.label("tags"),
+        _bucket_case(TripCard.price, PRICE_BUCKETS).label("price_bucket"),
+        _bucket_case(TripCard.duration_days, DURATION_BUCKETS).label("duration_bucket"),
+        func.to_char(TripCard.start_date, "YYYY-MM").label("month"),
+    ).subquery("filtered")
+
+    tag = func.unnest(filtered.c.tags).table_valued("tag").lateral("trip_tag")
+    facet_columns = (tag.c.tag, filtered.c.price_bucket, filtered.c.duration_bucket, filtered.c.month)
+
+    statement = (
+        select(
+            *facet_columns,
+            # Bit set per facet column not in the current grouping set.
+            func.grouping(*facet_columns).label("grouping_id"),
+            # Unnest repeats each trip once per tag, so count distinct trips.
+            func.count(filtered.c.trip_id.distinct()).label("trip_count"),
+        )
+        .select_from(filtered.outerjoin(tag, true()))
+        .group_by(
+            func.grouping_sets(
+                tag.c.tag,
+                filtered.c.price_bucket,
+                filtered.c.duration_bucket,
+                filtered.c.month,
+                tuple_(),
+            )
+        )
+    )
+
+    tags = {tag_value.value: 0 for tag_value in TripTag}
+    prices = _empty_counts(PRICE_BUCKETS)
+    durations = _empty_counts(DURATION_BUCKETS)
+    months: Dict[str, int] = {}
+    total = 0
+
+    # grouping_id bits, most significant first: tag, price, duration, month
+    for tag_value, price_bucket, duration_bucket, month, grouping_id, count in db.execute(statement):
+        if grouping_id == 0b0111:
+            if tag_value in tags:
+                tags[tag_value] = count
+        elif grouping_id == 0b1011:
+            prices[price_bucket] = count
+        elif grouping_id == 0b1101:
+            durations[duration_bucket] = count
+        elif grouping_id == 0b1110:
+            months[month] = count
+        elif grouping_id == 0b1111:
+            total = count
+
+    return {
+        "total": total,
+        "tags": [{"key": key, "count": count} for key, count in tags.items()],
+        "price": [
+            {"key": bucket.key, "min": bucket.min, "max": bucket.max, "count": prices[bucket.key]}
+            for bucket in PRICE_BUCKETS
+        ],
+        "duration_days": [
+            {"key": bucket.key, "min": bucket.min, "max": bucket.max, "count": durations[bucket.key]}
+            for bucket in DURATION_BUCKETS
+        ],
+        "months": [{"key": key, "count": months[key]} for key in sorted(months)],
+    }
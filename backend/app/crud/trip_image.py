@@ -2,6 +2,9 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from sqlalchemy import func
 
+from app.core.trip_events import TripChangeKind, record_trip_change
+from app.crud.trip import bump_trip_version
+from app.crud.trip_card import sync_trip_cards
 from app.models.trip_image import TripImage
 from app.models.trip import Trip, TripStatus
 
@@ -55,6 +58,9 @@ def create_trip_image(
     )
     
     db.add(trip_image)
+    bump_trip_version(db, trip_id)
+    sync_trip_cards(db, [trip_id])
+    record_trip_change(db, trip_id, TripChangeKind.IMAGES)
     db.commit()
     db.refresh(trip_image)
     return trip_image
@@ -67,6 +73,9 @@ def delete_trip_image(db: Session, image_id: str) -> bool:
         return False
     
     db.delete(trip_image)
+    bump_trip_version(db, trip_image.trip_id)
+    sync_trip_cards(db, [trip_image.trip_id])
+    record_trip_change(db, trip_image.trip_id, TripChangeKind.IMAGES)
     db.commit()
     return True
 
@@ -101,6 +110,9 @@ def reorder_trip_images(
         if image_id in image_map:
             image_map[image_id].position = position
     
+    bump_trip_version(db, trip_id)
+    sync_trip_cards(db, [trip_id])
+    record_trip_change(db, trip_id, TripChangeKind.IMAGES)
     db.commit()
     
     # Return updated images in order
@@ -0,0 +1,98 @@
+"""
+Postgres text search for public trip discovery.
+
+Queries run against the trip_cards projection. `q` is matched against the
+weighted search document (trips.search_vector, copied to trip_cards.search_vector)
+and falls back to pg_trgm word similarity on title/destination so typos and
+partial words still find trips.
+
+Tag filters compile to a single array predicate (`&&` for any, `@>` for all)
+so the GIN index on trip_cards.tags can serve them.
+
+sort=relevance orders by a composite score computed in SQL (see relevance_score).
+"""
+import enum
+from datetime import date
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Float, cast, func, literal, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.trip_card import TripCard
+
+# Text search configuration used by the trips_search_vector_refresh trigger.
+SEARCH_CONFIG = "english"
+
+# Weight of trigram similarity relative to the full-text rank.
+TRIGRAM_RANK_WEIGHT = 0.5
+
+# Weights of the composite relevance score.
+TEXT_RANK_WEIGHT = 1.0
+DATE_PROXIMITY_WEIGHT = 0.5
+FILL_RATE_WEIGHT = 0.25
+# Date proximity halves when the start date is this many days off target.
+DATE_PROXIMITY_DAYS = 7
+
+
+def text_search(q: str) -> Tuple[ColumnElement, ColumnElement]:
+    """
+    Build the match condition and relevance score for a search query.
+    Returns (condition, relevance); higher relevance is a better match.
+    """
+    q = q.strip()
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    q_literal = literal(q)
+
+    condition = or_(
+        TripCard.search_vector.op("@@")(ts_query),
+        # `<%` is index-assisted word similarity (pg_trgm.word_similarity_threshold).
+        q_literal.op("<%")(TripCard.title),
+        q_literal.op("<%")(TripCard.destination),
+    )
+    # Normalization 32 maps ts_rank into [0, 1) so it combines with similarity.
+    relevance = func.ts_rank(TripCard.search_vector, ts_query, 32) + TRIGRAM_RANK_WEIGHT * func.greatest(
+        func.word_similarity(q_literal, TripCard.title),
+        func.word_similarity(q_literal, TripCard.destination),
+    )
+    return condition, relevance
+
+
+class TagMode(str, enum.Enum):
+    ANY = "any"
+    ALL = "all"
+
+
+def tag_filter(tags: List[str], mode: TagMode = TagMode.ANY) -> ColumnElement:
+    """Match trips having any (overlap) or all (contains) of the given tags."""
+    tags = sorted(set(tags))
+    if mode == TagMode.ALL:
+        return TripCard.tags.contains(tags)
+    return TripCard.tags.overlap(tags)
+
+
+class TripSort(str, enum.Enum):
+    START_DATE = "start_date"
+    PRICE_ASC = "price_asc"
+    PRICE_DESC = "price_desc"
+    DURATION = "duration"
+    SEATS_LEFT = "seats_left"
+    RELEVANCE = "relevance"
+
+
+def relevance_score(text_rank: Optional[ColumnElement], target_date: date) -> ColumnElement:
+    """
+    Composite score for sort=relevance; higher is better. Sums, with the
+    weights above: the text rank (when searching by q), the proximity of
+    the start date to `target_date` in (0, 1], and the trip's fill rate.
+    """
+    days_off = cast(func.abs(TripCard.start_date - target_date), Float)
+    proximity = 1.0 / (1.0 + days_off / DATE_PROXIMITY_DAYS)
+    fill_rate = func.coalesce(
+        cast(TripCard.total_seats - TripCard.seats_available, Float)
+        / func.nullif(TripCard.total_seats, 0),
+        0.0,
+    )
+    score = DATE_PROXIMITY_WEIGHT * proximity + FILL_RATE_WEIGHT * fill_rate
+    if text_rank is not None:
+        score = TEXT_RANK_WEIGHT * text_rank + score
+    return score
@@ -0,0 +1,30 @@
+"""
+Recompute trip inventory counters from the bookings table.
+
+Usage:
+    python -m app.jobs.repair_trip_inventory [trip_id ...]
+"""
+import logging
+import sys
+from typing import List, Optional
+
+from app.crud.availability import repair_trip_inventory
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    trip_ids = list(argv if argv is not None else sys.argv[1:]) or None
+    db = SessionLocal()
+    try:
+        corrected = repair_trip_inventory(db, trip_ids)
+    finally:
+        db.close()
+    logger.info("Trip inventory repair finished: %s counter(s) corrected", corrected)
+    return corrected
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -6,6 +6,7 @@ from pathlib import Path
 import logging
 from urllib.parse import urlparse, urlunparse
 from app.core.config import settings
+from app.core.responses import ORJSONResponse
 from app.api.v1.trips import router as trips_router
 from app.api.v1.organizers import router as organizers_router
 from app.api.v1.bookings import router as bookings_router
@@ -20,6 +21,12 @@ from app.api.v1.organizer_finance import router as organizer_finance_router
 from app.api.v1.organizer_overview import router as organizer_overview_router
 from app.api.v1.trip_images import router as trip_images_router
 from app.api.v1.payments import router as payments_router
+from app.api.v1.home_feed import router as home_feed_router
+from app.services.booking_expiry import start_booking_expiry
+from app.services.discovery_cache import discovery_cache
+from app.services.similar_trips import similar_trips_index
+from app.services.trip_admission import trip_admission
+from app.services.trip_suggestions import start_trip_suggestions, trip_suggestions
 
 # Configure logging
 logging.basicConfig(
@@ -31,7 +38,12 @@ logger = logging.getLogger(__name__)
 # Disable automatic trailing slash redirects globally
 # This prevents 307 redirects that can cause HTTPS → HTTP downgrade issues
 # in production environments behind reverse proxies (Azure App Service/Gunicorn)
-app = FastAPI(title="Trip Discovery API", redirect_slashes=False)
+# Responses are rendered with orjson unless an endpoint returns its own Response.
+app = FastAPI(
+    title="Trip Discovery API",
+    redirect_slashes=False,
+    default_response_class=ORJSONResponse,
+)
 
 # HTTPS Redirect Middleware
 # Ensures all redirect Location headers use HTTPS in production.
@@ -175,6 +187,12 @@ async def startup_event():
     logger.info(f"CORS origins: {cors_origins}")
     logger.info(f"CORS origins count: {len(cors_origins)}")
 
+    # Typeahead index is built and maintained off the request path
+    start_trip_suggestions()
+
+    # Payment holds that run out are released off the request path
+    start_booking_expiry()
+
 # Mount static files for media (only for local environment)
 # In test/prod, images are served from Azure Blob Storage, not local filesystem
 if settings.uses_local_storage:
@@ -187,6 +205,20 @@ if settings.uses_local_storage:
 def health():
     return {"status": "ok"}
 
+@app.get("/health/admission")
+def admission_health():
+    """Per-trip booking admission: queue depth, wait/hold times and 429 counts."""
+    return trip_admission.stats()
+
+@app.get("/health/cache")
+def cache_health():
+    """Hit/miss/eviction counters for tuning the in-process result caches."""
+    return {
+        "discovery": discovery_cache.stats(),
+        "similar_trips": similar_trips_index.stats(),
+        "suggestions": trip_suggestions.stats(),
+    }
+
 app.include_router(
     organizers_router,
     prefix="/api/v1/organizers",
@@ -199,6 +231,12 @@ app.include_router(
     tags=["Trips"],
 )
 
+app.include_router(
+    home_feed_router,
+    prefix="/api/v1/home-feed",
+    tags=["Home Feed"],
+)
+
 app.include_router(
     bookings_router,
     prefix="/api/v1/bookings",
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Stored outcome of a request sent with an Idempotency-Key header, per end
+    user. A row only becomes visible once the original request has finished
+    (see app.services.idempotency), so every committed row carries a
+    response. Rows past expires_at are reclaimed or purged.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(String, primary_key=True)
+    key = Column(String(255), primary_key=True)
+    # Endpoint the key was first used on, e.g. "POST /payments".
+    scope = Column(String(64), nullable=False)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -1,6 +1,7 @@
 ﻿import uuid
 from sqlalchemy import (
     Column,
+    Computed,
     String,
     Integer,
     Date,
@@ -11,9 +12,9 @@ from sqlalchemy import (
     UniqueConstraint,
     Enum as SQLEnum,
 )
-from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from app.db.base import Base
 from app.models.trip_tag import TripTag
 import enum
@@ -44,6 +45,9 @@ class Trip(Base):
 
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
+    # Both dates included. Stored generated column, copied into trip_cards
+    # where an index serves duration filters and sorts.
+    duration_days = Column(Integer, Computed("end_date - start_date + 1", persisted=True))
 
     total_seats = Column(Integer, nullable=False)  # ✅ REQUIRED
 
@@ -58,8 +62,21 @@ class Trip(Base):
     gallery_images = Column(ARRAY(String), nullable=True)
     itinerary = Column(JSONB, nullable=True)
 
+    # Weighted full-text document maintained by the trips_search_vector_refresh
+    # trigger. Deferred so regular loads never fetch it.
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
+
+    # Bumped on every change to the trip or its images; feeds HTTP ETags.
+    version = Column(Integer, nullable=False, server_default="1")
+
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
     deleted_at = Column(DateTime(timezone=True), nullable=True)
 
     # Relationships
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, String, Integer, Date, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import deferred
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class TripCard(Base):
+    """
+    Listing projection of a published, active trip: the columns a trip card
+    renders plus what public filters and ordering need. Rows are upserted or
+    removed whenever the trip, its images or its seat inventory change
+    (see app.crud.trip_card), so discovery reads never touch `trips`.
+    """
+
+    __tablename__ = "trip_cards"
+
+    id = Column(String, ForeignKey("trips.id", ondelete="CASCADE"), primary_key=True)
+    organizer_id = Column(String, nullable=False)
+    slug = Column(String, nullable=False)
+    title = Column(String, nullable=False)
+    destination = Column(String, nullable=False)
+    price = Column(Integer, nullable=False)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    # Copy of the generated trips.duration_days.
+    duration_days = Column(Integer, nullable=False)
+    tags = Column(ARRAY(String), nullable=True)
+    cover_image_url = Column(String, nullable=True)
+    total_seats = Column(Integer, nullable=False)
+    seats_available = Column(Integer, nullable=False)
+    # Copy of trips.version; with seats_available it identifies the card's content.
+    version = Column(Integer, nullable=False, server_default="1")
+    # Copy of trips.search_vector for full-text search without a join.
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
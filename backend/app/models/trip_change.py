@@ -0,0 +1,46 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, text
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class TripChangeRecord(Base):
+    """
+    Append-only log of committed trip changes, served by GET /trips/changes.
+    The feed is ordered by (txid, id): the id of the transaction that wrote
+    the row, then the row's own sequence id. Readers only go up to the oldest
+    transaction still in flight (see app.crud.trip_change_log), so rows never
+    appear behind a position a reader has already passed. status, version
+    and seats_available are snapshots taken with the change. Rows older than
+    TRIP_CHANGES_RETENTION_DAYS are purged.
+    """
+
+    __tablename__ = "trip_changes"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    txid = Column(
+        BigInteger,
+        nullable=False,
+        server_default=text("(pg_current_xact_id()::text)::bigint"),
+    )
+    # No foreign key: records outlive the trip row.
+    trip_id = Column(String, nullable=False)
+    kind = Column(String(16), nullable=False)
+    status = Column(String(16), nullable=True)
+    version = Column(Integer, nullable=True)
+    seats_available = Column(Integer, nullable=True)
+    changed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+
+
+class TripChangePurge(Base):
+    """
+    One row per purged batch of trip_changes: the feed position of the last
+    deleted change. A cursor behind the latest one has missed changes.
+    """
+
+    __tablename__ = "trip_change_purges"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    txid = Column(BigInteger, nullable=False)
+    change_id = Column(BigInteger, nullable=False)
+    purged_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
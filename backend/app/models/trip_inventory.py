@@ -0,0 +1,27 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class TripInventory(Base):
+    """
+    Seats currently held on a trip (PAYMENT_PENDING + CONFIRMED bookings).
+    Maintained transactionally on every booking status transition so
+    availability reads never need to aggregate the bookings table.
+    """
+
+    __tablename__ = "trip_inventory"
+
+    trip_id = Column(String, ForeignKey("trips.id", ondelete="CASCADE"), primary_key=True)
+    held_seats = Column(Integer, nullable=False, server_default="0")
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    __table_args__ = (
+        CheckConstraint("held_seats >= 0", name="ck_trip_inventory_held_seats_non_negative"),
+    )
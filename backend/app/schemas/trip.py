@@ -1,6 +1,6 @@
-from datetime import date
-from pydantic import BaseModel, model_validator
-from typing import Optional, List, Dict, Any
+from datetime import date, datetime
+from pydantic import BaseModel, TypeAdapter, model_validator
+from typing import Optional, List, Dict, Any, Literal
 from app.models.trip_tag import TripTag
 from app.models.trip import TripStatus
 
@@ -77,6 +77,96 @@ class TripResponse(TripBase):
     class Config:
         from_attributes = True
 
+# Built once at import: hot endpoints validate and serialize through these
+# instead of FastAPI's per-request response_model handling.
+TRIP_RESPONSE_ADAPTER = TypeAdapter(TripResponse)
+TRIP_LIST_ADAPTER = TypeAdapter(List[TripResponse])
+
+def map_trip_card_responses(cards) -> List[dict]:
+    """
+    Build listing responses from trip_cards rows.
+    Cards already carry the cover image and free seats; detail-only fields
+    (description, itinerary, gallery, policies) are left out of listings.
+    """
+    return [
+        {
+            "id": card.id,
+            "slug": card.slug,
+            "organizer_id": card.organizer_id,
+            "title": card.title,
+            "destination": card.destination,
+            "price": card.price,
+            "start_date": card.start_date,
+            "end_date": card.end_date,
+            "total_seats": card.total_seats,
+            "available_seats": card.seats_available,
+            "status": TripStatus.PUBLISHED,
+            "tags": card.tags,
+            "cover_image_url": card.cover_image_url,
+        }
+        for card in cards
+    ]
+
+class TripSuggestion(BaseModel):
+    label: str
+    kind: Literal["destination", "title"]
+    trip_count: int
+    slug: Optional[str] = None
+
+TRIP_SUGGESTION_LIST_ADAPTER = TypeAdapter(List[TripSuggestion])
+
+class TripCalendarDay(BaseModel):
+    date: date
+    departures: int
+    min_price: Optional[int] = None
+
+class TripCalendarResponse(BaseModel):
+    month: str
+    people: int
+    days: List[TripCalendarDay]
+
+class TripChangeEntry(BaseModel):
+    seq: int
+    trip_id: str
+    kind: str
+    status: Optional[TripStatus] = None
+    version: Optional[int] = None
+    seats_available: Optional[int] = None
+    changed_at: datetime
+
+class TripChangesResponse(BaseModel):
+    changes: List[TripChangeEntry]
+    next_cursor: str
+    has_more: bool
+
+class HomeFeedSectionResponse(BaseModel):
+    id: str
+    title: str
+    trip_ids: List[str]
+
+class HomeFeedResponse(BaseModel):
+    """Sections reference trips by id; each trip is listed once in `trips`."""
+    sections: List[HomeFeedSectionResponse]
+    trips: List[TripResponse]
+
+HOME_FEED_ADAPTER = TypeAdapter(HomeFeedResponse)
+
+class FacetCount(BaseModel):
+    key: str
+    count: int
+
+class RangeFacetCount(FacetCount):
+    """Count for a bucket with inclusive bounds; None means open-ended."""
+    min: Optional[int] = None
+    max: Optional[int] = None
+
+class TripFacetsResponse(BaseModel):
+    total: int
+    tags: List[FacetCount]
+    price: List[RangeFacetCount]
+    duration_days: List[RangeFacetCount]
+    months: List[FacetCount]
+
 class OrganizerTripResponse(BaseModel):
     id: str
     slug: str
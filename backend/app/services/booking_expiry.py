@@ -0,0 +1,84 @@
+"""
+Background expiry of payment holds.
+
+An approved booking holds its seats as PAYMENT_PENDING until expires_at.
+Holds that run out are expired here, off the request path: every
+BOOKING_EXPIRY_INTERVAL_SECONDS the worker thread expires them in batches
+of BOOKING_EXPIRY_BATCH_SIZE (see expire_stale_holds), fails their open
+payment attempts and returns the seats to the trip. Each batch is its own
+transaction.
+
+Batches are claimed with FOR UPDATE SKIP LOCKED, so every app worker can
+run the thread, and scripts/expire_payment_holds.py can run it from cron
+or as a standalone process, without them blocking each other. Set
+BOOKING_EXPIRY_INTERVAL_SECONDS to 0 to not start it inside the app.
+"""
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.availability import expire_stale_holds
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def expire_payment_holds(db: Session, *, batch_size: Optional[int] = None) -> int:
+    """
+    Expire every hold that has run out, committing after each batch.
+    Returns the number of expired bookings.
+    """
+    batch_size = batch_size or settings.BOOKING_EXPIRY_BATCH_SIZE
+    now = datetime.now(timezone.utc)
+    expired = 0
+    while True:
+        try:
+            batch = expire_stale_holds(db, now=now, batch_size=batch_size)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        expired += batch
+        # A short batch means the backlog is drained; skipped rows are
+        # locked by a request and are picked up on the next run.
+        if batch < batch_size:
+            return expired
+
+
+def run_booking_expiry(
+    stop: threading.Event,
+    *,
+    interval_seconds: float,
+    batch_size: Optional[int] = None,
+) -> None:
+    """Expire holds every `interval_seconds` until `stop` is set."""
+    while not stop.is_set():
+        try:
+            with SessionLocal() as db:
+                expired = expire_payment_holds(db, batch_size=batch_size)
+            if expired:
+                logger.info("Expired %d payment holds", expired)
+        except Exception:
+            logger.exception("Expiring payment holds failed")
+        stop.wait(interval_seconds)
+
+
+_worker_started = threading.Event()
+
+
+def start_booking_expiry(stop: Optional[threading.Event] = None) -> None:
+    """Start the hold expiry thread (once per process, unless disabled)."""
+    if settings.BOOKING_EXPIRY_INTERVAL_SECONDS <= 0 or _worker_started.is_set():
+        return
+    _worker_started.set()
+    threading.Thread(
+        target=run_booking_expiry,
+        args=(stop or threading.Event(),),
+        kwargs={"interval_seconds": settings.BOOKING_EXPIRY_INTERVAL_SECONDS},
+        name="booking-expiry",
+        daemon=True,
+    ).start()
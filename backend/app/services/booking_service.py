@@ -2,11 +2,13 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
 from fastapi import HTTPException, status
-from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.crud.availability import reserve_seats
 from app.models.booking import Booking, BookingStatus
 from app.models.trip import Trip, TripStatus
+from app.services.booking_expiry import expire_payment_holds
+from app.services.trip_admission import admit_booking
 
 
 class BookingService:
@@ -22,15 +24,15 @@ class BookingService:
                 detail="Seats must be greater than zero",
             )
 
+        # Requests for one hot trip queue here instead of on its inventory row.
+        with admit_booking(self.db, trip_id):
+            return self._create_booking(trip_id=trip_id, user_id=user_id, seats=seats)
+
+    def _create_booking(self, *, trip_id: str, user_id: str, seats: int) -> Booking:
         now = datetime.now(timezone.utc)
 
         try:
-            trip = (
-                self.db.query(Trip)
-                .filter(Trip.id == trip_id)
-                .with_for_update()
-                .first()
-            )
+            trip = self.db.query(Trip).filter(Trip.id == trip_id).first()
             if not trip:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
             if not trip.is_active:
@@ -44,18 +46,7 @@ class BookingService:
                     detail="Trip is not open for bookings",
                 )
 
-            self._expire_stale_for_trip(trip_id=trip.id, now=now)
-
-            held_seats = (
-                self.db.query(func.coalesce(func.sum(Booking.seats_booked), 0))
-                .filter(
-                    Booking.trip_id == trip.id,
-                    Booking.status.in_([BookingStatus.PAYMENT_PENDING, BookingStatus.CONFIRMED]),
-                )
-                .scalar()
-            )
-            held_seats = int(held_seats or 0)
-            if held_seats + seats > trip.total_seats:
+            if not reserve_seats(self.db, trip.id, seats):
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
                     detail="Not enough seats available",
@@ -87,28 +78,4 @@ class BookingService:
             ) from exc
 
     def expire_stale_bookings(self) -> int:
-        now = datetime.now(timezone.utc)
-        try:
-            updated_count = (
-                self.db.query(Booking)
-                .filter(
-                    Booking.status == BookingStatus.PAYMENT_PENDING,
-                    Booking.expires_at < now,
-                )
-                .update({Booking.status: BookingStatus.EXPIRED}, synchronize_session=False)
-            )
-            self.db.commit()
-            return int(updated_count or 0)
-        except Exception:
-            self.db.rollback()
-            raise
-
-    def _expire_stale_for_trip(self, *, trip_id: str, now: datetime) -> None:
-        self.db.query(Booking).filter(
-            Booking.trip_id == trip_id,
-            Booking.status == BookingStatus.PAYMENT_PENDING,
-            Booking.expires_at < now,
-        ).update(
-            {Booking.status: BookingStatus.EXPIRED},
-            synchronize_session=False,
-        )
+        return expire_payment_holds(self.db)
@@ -0,0 +1,77 @@
+"""
+Result cache for the public discovery endpoints (listing, search, facets,
+weekend feed).
+
+Entries are keyed by the normalized filter tuple plus today's date and are
+invalidated from committed trip changes:
+- publishing or editing a trip can make it match any filter, so it clears
+  the cache;
+- image changes, archive/delete drop results that contain the trip and
+  aggregate results (facet counts);
+- seat changes drop results that contain the trip, plus results whose
+  filters depend on free seats.
+The TTL bounds staleness across worker processes, which do not share entries.
+"""
+from datetime import date, datetime, timedelta
+from typing import Any, Hashable, List, Tuple
+
+from app.core.cache import ResultCache
+from app.core.config import settings
+from app.core.trip_events import TripChange, TripChangeKind, add_trip_change_listener
+
+discovery_cache = ResultCache(
+    "discovery",
+    max_entries=settings.DISCOVERY_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.DISCOVERY_CACHE_TTL_SECONDS,
+)
+
+
+# Text filters matched case-insensitively (ILIKE / full-text / trigram).
+_CASE_INSENSITIVE_FILTERS = {"q", "destination"}
+
+
+def _normalize(name: str, value: Any) -> Hashable:
+    if isinstance(value, str):
+        value = value.strip()
+        return value.lower() if name in _CASE_INSENSITIVE_FILTERS else value
+    if isinstance(value, (list, tuple, set)):
+        return tuple(sorted(_normalize(name, item) for item in value))
+    return value
+
+
+def discovery_cache_key(endpoint: str, **filters: Any) -> Tuple[Hashable, ...]:
+    """Build a cache key from an endpoint name and its filters, ignoring unset ones."""
+    normalized = tuple(
+        (name, _normalize(name, value))
+        for name, value in sorted(filters.items())
+        if value is not None and value != [] and value != ""
+    )
+    return (endpoint, date.today().isoformat(), normalized)
+
+
+def seconds_until_tomorrow() -> float:
+    """
+    TTL for day-scoped results (weekend feed), capped by
+    DAY_SCOPED_CACHE_MAX_TTL_SECONDS so other workers pick up changes.
+    """
+    now = datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return min((midnight - now).total_seconds(), settings.DAY_SCOPED_CACHE_MAX_TTL_SECONDS)
+
+
+# Changes that can make a trip match filters it did not match before.
+_REMATCHING_CHANGES = {TripChangeKind.PUBLISHED, TripChangeKind.UPDATED}
+
+
+def _invalidate_for_changes(changes: List[TripChange]) -> None:
+    if any(change.kind in _REMATCHING_CHANGES for change in changes):
+        discovery_cache.clear()
+        return
+    discovery_cache.invalidate_trips(
+        {change.trip_id for change in changes},
+        include_seat_sensitive=any(change.kind == TripChangeKind.INVENTORY for change in changes),
+        include_aggregates=any(change.kind != TripChangeKind.INVENTORY for change in changes),
+    )
+
+
+add_trip_change_listener(_invalidate_for_changes)
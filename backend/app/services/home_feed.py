@@ -0,0 +1,95 @@
+"""
+Homepage feed: every homepage section in one request.
+
+Each configured section is a trip_cards listing query (the same builders as
+/trips and /trips/weekend-getaways, ordered by start date). The sections'
+top ids are read with one UNION ALL query, then the distinct cards are
+hydrated with a single lookup, so a trip that appears in several sections
+is loaded and sent once.
+"""
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.orm import Query, Session
+
+from app.crud.trip import build_trips_filtered_query, build_weekend_getaways_query
+from app.crud.trip_card import get_trip_cards
+from app.models.trip_card import TripCard
+from app.models.trip_tag import TripTag
+
+
+class HomeFeedSection(NamedTuple):
+    id: str
+    title: str
+    limit: int
+    tags: Optional[Tuple[str, ...]] = None
+    max_price: Optional[int] = None
+    weekend: bool = False
+
+
+# Homepage sections, in display order.
+HOME_FEED_SECTIONS: Tuple[HomeFeedSection, ...] = (
+    HomeFeedSection("weekend", "This Weekend", limit=5, weekend=True),
+    HomeFeedSection("upcoming", "Upcoming Trips", limit=5),
+    HomeFeedSection("trekking", "Trekking Adventures", limit=6, tags=(TripTag.TREK.value,)),
+    HomeFeedSection("budget", "Under 15000", limit=6, max_price=15000),
+    HomeFeedSection("stargazing", "Stargazing & Experiences", limit=5, tags=(TripTag.STARGAZING.value,)),
+    HomeFeedSection("solo", "Solo Travel Friendly", limit=6, tags=(TripTag.SOLO.value,)),
+)
+
+
+class HomeFeed(NamedTuple):
+    sections: List[Tuple[HomeFeedSection, List[str]]]  # each section's trip ids, in order
+    cards: List[TripCard]  # distinct cards, in order of first appearance
+
+
+def _section_query(db: Session, section: HomeFeedSection) -> Query:
+    if section.weekend:
+        return build_weekend_getaways_query(db)
+    return build_trips_filtered_query(
+        db,
+        max_price=section.max_price,
+        tags=list(section.tags) if section.tags else None,
+    )
+
+
+def _section_ids(db: Session, section: HomeFeedSection):
+    order = (TripCard.start_date, TripCard.id)
+    top = (
+        _section_query(db, section)
+        .with_entities(
+            TripCard.id.label("trip_id"),
+            func.row_number().over(order_by=order).label("position"),
+        )
+        .order_by(None)
+        .order_by(*order)
+        .limit(section.limit)
+        .subquery()
+    )
+    return select(literal(section.id).label("section_id"), top.c.trip_id, top.c.position)
+
+
+def load_home_feed(db: Session, sections=HOME_FEED_SECTIONS) -> HomeFeed:
+    """Top trips of every section: one query for the ids, one for the cards."""
+    rows = db.execute(union_all(*(_section_ids(db, section) for section in sections))).all()
+
+    ids_by_section: Dict[str, List[Tuple[int, str]]] = {}
+    for section_id, trip_id, position in rows:
+        ids_by_section.setdefault(section_id, []).append((position, trip_id))
+
+    ordered_ids = {
+        section.id: [trip_id for _, trip_id in sorted(ids_by_section.get(section.id, []))]
+        for section in sections
+    }
+    distinct_ids = list(dict.fromkeys(trip_id for ids in ordered_ids.values() for trip_id in ids))
+    cards = get_trip_cards(db, distinct_ids)
+
+    # A card unlisted between the two queries is dropped from its sections too.
+    listed = {card.id for card in cards}
+    return HomeFeed(
+        sections=[
+            (section, [trip_id for trip_id in ordered_ids[section.id] if trip_id in listed])
+            for section in sections
+        ],
+        cards=cards,
+    )
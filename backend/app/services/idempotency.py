@@ -0,0 +1,192 @@
+"""
+Idempotency-Key support for the booking and payment creation endpoints.
+
+A client that retries a POST with the same Idempotency-Key gets the stored
+response of the first attempt instead of running the request again. A retry
+that arrives while the first attempt is still running waits for it (up to
+IDEMPOTENCY_WAIT_SECONDS) and then replays its response.
+
+Keys are per end user and expire after IDEMPOTENCY_KEY_TTL_HOURS. Responses
+with a 2xx or 4xx status are stored; a 5xx, a 429 (booking admission asking
+the client to retry) or an unexpected error releases the key so the retry
+runs again. Reusing a key for a different request body
+or endpoint is rejected with 422.
+
+Everything runs on the request's own session: the claim is committed in a
+short transaction of its own before the handler runs, and the response is
+stored in another one after it, so a keyed request never needs a second
+pooled connection. A waiting retry ends its transaction between polls and
+holds no connection while it sleeps.
+"""
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+
+import orjson
+from fastapi import Header, HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.responses import ORJSONResponse, PreSerializedJSONResponse
+from app.crud.idempotency_key import (
+    claim_idempotency_key,
+    get_idempotency_record,
+    release_idempotency_key,
+    store_idempotent_response,
+)
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# Errors that tell the client to retry; the key is released, not stored.
+_RETRY_LATER_STATUSES = {status.HTTP_429_TOO_MANY_REQUESTS}
+
+# A retry re-checks an in-flight key after this long, doubling up to the max.
+_POLL_INITIAL_SECONDS = 0.05
+_POLL_MAX_SECONDS = 0.5
+
+
+def idempotency_key_header(
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias=IDEMPOTENCY_KEY_HEADER,
+        min_length=1,
+        max_length=255,
+        description="Client-generated key; retries with the same key replay the first response",
+    ),
+) -> Optional[str]:
+    return idempotency_key
+
+
+def request_hash(scope: str, request: Any) -> str:
+    """Fingerprint of an endpoint and its (JSON-compatible) request."""
+    document = orjson.dumps(
+        {"scope": scope, "request": jsonable_encoder(request)},
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return hashlib.sha256(document).hexdigest()
+
+
+def _render(content: Any) -> bytes:
+    return ORJSONResponse(jsonable_encoder(content)).body
+
+
+def _claim_or_wait(db: Session, *, user_id: str, key: str, scope: str, fingerprint: str):
+    """
+    Claim the key (returns None), or wait for the request that holds it and
+    return its stored (status_code, body).
+    """
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    delay = _POLL_INITIAL_SECONDS
+    while True:
+        try:
+            claimed = claim_idempotency_key(
+                db,
+                user_id=user_id,
+                key=key,
+                scope=scope,
+                request_hash=fingerprint,
+                expires_at=datetime.now(timezone.utc) + timedelta(seconds=settings.IDEMPOTENCY_CLAIM_SECONDS),
+            )
+            if claimed:
+                db.commit()
+                return None
+            record = get_idempotency_record(db, user_id=user_id, key=key)
+            stored = record and (record.scope, record.request_hash, record.status_code, record.response_body)
+            db.rollback()
+        except Exception:
+            db.rollback()
+            raise
+
+        if stored:
+            stored_scope, stored_hash, stored_status, stored_body = stored
+            if stored_scope != scope or stored_hash != fingerprint:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                    detail="Idempotency-Key was already used for a different request",
+                )
+            if stored_status is not None:
+                return stored_status, stored_body
+        # else: released or purged in between; the next attempt claims it.
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress",
+                headers={"Retry-After": "1"},
+            )
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, _POLL_MAX_SECONDS)
+
+
+def _finish(db: Session, write: Callable[[], None]) -> None:
+    try:
+        write()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def run_idempotent(
+    db: Session,
+    *,
+    key: Optional[str],
+    user_id: str,
+    scope: str,
+    request: Any,
+    handler: Callable[[], Any],
+    status_code: int = status.HTTP_200_OK,
+):
+    """
+    Run `handler` at most once per (user_id, key).
+    Without a key the handler's result is returned unchanged. With one, the
+    JSON response is returned (and stored) as bytes with `status_code`.
+    """
+    if key is None:
+        return handler()
+
+    fingerprint = request_hash(scope, request)
+    stored = _claim_or_wait(db, user_id=user_id, key=key, scope=scope, fingerprint=fingerprint)
+    if stored:
+        stored_status, stored_body = stored
+        return PreSerializedJSONResponse(
+            stored_body,
+            status_code=stored_status,
+            headers={REPLAYED_HEADER: "true"},
+        )
+
+    def store(response_status: int, body: bytes) -> None:
+        store_idempotent_response(
+            db,
+            user_id=user_id,
+            key=key,
+            status_code=response_status,
+            body=body,
+            expires_at=datetime.now(timezone.utc) + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+        )
+
+    def release() -> None:
+        release_idempotency_key(db, user_id=user_id, key=key)
+
+    try:
+        result = handler()
+    except HTTPException as exc:
+        db.rollback()
+        error_status, error_body = exc.status_code, _render({"detail": exc.detail})
+        if error_status < 500 and error_status not in _RETRY_LATER_STATUSES:
+            _finish(db, lambda: store(error_status, error_body))
+        else:
+            _finish(db, release)
+        raise
+    except Exception:
+        db.rollback()
+        _finish(db, release)
+        raise
+
+    body = _render(result)
+    _finish(db, lambda: store(status_code, body))
+    return PreSerializedJSONResponse(body, status_code=status_code)
@@ -8,6 +8,7 @@ from fastapi import HTTPException, status
 from sqlalchemy.orm import Session, joinedload
 
 from app.core.config import settings
+from app.crud.availability import get_available_seats_for_trips
 from app.crud.organizer import (
     organizer_can_submit_verification,
     organizer_verification_checklist,
@@ -429,17 +430,11 @@ def build_organizer_overview(db: Session, organizer: Organizer) -> OrganizerFina
         .limit(5)
         .all()
     )
+    available_by_trip = get_available_seats_for_trips(db, upcoming_trip_rows)
     upcoming_trips = []
     for trip in upcoming_trip_rows:
-        confirmed_seats = (
-            db.query(Booking)
-            .filter(
-                Booking.trip_id == trip.id,
-                Booking.status.in_([BookingStatus.PAYMENT_PENDING, BookingStatus.CONFIRMED]),
-            )
-            .all()
-        )
-        booked_seats = sum(int(booking.seats_booked or 0) for booking in confirmed_seats)
+        available_seats = available_by_trip.get(trip.id, 0)
+        booked_seats = max(int(trip.total_seats or 0) - available_seats, 0)
         upcoming_trips.append(
             OrganizerOverviewUpcomingTrip(
                 id=trip.id,
@@ -448,7 +443,7 @@ def build_organizer_overview(db: Session, organizer: Organizer) -> OrganizerFina
                 destination=trip.destination,
                 booked_seats=booked_seats,
                 total_seats=int(trip.total_seats or 0),
-                available_seats=max(int(trip.total_seats or 0) - booked_seats, 0),
+                available_seats=available_seats,
             )
         )
 
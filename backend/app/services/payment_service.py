@@ -7,6 +7,7 @@ from fastapi import HTTPException, status
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
 
+from app.crud.availability import release_seats
 from app.models.booking import Booking, BookingStatus
 from app.models.payment import Payment, PaymentStatus
 from app.models.payment_event import PaymentEvent
@@ -77,6 +78,7 @@ class PaymentService:
                 )
             if booking.expires_at and booking.expires_at < now:
                 booking.status = BookingStatus.EXPIRED
+                release_seats(self.db, booking.trip_id, booking.seats_booked)
                 self.db.commit()
                 self.db.refresh(booking)
                 raise HTTPException(
@@ -183,6 +185,7 @@ class PaymentService:
 
             if booking.status == BookingStatus.PAYMENT_PENDING and booking.expires_at and booking.expires_at < now:
                 booking.status = BookingStatus.EXPIRED
+                release_seats(self.db, booking.trip_id, booking.seats_booked)
                 payment.status = PaymentStatus.FAILED
                 self._record_event(
                     payment=payment,
@@ -0,0 +1,457 @@
+"""
+In-process similar-trips index.
+
+Each listed trip (a trip_cards row) is turned into a hashed n-gram vector
+built from its title, destination, description, tags and itinerary: word
+unigrams and bigrams are hashed into SIMILAR_TRIPS_DIMENSIONS signed
+buckets, weighted per field with sublinear term frequency, and
+L2-normalized. Vectors are rows of one float32 NumPy matrix, so cosine
+similarity is a matrix-vector product followed by a partial sort.
+
+Hashed vectors are dense (most buckets are non-zero), so an exact scan of
+100k trips reads the whole ~100 MB matrix per query. Over more than
+SIMILAR_TRIPS_CANDIDATES trips, a query instead scores only its heaviest
+SIMILAR_TRIPS_QUERY_BUCKETS buckets against a transposed copy of the
+matrix, where each bucket is one contiguous row, and ranks the best
+SIMILAR_TRIPS_CANDIDATES of those exactly. The transposed copy doubles the
+memory of the index.
+
+Only upcoming trips are kept: rows whose start date has passed are dropped
+once a day, so queries never pay for past trips. Results are remembered per
+(trip, limit) until the index next changes, so repeat views of a trip's
+page skip the scan.
+
+The index is built on first use and kept current incrementally:
+- committed trip changes in this process mark the trip stale, and stale
+  trips are re-read before the next query;
+- every SIMILAR_TRIPS_SYNC_SECONDS the trip_cards versions are compared
+  with the indexed ones, which picks up changes made by other workers.
+Trips are read and vectorized outside the lock queries take, so a build,
+sync or reload only blocks them while its result is swapped in.
+"""
+import logging
+import math
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.trip_events import TripChange, TripChangeKind, add_trip_change_listener
+from app.models.trip import Trip
+from app.models.trip_card import TripCard
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+_STOP_WORDS = frozenset(
+    "a an and are as at be by day for from in is it of on or our the this to we with you your".split()
+)
+
+# Relative weight of each field's n-grams.
+_FIELD_WEIGHTS = {
+    "title": 3.0,
+    "destination": 3.0,
+    "tags": 2.0,
+    "description": 1.0,
+    "itinerary": 1.0,
+}
+
+# Changes that can alter a trip's text or whether it is listed.
+_INDEXED_CHANGES = {
+    TripChangeKind.PUBLISHED,
+    TripChangeKind.UPDATED,
+    TripChangeKind.ARCHIVED,
+    TripChangeKind.UNARCHIVED,
+    TripChangeKind.DELETED,
+}
+
+_LOAD_BATCH = 1000
+# Remembered results; the whole memo is dropped whenever the index changes.
+_MAX_MEMOIZED = 4096
+
+# (trip_id, vector, start day ordinal, trip_cards version)
+_Entry = Tuple[str, np.ndarray, int, int]
+
+
+def _tokens(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return [token for token in _TOKEN.findall(text.lower()) if token not in _STOP_WORDS]
+
+
+def _ngrams(tokens: List[str]) -> Iterable[str]:
+    yield from tokens
+    for first, second in zip(tokens, tokens[1:]):
+        yield f"{first} {second}"
+
+
+def _itinerary_text(itinerary) -> str:
+    if not itinerary:
+        return ""
+    parts = []
+    for item in itinerary:
+        if isinstance(item, dict):
+            parts.append(str(item.get("title") or ""))
+            parts.append(str(item.get("description") or ""))
+    return " ".join(parts)
+
+
+def trip_features(title, destination, description, tags, itinerary) -> Dict[str, float]:
+    """Weighted n-gram features of a trip's text."""
+    fields = {
+        "title": _tokens(title),
+        "destination": _tokens(destination),
+        "tags": [f"tag:{tag}".lower() for tag in tags or []],
+        "description": _tokens(description),
+        "itinerary": _tokens(_itinerary_text(itinerary)),
+    }
+    features: Dict[str, float] = Counter()
+    for field, tokens in fields.items():
+        grams = Counter(tokens) if field == "tags" else Counter(_ngrams(tokens))
+        for gram, count in grams.items():
+            features[f"{field[0]}:{gram}"] += _FIELD_WEIGHTS[field] * (1.0 + math.log(count))
+    return features
+
+
+def hash_features(features: Dict[str, float], dimensions: int) -> np.ndarray:
+    """Signed feature hashing into a unit-length float32 vector."""
+    vector = np.zeros(dimensions, dtype=np.float32)
+    if not features:
+        return vector
+    hashes = np.fromiter(
+        (zlib.crc32(feature.encode("utf-8")) for feature in features),
+        dtype=np.uint32,
+        count=len(features),
+    )
+    signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+    weights = np.fromiter(features.values(), dtype=np.float32, count=len(features))
+    np.add.at(vector, (hashes & 0x7FFFFFFF) % dimensions, signs * weights)
+    norm = np.linalg.norm(vector)
+    if norm:
+        vector /= norm
+    return vector
+
+
+class _TripVectors:
+    """
+    Vectors of the indexed trips. Rows [0, size) of `matrix` are live;
+    removal moves the last row into the gap. `columns` holds the same
+    values transposed, so one hash bucket of every trip is a contiguous run.
+    """
+
+    def __init__(self, dimensions: int, capacity: int = 0):
+        self.matrix = np.zeros((capacity, dimensions), dtype=np.float32)
+        self.columns = np.zeros((dimensions, capacity), dtype=np.float32)
+        self.start_days = np.zeros(capacity, dtype=np.int32)
+        self.trip_ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.versions: Dict[str, int] = {}
+        self.size = 0
+
+    @classmethod
+    def build(cls, dimensions: int, entries: Iterable[_Entry]) -> "_TripVectors":
+        entries = list(entries)
+        vectors = cls(dimensions, max(1024, len(entries) + len(entries) // 8))
+        for row, (trip_id, vector, start_day, version) in enumerate(entries):
+            vectors.matrix[row] = vector
+            vectors.start_days[row] = start_day
+            vectors.trip_ids.append(trip_id)
+            vectors.rows[trip_id] = row
+            vectors.versions[trip_id] = version
+        vectors.size = len(entries)
+        vectors.columns = np.ascontiguousarray(vectors.matrix.T)
+        return vectors
+
+    def upsert(self, trip_id: str, vector: np.ndarray, start_day: int, version: int) -> None:
+        row = self.rows.get(trip_id)
+        if row is None:
+            if self.size == len(self.matrix):
+                self._grow()
+            row = self.size
+            self.size += 1
+            self.rows[trip_id] = row
+            self.trip_ids.append(trip_id)
+        self.matrix[row] = vector
+        self.columns[:, row] = vector
+        self.start_days[row] = start_day
+        self.versions[trip_id] = version
+
+    def remove(self, trip_id: str) -> None:
+        row = self.rows.pop(trip_id, None)
+        if row is None:
+            return
+        self.versions.pop(trip_id, None)
+        last = self.size - 1
+        if row != last:
+            moved = self.trip_ids[last]
+            self.matrix[row] = self.matrix[last]
+            self.columns[:, row] = self.columns[:, last]
+            self.start_days[row] = self.start_days[last]
+            self.trip_ids[row] = moved
+            self.rows[moved] = row
+        self.trip_ids.pop()
+        self.size = last
+
+    def _grow(self) -> None:
+        capacity = max(1024, len(self.matrix) * 2)
+        matrix = np.zeros((capacity, self.matrix.shape[1]), dtype=np.float32)
+        matrix[: self.size] = self.matrix[: self.size]
+        columns = np.zeros((self.columns.shape[0], capacity), dtype=np.float32)
+        columns[:, : self.size] = self.columns[:, : self.size]
+        start_days = np.zeros(capacity, dtype=np.int32)
+        start_days[: self.size] = self.start_days[: self.size]
+        self.matrix, self.columns, self.start_days = matrix, columns, start_days
+
+
+class SimilarTripsIndex:
+    def __init__(
+        self,
+        *,
+        dimensions: int,
+        sync_seconds: float,
+        query_buckets: int,
+        candidates: int,
+        clock=time.monotonic,
+    ):
+        self.dimensions = dimensions
+        self.sync_seconds = sync_seconds
+        self.query_buckets = query_buckets
+        self.candidates = candidates
+        self._clock = clock
+        # Guards the fields below; held only while answering a query or
+        # swapping in a refresh, never while reading trips.
+        self._lock = threading.Lock()
+        # Held by the one thread building, syncing or reloading stale trips.
+        self._refresh_lock = threading.Lock()
+        self._vectors = _TripVectors(dimensions)
+        self._built = False
+        self._synced_at = 0.0
+        self._stale: Set[str] = set()
+        self._pruned_day = 0
+        self._memo: Dict[Tuple[str, int], List[Tuple[str, float]]] = {}
+
+    def vectorize(self, trip: Trip) -> np.ndarray:
+        return hash_features(
+            trip_features(trip.title, trip.destination, trip.description, trip.tags, trip.itinerary),
+            self.dimensions,
+        )
+
+    def similar(self, db: Session, trip: Trip, *, limit: int) -> List[Tuple[str, float]]:
+        """
+        Up to `limit` (trip_id, score) pairs of listed, upcoming trips most
+        similar to `trip`, best first. The trip itself is excluded.
+        """
+        self._refresh(db)
+        with self._lock:
+            vectors = self._vectors
+            if not vectors.size:
+                return []
+            memo_key = (trip.id, limit)
+            matches = self._memo.get(memo_key)
+            if matches is not None:
+                return matches
+
+            query = self.vectorize(trip)
+            if not query.any():
+                return []
+            rows, scores = self._score(vectors, query)
+            own = vectors.rows.get(trip.id)
+            if own is not None:
+                scores[rows == own] = -np.inf
+            limit = min(limit, len(rows))
+            top = np.argpartition(scores, -limit)[-limit:]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            matches = [
+                (vectors.trip_ids[rows[index]], float(scores[index]))
+                for index in top
+                if scores[index] > 0
+            ]
+            if len(self._memo) >= _MAX_MEMOIZED:
+                self._memo.clear()
+            self._memo[memo_key] = matches
+            return matches
+
+    def mark_stale(self, trip_ids: Iterable[str]) -> None:
+        with self._lock:
+            if self._built:
+                self._stale.update(trip_ids)
+
+    def stats(self) -> dict:
+        with self._lock:
+            vectors = self._vectors
+            if vectors.size <= self.candidates or not self.query_buckets:
+                scanned = vectors.size * self.dimensions
+            else:
+                scanned = (self.query_buckets * vectors.size) + (self.candidates * self.dimensions)
+            return {
+                "trips": vectors.size,
+                "dimensions": self.dimensions,
+                "query_buckets": self.query_buckets,
+                "candidates": self.candidates,
+                "matrix_bytes": int(vectors.matrix.nbytes + vectors.columns.nbytes),
+                "scanned_bytes": int(scanned * vectors.matrix.itemsize),
+                "memoized": len(self._memo),
+                "built": self._built,
+                "stale": len(self._stale),
+            }
+
+    def _score(self, vectors: _TripVectors, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rows to rank and their cosine similarity to `query`. Caller holds
+        self._lock.
+        """
+        size = vectors.size
+        if size <= self.candidates or not self.query_buckets:
+            return np.arange(size), vectors.matrix[:size] @ query
+        buckets = np.flatnonzero(query)
+        if len(buckets) > self.query_buckets:
+            heaviest = np.argpartition(-np.abs(query[buckets]), self.query_buckets)
+            buckets = buckets[heaviest[: self.query_buckets]]
+        # First pass: the query's heaviest buckets across every trip, one
+        # contiguous column row at a time (a fancy-indexed product would
+        # copy them first).
+        columns = vectors.columns
+        rough = columns[buckets[0], :size] * query[buckets[0]]
+        for bucket in buckets[1:]:
+            rough += query[bucket] * columns[bucket, :size]
+        rows = np.argpartition(rough, -self.candidates)[-self.candidates:]
+        # Exact cosine for the shortlist.
+        return rows, vectors.matrix[rows] @ query
+
+    def _refresh(self, db: Session) -> None:
+        """
+        Bring the index up to date. Trips are read and vectorized without
+        holding self._lock, so queries keep being answered from the current
+        vectors; only applying the result takes it. Once the index is
+        built, a query finding a refresh already running does not wait.
+        """
+        if not self._refresh_lock.acquire(blocking=not self._built):
+            return
+        try:
+            with self._lock:
+                now = self._clock()
+                today = date.today()
+                if self._pruned_day != today.toordinal():
+                    self._prune_started(today.toordinal())
+                    self._pruned_day = today.toordinal()
+                built = self._built
+                sync = built and now - self._synced_at >= self.sync_seconds
+                stale, self._stale = self._stale, set()
+
+            if not built:
+                started = time.perf_counter()
+                vectors = _TripVectors.build(self.dimensions, self._read(db, None, today))
+                with self._lock:
+                    self._vectors = vectors
+                    self._memo.clear()
+                    self._built = True
+                    self._synced_at = now
+                logger.info(
+                    "Built similar-trips index: %d trips in %.0f ms",
+                    vectors.size,
+                    (time.perf_counter() - started) * 1000,
+                )
+            elif sync:
+                self._sync_versions(db, today)
+                with self._lock:
+                    self._synced_at = now
+            elif stale:
+                self._reload(db, stale, today)
+        finally:
+            self._refresh_lock.release()
+
+    # Callers hold self._refresh_lock below: self._vectors is only replaced
+    # or changed by the refreshing thread, so reading it needs no lock.
+
+    def _sync_versions(self, db: Session, today: date) -> None:
+        listed = dict(
+            db.query(TripCard.id, TripCard.version)
+            .filter(TripCard.start_date >= today)
+            .all()
+        )
+        versions = self._vectors.versions
+        unlisted = [trip_id for trip_id in versions if trip_id not in listed]
+        changed = [trip_id for trip_id, version in listed.items() if versions.get(trip_id) != version]
+        self._reload(db, changed, today, removed=unlisted)
+
+    def _reload(
+        self, db: Session, trip_ids: Iterable[str], today: date, *, removed: Iterable[str] = ()
+    ) -> None:
+        """
+        Re-index `trip_ids`; those no longer listed and upcoming, and
+        `removed`, are dropped.
+        """
+        requested = set(trip_ids)
+        entries = list(self._read(db, requested, today))
+        unlisted = requested.difference(trip_id for trip_id, _, _, _ in entries)
+        with self._lock:
+            for trip_id in unlisted.union(removed):
+                self._vectors.remove(trip_id)
+            for entry in entries:
+                self._vectors.upsert(*entry)
+            self._memo.clear()
+
+    def _read(self, db: Session, trip_ids: Optional[Set[str]], today: date) -> Iterator[_Entry]:
+        """Vectorize listed upcoming trips (all of them, or `trip_ids`)."""
+        query = db.query(
+            Trip.id,
+            Trip.title,
+            Trip.destination,
+            Trip.description,
+            Trip.tags,
+            Trip.itinerary,
+            TripCard.start_date,
+            TripCard.version,
+        ).join(TripCard, TripCard.id == Trip.id).filter(TripCard.start_date >= today)
+
+        if trip_ids is None:
+            batches = [query.yield_per(_LOAD_BATCH)]
+        else:
+            ids = sorted(trip_ids)
+            batches = (
+                query.filter(Trip.id.in_(ids[start:start + _LOAD_BATCH])).all()
+                for start in range(0, len(ids), _LOAD_BATCH)
+            )
+
+        for rows in batches:
+            for trip_id, title, destination, description, tags, itinerary, start_date, version in rows:
+                vector = hash_features(
+                    trip_features(title, destination, description, tags, itinerary),
+                    self.dimensions,
+                )
+                yield trip_id, vector, start_date.toordinal(), version
+
+    def _prune_started(self, today: int) -> None:
+        """Drop trips whose start date has passed. Caller holds self._lock."""
+        vectors = self._vectors
+        started = np.flatnonzero(vectors.start_days[: vectors.size] < today)
+        # Highest rows first: removal only moves rows from the end.
+        for row in started[::-1]:
+            vectors.remove(vectors.trip_ids[row])
+        if len(started):
+            self._memo.clear()
+
+
+similar_trips_index = SimilarTripsIndex(
+    dimensions=settings.SIMILAR_TRIPS_DIMENSIONS,
+    sync_seconds=settings.SIMILAR_TRIPS_SYNC_SECONDS,
+    query_buckets=settings.SIMILAR_TRIPS_QUERY_BUCKETS,
+    candidates=settings.SIMILAR_TRIPS_CANDIDATES,
+)
+
+
+def _mark_changed_trips_stale(changes: List[TripChange]) -> None:
+    similar_trips_index.mark_stale(
+        change.trip_id for change in changes if change.kind in _INDEXED_CHANGES
+    )
+
+
+add_trip_change_listener(_mark_changed_trips_stale)
@@ -0,0 +1,241 @@
+"""
+Per-trip admission control for booking creation.
+
+When a popular trip opens, every booking request for it contends for the
+same rows (the trip_inventory counter, the trip). Instead of letting each
+request take a database connection and a threadpool worker and then block
+on a row lock, requests for one trip pass through a small gate first:
+
+- at most ADMISSION_MAX_ACTIVE_PER_TRIP requests per process run at once;
+- up to ADMISSION_MAX_QUEUED_PER_TRIP more wait in FIFO order, for at most
+  ADMISSION_MAX_WAIT_SECONDS, with their pooled connection handed back;
+- anything beyond that is answered at once with 429 and a Retry-After hint
+  (and the queue position when it was queued).
+
+Across worker processes, an admitted request also takes one of
+ADMISSION_CLUSTER_SLOTS_PER_TRIP transaction-scoped advisory locks keyed by
+the trip (pg_try_advisory_xact_lock never waits); when all slots are taken
+it gets 429 as well. The slot is released when the request's transaction
+ends. Set ADMISSION_CLUSTER_SLOTS_PER_TRIP to 0 to only gate this process.
+
+Queue wait times, hold times, queue depth and rejections are reported by
+stats() (GET /health/admission).
+"""
+import math
+import statistics
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+# Recent wait / hold durations kept for the percentiles in stats().
+_SAMPLES = 1024
+# Trips listed individually in stats().
+_BUSIEST_TRIPS = 20
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, *, retry_after: int, position: Optional[int] = None):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+        self.position = position
+
+
+class _TripGate:
+    __slots__ = ("active", "waiters")
+
+    def __init__(self):
+        self.active = 0
+        self.waiters: Deque[threading.Event] = deque()
+
+
+class TripAdmissionControl:
+    def __init__(
+        self,
+        *,
+        max_active: int,
+        max_queued: int,
+        max_wait_seconds: float,
+        cluster_slots: int,
+        clock=time.monotonic,
+    ):
+        self.max_active = max_active
+        self.max_queued = max_queued
+        self.max_wait_seconds = max_wait_seconds
+        self.cluster_slots = cluster_slots
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._gates: Dict[str, _TripGate] = {}
+        self._admitted = 0
+        self._queued = 0
+        self._rejected: Counter = Counter()
+        self._max_queue_depth = 0
+        self._waits: Deque[float] = deque(maxlen=_SAMPLES)
+        self._holds: Deque[float] = deque(maxlen=_SAMPLES)
+
+    @contextmanager
+    def admit(self, db: Session, trip_id: str) -> Iterator[None]:
+        """
+        Hold one of the trip's admission slots for the body of the block.
+        Raises AdmissionRejected when the trip is over its budget.
+        """
+        started = self._clock()
+        self._enter(db, trip_id)
+        admitted_at = None
+        try:
+            if self.cluster_slots and not self._take_cluster_slot(db, trip_id):
+                with self._lock:
+                    self._rejected["cluster_busy"] += 1
+                    retry_after = self._retry_after(1)
+                raise AdmissionRejected("cluster_busy", retry_after=retry_after)
+            admitted_at = self._clock()
+            with self._lock:
+                self._waits.append(admitted_at - started)
+            yield
+        finally:
+            self._leave(trip_id, held=self._clock() - admitted_at if admitted_at is not None else None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            busiest = sorted(
+                self._gates.items(),
+                key=lambda item: (len(item[1].waiters), item[1].active),
+                reverse=True,
+            )[:_BUSIEST_TRIPS]
+            return {
+                "max_active_per_trip": self.max_active,
+                "max_queued_per_trip": self.max_queued,
+                "cluster_slots_per_trip": self.cluster_slots,
+                "admitted": self._admitted,
+                "queued": self._queued,
+                "rejected": dict(self._rejected),
+                "queue_depth": sum(len(gate.waiters) for gate in self._gates.values()),
+                "max_queue_depth": self._max_queue_depth,
+                "wait_ms": _percentiles(self._waits),
+                "hold_ms": _percentiles(self._holds),
+                "trips": {
+                    trip_id: {"active": gate.active, "queued": len(gate.waiters)}
+                    for trip_id, gate in busiest
+                },
+            }
+
+    def _enter(self, db: Session, trip_id: str) -> None:
+        with self._lock:
+            gate = self._gates.setdefault(trip_id, _TripGate())
+            if gate.active < self.max_active and not gate.waiters:
+                gate.active += 1
+                self._admitted += 1
+                return
+            if len(gate.waiters) >= self.max_queued:
+                self._rejected["queue_full"] += 1
+                raise AdmissionRejected(
+                    "queue_full", retry_after=self._retry_after(len(gate.waiters) + 1)
+                )
+            waiter = threading.Event()
+            gate.waiters.append(waiter)
+            position = len(gate.waiters)
+            self._queued += 1
+            self._max_queue_depth = max(self._max_queue_depth, position)
+
+        try:
+            # Nothing has been written yet; ending the transaction returns the
+            # pooled connection while this request waits.
+            db.commit()
+            waiter.wait(self.max_wait_seconds)
+        except Exception:
+            self._withdraw(trip_id, gate, waiter)
+            raise
+
+        with self._lock:
+            if waiter.is_set():
+                # _leave handed its slot to this waiter.
+                self._admitted += 1
+                return
+            gate.waiters.remove(waiter)
+            self._discard_if_idle(trip_id, gate)
+            self._rejected["timeout"] += 1
+            raise AdmissionRejected("timeout", retry_after=self._retry_after(position), position=position)
+
+    def _withdraw(self, trip_id: str, gate: _TripGate, waiter: threading.Event) -> None:
+        """Take a failed request out of the queue without losing a slot."""
+        with self._lock:
+            if not waiter.is_set():
+                gate.waiters.remove(waiter)
+                self._discard_if_idle(trip_id, gate)
+                return
+        # _leave already handed its slot to this waiter: pass it on.
+        self._leave(trip_id, held=None)
+
+    def _leave(self, trip_id: str, *, held: Optional[float]) -> None:
+        with self._lock:
+            if held is not None:
+                self._holds.append(held)
+            gate = self._gates[trip_id]
+            if gate.waiters:
+                gate.waiters.popleft().set()
+                return
+            gate.active -= 1
+            self._discard_if_idle(trip_id, gate)
+
+    def _discard_if_idle(self, trip_id: str, gate: _TripGate) -> None:
+        if not gate.active and not gate.waiters:
+            del self._gates[trip_id]
+
+    def _take_cluster_slot(self, db: Session, trip_id: str) -> bool:
+        slot = func.generate_series(0, self.cluster_slots - 1).table_valued("value").alias("slot")
+        taken = db.execute(
+            select(slot.c.value)
+            .where(func.pg_try_advisory_xact_lock(func.hashtext(trip_id), slot.c.value))
+            .limit(1)
+        ).first()
+        return taken is not None
+
+    def _retry_after(self, position: int) -> int:
+        """Seconds until `position` requests ahead would have been served. Caller holds self._lock."""
+        hold = statistics.fmean(self._holds) if self._holds else 1.0
+        return max(1, math.ceil(hold * position / self.max_active))
+
+
+def _percentiles(samples: Deque[float]) -> dict:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "p50": round(ordered[len(ordered) // 2] * 1000, 2),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+        "max": round(ordered[-1] * 1000, 2),
+    }
+
+
+trip_admission = TripAdmissionControl(
+    max_active=settings.ADMISSION_MAX_ACTIVE_PER_TRIP,
+    max_queued=settings.ADMISSION_MAX_QUEUED_PER_TRIP,
+    max_wait_seconds=settings.ADMISSION_MAX_WAIT_SECONDS,
+    cluster_slots=settings.ADMISSION_CLUSTER_SLOTS_PER_TRIP,
+)
+
+
+@contextmanager
+def admit_booking(db: Session, trip_id: str) -> Iterator[None]:
+    """trip_admission.admit, answering rejected requests with 429."""
+    try:
+        with trip_admission.admit(db, trip_id):
+            yield
+    except AdmissionRejected as exc:
+        headers = {"Retry-After": str(exc.retry_after)}
+        if exc.position is not None:
+            headers["X-Queue-Position"] = str(exc.position)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="This trip is getting a lot of booking requests right now, please retry shortly",
+            headers=headers,
+        ) from exc
@@ -0,0 +1,73 @@
+"""
+Streaming catalog export of listed trips (partners, sitemap job).
+
+Rows come from trip_cards through a server-side cursor, so the cover image
+and free seats are already on the row and memory use is bounded by one
+batch. Each batch is encoded and yielded as one chunk.
+"""
+import csv
+import enum
+import io
+from typing import Iterator
+
+import orjson
+
+from app.crud.trip_card import EXPORT_COLUMNS, iter_export_batches
+from app.db.session import SessionLocal
+
+EXPORT_BATCH_SIZE = 500
+
+_FIELD_NAMES = [column.key for column in EXPORT_COLUMNS]
+_TAGS_INDEX = _FIELD_NAMES.index("tags")
+
+
+class ExportFormat(str, enum.Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
+
+def _ndjson_chunks(batches) -> Iterator[bytes]:
+    for batch in batches:
+        yield b"".join(
+            orjson.dumps(dict(zip(_FIELD_NAMES, row))) + b"\n" for row in batch
+        )
+
+
+def _csv_chunks(batches) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(_FIELD_NAMES)
+    for batch in batches:
+        for row in batch:
+            values = list(row)
+            # Tags as a single pipe-separated cell
+            values[_TAGS_INDEX] = "|".join(row.tags or [])
+            writer.writerow(values)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Header only: the catalog is empty
+        yield buffer.getvalue().encode("utf-8")
+
+
+def stream_trip_export(export_format: ExportFormat) -> Iterator[bytes]:
+    """
+    Generator for a StreamingResponse. Uses its own session: the response
+    body is produced after the request's dependencies have finished.
+    """
+    db = SessionLocal()
+    try:
+        batches = iter_export_batches(db, batch_size=EXPORT_BATCH_SIZE)
+        if export_format == ExportFormat.CSV:
+            yield from _csv_chunks(batches)
+        else:
+            yield from _ndjson_chunks(batches)
+    finally:
+        db.close()
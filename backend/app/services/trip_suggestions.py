@@ -0,0 +1,353 @@
+"""
+In-memory typeahead over destinations and titles of listed upcoming trips.
+
+Suggestions are served from an immutable snapshot: a case-folded, sorted
+array of (word prefix key, suggestion rank) pairs searched with bisect, plus
+precomputed top lists for prefixes of up to three letters. Readers never take
+a lock or touch the database; writers rebuild the snapshot and swap the
+reference.
+
+The keys matching a longer prefix form one contiguous run of the array.
+Rather than ranking every match, a lookup reads the best MAX_SUGGESTIONS
+ranks of a segment tree over fixed-size blocks of the array: a run is a
+few partial blocks plus O(log n) tree nodes, so its cost does not grow with
+the number of matches.
+
+Every word of a label is a key, so "Kedarkantha Winter Trek" is found by
+"ked", "win" and "tre". Suggestions are ranked by
+`trips * TRIP_WEIGHT + booked seats` over the upcoming trips behind them.
+
+One background thread does all the writing. Committed trip changes
+(publish, edit, archive, delete, seat changes) only queue the trip id and
+wake it; it re-reads just those trip_cards rows. Every
+SUGGEST_REBUILD_SECONDS it reloads everything, which drops trips that
+have started and picks up writes made in other workers.
+"""
+import bisect
+import heapq
+import logging
+import threading
+import time
+import unicodedata
+from datetime import date
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.trip_events import TripChange, TripChangeKind, add_trip_change_listener
+from app.db.session import SessionLocal
+from app.models.trip_card import TripCard
+
+logger = logging.getLogger(__name__)
+
+TRIP_WEIGHT = 5
+
+# Prefixes up to this length have precomputed top lists.
+SHORT_PREFIX_LENGTH = 3
+MAX_SUGGESTIONS = 20
+# Keys per leaf of the top-suggestions tree.
+_BLOCK = 32
+
+_INDEXED_CHANGES = {
+    TripChangeKind.PUBLISHED,
+    TripChangeKind.UPDATED,
+    TripChangeKind.ARCHIVED,
+    TripChangeKind.UNARCHIVED,
+    TripChangeKind.DELETED,
+    TripChangeKind.INVENTORY,
+}
+
+
+def fold(text: str) -> str:
+    """Case- and accent-insensitive form used for keys and prefixes."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return " ".join("".join(ch for ch in decomposed if not unicodedata.combining(ch)).split())
+
+
+class _TripTerms(NamedTuple):
+    destination: str
+    title: str
+    slug: str
+    booked_seats: int
+
+
+class _Tally:
+    __slots__ = ("label", "trip_ids", "booked_seats")
+
+    def __init__(self, label: str):
+        self.label = label
+        self.trip_ids: Set[str] = set()
+        self.booked_seats = 0
+
+
+class Suggestion(NamedTuple):
+    label: str
+    kind: str  # "destination" or "title"
+    trip_count: int
+    score: int
+    slug: Optional[str]  # the trip's slug for a title with a single trip
+
+
+class _Snapshot(NamedTuple):
+    keys: List[str]
+    ranks: List[int]  # index into `ranked`, parallel to keys
+    ranked: List[Suggestion]  # best first
+    short_prefixes: Dict[str, List[Suggestion]]
+    # Segment tree over blocks of _BLOCK keys: node i holds the best
+    # MAX_SUGGESTIONS distinct ranks under it, leaves start at `leaves`.
+    block_tops: List[Tuple[int, ...]]
+    leaves: int
+
+
+_EMPTY = _Snapshot(keys=[], ranks=[], ranked=[], short_prefixes={}, block_tops=[], leaves=0)
+
+
+class TripSuggestionIndex:
+    def __init__(self):
+        self._lock = threading.Lock()  # serializes writers
+        self._pending: Set[str] = set()
+        self._pending_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._trips: Dict[str, _TripTerms] = {}
+        self._tallies: Dict[Tuple[str, str], _Tally] = {}
+        self._snapshot = _EMPTY
+        self._built = False
+
+    def suggest(self, prefix: str, *, limit: int) -> List[Suggestion]:
+        """Best suggestions whose label has a word starting with `prefix`."""
+        folded = fold(prefix)
+        if not folded:
+            return []
+        snapshot = self._snapshot
+        if len(folded) <= SHORT_PREFIX_LENGTH:
+            return snapshot.short_prefixes.get(folded, [])[:limit]
+
+        start = bisect.bisect_left(snapshot.keys, folded)
+        end = bisect.bisect_right(snapshot.keys, folded + "\uffff", lo=start)
+        return [snapshot.ranked[rank] for rank in heapq.nsmallest(limit, _ranks_in(snapshot, start, end))]
+
+    def mark_changed(self, trip_ids: Iterable[str]) -> None:
+        """Queue trips for the maintenance thread to re-read."""
+        with self._pending_lock:
+            self._pending.update(trip_ids)
+        self._wake.set()
+
+    def take_changed(self) -> Set[str]:
+        with self._pending_lock:
+            pending, self._pending = self._pending, set()
+        return pending
+
+    def rebuild(self, db: Session) -> None:
+        """Reload every listed upcoming trip."""
+        trips = {row[0]: _terms(row) for row in _listed_upcoming(db)}
+        with self._lock:
+            self._trips = trips
+            self._tallies = {}
+            for trip_id, terms in trips.items():
+                self._add(trip_id, terms)
+            self._publish()
+            self._built = True
+
+    def refresh_trips(self, db: Session, trip_ids: Iterable[str]) -> None:
+        """Re-read `trip_ids`; trips no longer listed or upcoming are dropped."""
+        trip_ids = set(trip_ids)
+        if not trip_ids:
+            return
+        rows = {row[0]: _terms(row) for row in _listed_upcoming(db, trip_ids)}
+        with self._lock:
+            if not self._built:
+                return
+            for trip_id in trip_ids:
+                old = self._trips.pop(trip_id, None)
+                if old:
+                    self._discard(trip_id, old)
+                new = rows.get(trip_id)
+                if new:
+                    self._trips[trip_id] = new
+                    self._add(trip_id, new)
+            self._publish()
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "built": self._built,
+            "trips": len(self._trips),
+            "suggestions": len(snapshot.ranked),
+            "keys": len(snapshot.keys),
+            "pending": len(self._pending),
+        }
+
+    # Callers hold self._lock below.
+
+    def _add(self, trip_id: str, terms: _TripTerms) -> None:
+        for kind, label in (("destination", terms.destination), ("title", terms.title)):
+            tally = self._tallies.setdefault((kind, fold(label)), _Tally(label))
+            tally.trip_ids.add(trip_id)
+            tally.booked_seats += terms.booked_seats
+
+    def _discard(self, trip_id: str, terms: _TripTerms) -> None:
+        for kind, label in (("destination", terms.destination), ("title", terms.title)):
+            key = (kind, fold(label))
+            tally = self._tallies.get(key)
+            if not tally:
+                continue
+            tally.trip_ids.discard(trip_id)
+            tally.booked_seats -= terms.booked_seats
+            if not tally.trip_ids:
+                del self._tallies[key]
+
+    def _publish(self) -> None:
+        entries: List[Suggestion] = []
+        pairs: List[Tuple[str, int]] = []
+        short: Dict[str, List[Suggestion]] = {}
+        for (kind, folded), tally in self._tallies.items():
+            slug = None
+            if kind == "title" and len(tally.trip_ids) == 1:
+                slug = self._trips[next(iter(tally.trip_ids))].slug
+            index = len(entries)
+            entries.append(
+                Suggestion(
+                    label=tally.label,
+                    kind=kind,
+                    trip_count=len(tally.trip_ids),
+                    score=len(tally.trip_ids) * TRIP_WEIGHT + tally.booked_seats,
+                    slug=slug,
+                )
+            )
+            words = folded.split(" ")
+            short_keys = set()
+            for position in range(len(words)):
+                key = " ".join(words[position:])
+                pairs.append((key, index))
+                for length in range(1, SHORT_PREFIX_LENGTH + 1):
+                    if len(key) >= length:
+                        short_keys.add(key[:length])
+            for short_key in short_keys:
+                short.setdefault(short_key, []).append(entries[index])
+
+        order = sorted(range(len(entries)), key=lambda index: _rank(entries[index]))
+        rank_of = [0] * len(entries)
+        for rank, index in enumerate(order):
+            rank_of[index] = rank
+        pairs.sort()
+        ranks = [rank_of[index] for _, index in pairs]
+        block_tops, leaves = _build_block_tops(ranks)
+        self._snapshot = _Snapshot(
+            keys=[key for key, _ in pairs],
+            ranks=ranks,
+            ranked=[entries[index] for index in order],
+            short_prefixes={
+                key: heapq.nsmallest(MAX_SUGGESTIONS, candidates, key=_rank)
+                for key, candidates in short.items()
+            },
+            block_tops=block_tops,
+            leaves=leaves,
+        )
+
+
+def _rank(suggestion: Suggestion):
+    return (-suggestion.score, suggestion.label)
+
+
+def _build_block_tops(ranks: List[int]) -> Tuple[List[Tuple[int, ...]], int]:
+    blocks = -(-len(ranks) // _BLOCK)
+    leaves = 1
+    while leaves < blocks:
+        leaves *= 2
+    tree: List[Tuple[int, ...]] = [()] * (2 * leaves)
+    for block in range(blocks):
+        tree[leaves + block] = tuple(
+            heapq.nsmallest(MAX_SUGGESTIONS, set(ranks[block * _BLOCK:(block + 1) * _BLOCK]))
+        )
+    for node in range(leaves - 1, 0, -1):
+        tree[node] = tuple(heapq.nsmallest(MAX_SUGGESTIONS, set(tree[2 * node]).union(tree[2 * node + 1])))
+    return tree, leaves
+
+
+def _ranks_in(snapshot: _Snapshot, start: int, end: int) -> Set[int]:
+    """Distinct ranks among keys[start:end] that can be in its top MAX_SUGGESTIONS."""
+    ranks = snapshot.ranks
+    first = -(-start // _BLOCK)
+    last = end // _BLOCK
+    if first >= last:
+        return set(ranks[start:end])
+    found = set(ranks[start:first * _BLOCK])
+    found.update(ranks[last * _BLOCK:end])
+    low, high = first + snapshot.leaves, last + snapshot.leaves
+    while low < high:
+        if low & 1:
+            found.update(snapshot.block_tops[low])
+            low += 1
+        if high & 1:
+            high -= 1
+            found.update(snapshot.block_tops[high])
+        low //= 2
+        high //= 2
+    return found
+
+
+def _listed_upcoming(db: Session, trip_ids: Optional[Set[str]] = None):
+    query = db.query(
+        TripCard.id,
+        TripCard.destination,
+        TripCard.title,
+        TripCard.slug,
+        TripCard.total_seats - TripCard.seats_available,
+    ).filter(TripCard.start_date >= date.today())
+    if trip_ids is not None:
+        query = query.filter(TripCard.id.in_(sorted(trip_ids)))
+    return query.all()
+
+
+def _terms(row) -> _TripTerms:
+    _, destination, title, slug, booked_seats = row
+    return _TripTerms(destination=destination, title=title, slug=slug, booked_seats=max(booked_seats, 0))
+
+
+trip_suggestions = TripSuggestionIndex()
+
+_maintenance_started = threading.Event()
+
+
+def _maintain(index: TripSuggestionIndex, stop: threading.Event) -> None:
+    next_rebuild = 0.0
+    while not stop.is_set():
+        try:
+            if time.monotonic() >= next_rebuild:
+                index.take_changed()
+                with SessionLocal() as db:
+                    index.rebuild(db)
+                next_rebuild = time.monotonic() + settings.SUGGEST_REBUILD_SECONDS
+            else:
+                changed = index.take_changed()
+                if changed:
+                    with SessionLocal() as db:
+                        index.refresh_trips(db, changed)
+        except Exception:
+            logger.exception("Maintaining trip suggestions failed")
+            next_rebuild = time.monotonic() + settings.SUGGEST_REBUILD_SECONDS
+        index._wake.wait(timeout=max(next_rebuild - time.monotonic(), 0))
+        index._wake.clear()
+
+
+def start_trip_suggestions(stop: Optional[threading.Event] = None) -> None:
+    """Start the thread that builds and maintains the index (once per process)."""
+    if _maintenance_started.is_set():
+        return
+    _maintenance_started.set()
+    threading.Thread(
+        target=_maintain,
+        args=(trip_suggestions, stop or threading.Event()),
+        name="trip-suggestions",
+        daemon=True,
+    ).start()
+
+
+def _queue_changed_trips(changes: List[TripChange]) -> None:
+    trip_ids = {change.trip_id for change in changes if change.kind in _INDEXED_CHANGES}
+    if trip_ids:
+        trip_suggestions.mark_changed(trip_ids)
+
+
+add_trip_change_listener(_queue_changed_trips)
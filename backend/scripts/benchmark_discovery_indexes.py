@@ -0,0 +1,211 @@
+"""
+Benchmark the public discovery queries with and without the indexes that
+serve them (migrations q7r8s9t0u1v2 and r8s9t0u1v2w3).
+
+Seeds synthetic trips inside one transaction, captures the exact SQL the app
+issues for each public query, and reports EXPLAIN (ANALYZE, BUFFERS) plans and
+latencies with the indexes in place ("after") and with them dropped ("before").
+Everything is rolled back at the end. DROP INDEX holds an exclusive lock on
+`trips` until then, so run this against a local or staging database only.
+
+Usage (from backend/, with DATABASE_URL pointing at a migrated database):
+    python scripts/benchmark_discovery_indexes.py [--trips 50000] [--runs 20] [--no-plans]
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import event, insert, select  # noqa: E402
+from sqlalchemy.engine import Connection  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+import app.main  # noqa: E402,F401  (configures every mapper)
+from app.crud.trip import (  # noqa: E402
+    build_search_trips_query,
+    build_trips_filtered_query,
+    fetch_trip_page,
+    get_trip_by_slug,
+    get_weekend_getaways,
+)
+from app.crud.trip_card import sync_trip_cards  # noqa: E402
+from app.db.session import engine  # noqa: E402
+from app.models.organizer import Organizer  # noqa: E402
+from app.models.trip import Trip, TripStatus  # noqa: E402
+from app.models.trip_inventory import TripInventory  # noqa: E402
+from app.models.trip_tag import TripTag  # noqa: E402
+
+# Listings read trip_cards; trip detail reads trips by slug.
+DISCOVERY_INDEXES = [
+    "ix_trips_published_start_date_id",
+    "ix_trips_published_tags",
+    "ix_trips_slug",
+    "ix_trip_cards_start_date_id",
+    "ix_trip_cards_tags",
+]
+
+DESTINATIONS = ["Manali", "Rishikesh", "Goa", "Coorg", "Spiti", "Kasol", "Gokarna", "Munnar", "Jaipur", "Leh"]
+INSERT_BATCH = 1000
+
+
+def seed(connection: Connection, trip_count: int) -> List[str]:
+    """Insert synthetic organizers and trips; returns the slugs of published trips."""
+    rng = random.Random(42)
+    today = date.today()
+    tags = [tag.value for tag in TripTag]
+    run_id = uuid.uuid4().hex[:8]
+
+    organizer_ids = []
+    for index in range(20):
+        organizer_id = str(uuid.uuid4())
+        organizer_ids.append(organizer_id)
+        connection.execute(
+            insert(Organizer.__table__).values(
+                id=organizer_id,
+                name=f"Bench Organizer {index}",
+                email=f"bench-{run_id}-{index}@example.com",
+            )
+        )
+
+    published_slugs = []
+    trips, inventory = [], []
+    for index in range(trip_count):
+        start = today + timedelta(days=rng.randint(-365, 365))
+        status = rng.choices(
+            [TripStatus.PUBLISHED, TripStatus.DRAFT, TripStatus.ARCHIVED], weights=[70, 20, 10]
+        )[0]
+        trip_id = str(uuid.uuid4())
+        slug = f"bench-{run_id}-{index}"
+        if status == TripStatus.PUBLISHED:
+            published_slugs.append(slug)
+        trips.append(
+            {
+                "id": trip_id,
+                "organizer_id": rng.choice(organizer_ids),
+                "slug": slug,
+                "title": f"Bench trip {index}",
+                "destination": rng.choice(DESTINATIONS),
+                "description": "Synthetic trip for index benchmarks",
+                "price": rng.randrange(1000, 80000, 500),
+                "start_date": start,
+                "end_date": start + timedelta(days=rng.randint(0, 9)),
+                "total_seats": rng.randint(8, 40),
+                "status": status,
+                "tags": rng.sample(tags, rng.randint(1, 4)),
+                "is_active": rng.random() > 0.05,
+            }
+        )
+        inventory.append({"trip_id": trip_id, "held_seats": rng.randint(0, 8)})
+        if len(trips) == INSERT_BATCH:
+            connection.execute(insert(Trip.__table__), trips)
+            connection.execute(insert(TripInventory.__table__), inventory)
+            trips, inventory = [], []
+    if trips:
+        connection.execute(insert(Trip.__table__), trips)
+        connection.execute(insert(TripInventory.__table__), inventory)
+    return published_slugs
+
+
+def capture_sql(connection: Connection, run: Callable[[], object]) -> Tuple[str, object]:
+    """Run app code and return the last statement it sent to the database."""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(connection, "before_cursor_execute", before_cursor_execute)
+    try:
+        run()
+    finally:
+        event.remove(connection, "before_cursor_execute", before_cursor_execute)
+    return captured[-1]
+
+
+def discovery_queries(db: Session, slug: str) -> Dict[str, Callable[[], object]]:
+    next_month = (date.today().replace(day=1) + timedelta(days=32)).strftime("%Y-%m")
+    return {
+        "list (first page)": lambda: fetch_trip_page(build_trips_filtered_query(db), limit=20, offset=0, cursor=None),
+        "list by tags": lambda: fetch_trip_page(
+            build_trips_filtered_query(db, tags=[TripTag.TREK.value, TripTag.WEEKEND.value]),
+            limit=20,
+            offset=0,
+            cursor=None,
+        ),
+        "search by month": lambda: fetch_trip_page(
+            build_search_trips_query(db, month=next_month)[0], limit=20, offset=0, cursor=None
+        ),
+        "search by price/duration": lambda: fetch_trip_page(
+            build_search_trips_query(db, min_price=5000, max_price=15000, max_days=3)[0],
+            limit=20,
+            offset=0,
+            cursor=None,
+        ),
+        "trip by slug": lambda: get_trip_by_slug(db, slug),
+        "weekend getaways": lambda: get_weekend_getaways(db),
+    }
+
+
+def measure(connection: Connection, statements: Dict[str, Tuple[str, object]], runs: int, show_plans: bool, label: str):
+    latencies = {}
+    for name, (sql, params) in statements.items():
+        if show_plans:
+            plan = connection.exec_driver_sql("EXPLAIN (ANALYZE, BUFFERS) " + sql, params).scalars().all()
+            print(f"\n--- {label}: {name} ---")
+            print("\n".join(plan))
+        samples = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            connection.exec_driver_sql(sql, params).fetchall()
+            samples.append((time.perf_counter() - started) * 1000)
+        latencies[name] = statistics.median(samples)
+    return latencies
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trips", type=int, default=50000, help="synthetic trips to seed")
+    parser.add_argument("--runs", type=int, default=20, help="timed executions per query")
+    parser.add_argument("--no-plans", action="store_true", help="skip printing EXPLAIN output")
+    args = parser.parse_args(argv)
+
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            print(f"Seeding {args.trips} trips...")
+            slugs = seed(connection, args.trips)
+            db = Session(bind=connection)
+            trip_ids = connection.execute(select(Trip.id).where(Trip.slug.like("bench-%"))).scalars().all()
+            for start in range(0, len(trip_ids), INSERT_BATCH):
+                sync_trip_cards(db, trip_ids[start:start + INSERT_BATCH])
+            connection.exec_driver_sql("ANALYZE trips")
+            connection.exec_driver_sql("ANALYZE trip_cards")
+
+            queries = discovery_queries(db, random.Random(7).choice(slugs))
+            statements = {name: capture_sql(connection, run) for name, run in queries.items()}
+
+            after = measure(connection, statements, args.runs, not args.no_plans, "after")
+
+            for index in DISCOVERY_INDEXES:
+                connection.exec_driver_sql(f"DROP INDEX IF EXISTS {index}")
+            connection.exec_driver_sql("ANALYZE trips")
+            connection.exec_driver_sql("ANALYZE trip_cards")
+            before = measure(connection, statements, args.runs, not args.no_plans, "before")
+        finally:
+            transaction.rollback()
+
+    print(f"\nMedian latency over {args.runs} runs ({args.trips} seeded trips)")
+    print(f"{'query':<28}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for name in statements:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:<28}{before[name]:>12.2f}{after[name]:>12.2f}{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
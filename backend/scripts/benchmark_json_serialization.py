@@ -0,0 +1,125 @@
+"""
+Benchmark serializing a 100-trip listing page, before and after the
+TypeAdapter / orjson response path.
+
+before:        map_trip_card_responses dicts -> response_model validation ->
+               jsonable_encoder -> stdlib json (Starlette JSONResponse)
+orjson only:   the same, rendered by the app's default ORJSONResponse
+after (miss):  one TRIP_LIST_ADAPTER validation + dump_json, sent as
+               PreSerializedJSONResponse (what a discovery cache miss does)
+after (hit):   cached bytes sent as PreSerializedJSONResponse
+
+Needs no database; cards are synthetic.
+
+Usage (from backend/):
+    python scripts/benchmark_json_serialization.py [--trips 100] [--runs 2000]
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+
+import app.main  # noqa: E402,F401  (configures every mapper)
+from app.api.v1.trips import map_trip_card_responses  # noqa: E402
+from app.core.responses import ORJSONResponse, PreSerializedJSONResponse  # noqa: E402
+from app.models.trip_tag import TripTag  # noqa: E402
+from app.schemas.trip import TRIP_LIST_ADAPTER  # noqa: E402
+
+DESTINATIONS = ["Manali", "Rishikesh", "Goa", "Coorg", "Spiti", "Kasol", "Gokarna", "Munnar", "Jaipur", "Leh"]
+
+
+def synthetic_cards(count: int) -> List[SimpleNamespace]:
+    rng = random.Random(42)
+    tags = [tag.value for tag in TripTag]
+    today = date.today()
+    cards = []
+    for index in range(count):
+        start = today + timedelta(days=rng.randint(1, 180))
+        total_seats = rng.randint(8, 40)
+        cards.append(
+            SimpleNamespace(
+                id=f"00000000-0000-4000-8000-{index:012d}",
+                slug=f"bench-trip-{index}",
+                organizer_id="00000000-0000-4000-8000-000000000000",
+                title=f"Bench trip {index} to {rng.choice(DESTINATIONS)}",
+                destination=rng.choice(DESTINATIONS),
+                price=rng.randrange(1000, 80000, 500),
+                start_date=start,
+                end_date=start + timedelta(days=rng.randint(0, 9)),
+                total_seats=total_seats,
+                seats_available=rng.randint(0, total_seats),
+                tags=rng.sample(tags, rng.randint(1, 4)),
+                cover_image_url=f"https://cdn.example.com/trips/{index}/cover.jpg",
+            )
+        )
+    return cards
+
+
+def serialization_paths(cards) -> Dict[str, Callable[[], bytes]]:
+    def before() -> bytes:
+        validated = TRIP_LIST_ADAPTER.validate_python(map_trip_card_responses(cards))
+        return JSONResponse(jsonable_encoder(validated)).body
+
+    def orjson_only() -> bytes:
+        validated = TRIP_LIST_ADAPTER.validate_python(map_trip_card_responses(cards))
+        return ORJSONResponse(jsonable_encoder(validated)).body
+
+    def after_miss() -> bytes:
+        trips = TRIP_LIST_ADAPTER.validate_python(map_trip_card_responses(cards))
+        return PreSerializedJSONResponse(TRIP_LIST_ADAPTER.dump_json(trips)).body
+
+    cached = after_miss()
+
+    def after_hit() -> bytes:
+        return PreSerializedJSONResponse(cached).body
+
+    return {
+        "before": before,
+        "orjson only": orjson_only,
+        "after (miss)": after_miss,
+        "after (hit)": after_hit,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trips", type=int, default=100, help="trips per page")
+    parser.add_argument("--runs", type=int, default=2000, help="timed serializations per path")
+    args = parser.parse_args(argv)
+
+    paths = serialization_paths(synthetic_cards(args.trips))
+
+    # Every path must produce the same document.
+    documents = {name: json.loads(run()) for name, run in paths.items()}
+    assert all(document == documents["before"] for document in documents.values())
+
+    results = {}
+    for name, run in paths.items():
+        for _ in range(min(100, args.runs)):
+            run()
+        samples = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            run()
+            samples.append((time.perf_counter() - started) * 1_000_000)
+        results[name] = statistics.median(samples)
+
+    print(f"Median time to serialize a {args.trips}-trip page over {args.runs} runs")
+    print(f"{'path':<16}{'us':>12}{'speedup':>10}")
+    for name, micros in results.items():
+        print(f"{name:<16}{micros:>12.1f}{results['before'] / micros:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
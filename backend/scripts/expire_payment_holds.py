@@ -0,0 +1,51 @@
+"""
+Expire payment holds (PAYMENT_PENDING bookings) whose window has passed.
+
+The app already does this in a background thread every
+BOOKING_EXPIRY_INTERVAL_SECONDS. Run this from cron, or with --watch as a
+standalone worker, when that thread is disabled
+(BOOKING_EXPIRY_INTERVAL_SECONDS=0). Running both is safe: batches are
+claimed with FOR UPDATE SKIP LOCKED.
+
+Usage (from backend/):
+    python scripts/expire_payment_holds.py
+    python scripts/expire_payment_holds.py --watch --interval 30
+"""
+import argparse
+import logging
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import app.main  # noqa: E402,F401  (configures every mapper)
+from app.db.session import SessionLocal  # noqa: E402
+from app.services.booking_expiry import expire_payment_holds, run_booking_expiry  # noqa: E402
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=None, help="holds expired per transaction")
+    parser.add_argument("--watch", action="store_true", help="keep running until interrupted")
+    parser.add_argument("--interval", type=float, default=30.0, help="seconds between runs with --watch")
+    args = parser.parse_args(argv)
+
+    if args.watch:
+        logging.basicConfig(level=logging.INFO)
+        try:
+            run_booking_expiry(threading.Event(), interval_seconds=args.interval, batch_size=args.batch_size)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    db = SessionLocal()
+    try:
+        expired = expire_payment_holds(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Expired {expired} payment holds")
+
+
+if __name__ == "__main__":
+    main()
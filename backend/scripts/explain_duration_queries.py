@@ -0,0 +1,106 @@
+"""
+Check that duration filtering and sorting are served by indexes.
+
+Seeds synthetic trips inside one transaction (see
+benchmark_discovery_indexes.py), captures the SQL the app issues for each
+duration query, and walks its EXPLAIN (FORMAT JSON) plan for an index scan on
+the expected index. Exits non-zero when a query falls back to a sequential
+scan. Everything is rolled back at the end.
+
+Usage (from backend/, with DATABASE_URL pointing at a migrated database):
+    python scripts/explain_duration_queries.py [--trips 50000] [--verbose]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+import app.main  # noqa: E402,F401  (configures every mapper)
+from app.crud.trip import build_search_trips_query, fetch_trip_page, get_weekend_getaways  # noqa: E402
+from app.crud.trip_card import sync_trip_cards  # noqa: E402
+from app.db.session import engine  # noqa: E402
+from app.models.trip import Trip  # noqa: E402
+from app.crud.trip_search import TripSort  # noqa: E402
+from benchmark_discovery_indexes import INSERT_BATCH, capture_sql, seed  # noqa: E402
+
+_INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+def duration_queries(db: Session) -> Dict[str, Tuple[Callable[[], object], str]]:
+    """Query name -> (app call, index its plan must use)."""
+    return {
+        "search by duration": (
+            lambda: fetch_trip_page(
+                build_search_trips_query(db, min_days=2, max_days=3)[0], limit=20, offset=0, cursor=None
+            ),
+            "ix_trip_cards_duration_start_date_id",
+        ),
+        "sort by duration": (
+            lambda: fetch_trip_page(
+                build_search_trips_query(db)[0], limit=20, offset=0, cursor=None, sort=TripSort.DURATION
+            ),
+            "ix_trip_cards_duration_start_date_id",
+        ),
+        "weekend getaways": (
+            lambda: get_weekend_getaways(db),
+            "ix_trip_cards_start_date_id",
+        ),
+    }
+
+
+def plan_nodes(node: dict) -> Iterator[dict]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trips", type=int, default=50000, help="synthetic trips to seed")
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args(argv)
+
+    failures = []
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            print(f"Seeding {args.trips} trips...")
+            seed(connection, args.trips)
+            db = Session(bind=connection)
+            trip_ids = connection.execute(select(Trip.id).where(Trip.slug.like("bench-%"))).scalars().all()
+            for start in range(0, len(trip_ids), INSERT_BATCH):
+                sync_trip_cards(db, trip_ids[start:start + INSERT_BATCH])
+            connection.exec_driver_sql("ANALYZE trips")
+            connection.exec_driver_sql("ANALYZE trip_cards")
+
+            for name, (run, expected) in duration_queries(db).items():
+                sql, params = capture_sql(connection, run)
+                plan = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql, params).scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                used = {
+                    node["Index Name"]
+                    for node in plan_nodes(plan[0]["Plan"])
+                    if node.get("Node Type") in _INDEX_SCANS and "Index Name" in node
+                }
+                ok = expected in used
+                if not ok:
+                    failures.append(name)
+                print(f"{'ok' if ok else 'FAIL':<6}{name:<30}expected {expected}; used {sorted(used) or 'no index'}")
+                if args.verbose or not ok:
+                    print(json.dumps(plan, indent=2))
+        finally:
+            transaction.rollback()
+
+    if failures:
+        sys.exit(f"{len(failures)} duration queries are not index-backed: {', '.join(failures)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Delete expired idempotency_keys rows (Idempotency-Key replays).
+
+Keys expire IDEMPOTENCY_KEY_TTL_HOURS after first use. Expired keys are
+already ignored and reused on the request path; run this hourly or daily
+(cron or a scheduled job) so the table stays bounded.
+
+Usage (from backend/):
+    python scripts/purge_idempotency_keys.py
+"""
+import argparse
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import app.main  # noqa: E402,F401  (configures every mapper)
+from app.crud.idempotency_key import purge_expired_idempotency_keys  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=10000, help="rows deleted per transaction")
+    args = parser.parse_args(argv)
+
+    now = datetime.now(timezone.utc)
+    db = SessionLocal()
+    try:
+        deleted = purge_expired_idempotency_keys(db, now=now, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Deleted {deleted} idempotency keys expired before {now.isoformat()}")
+
+
+if __name__ == "__main__":
+    main()
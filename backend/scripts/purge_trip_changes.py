@@ -0,0 +1,37 @@
+"""
+Delete trip_changes rows older than TRIP_CHANGES_RETENTION_DAYS.
+
+Run daily (cron or a scheduled job) so the /trips/changes log stays bounded.
+
+Usage (from backend/):
+    python scripts/purge_trip_changes.py [--days 30]
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import app.main  # noqa: E402,F401  (configures every mapper)
+from app.core.config import settings  # noqa: E402
+from app.crud.trip_change_log import purge_trip_changes  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=settings.TRIP_CHANGES_RETENTION_DAYS, help="history to keep")
+    args = parser.parse_args(argv)
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=args.days)
+    db = SessionLocal()
+    try:
+        deleted = purge_trip_changes(db, older_than=cutoff)
+    finally:
+        db.close()
+    print(f"Deleted {deleted} trip changes logged before {cutoff.isoformat()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+POST /trips/{trip_id}/bookings handler with the booking insert stubbed.
+"""
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, status
+
+from app.api.v1 import trips
+from app.crud.booking import BookingRequestOutcome, BookingRequestResult
+from app.models.booking import BookingStatus
+from app.services import trip_admission
+from app.services.trip_admission import TripAdmissionControl
+
+
+class _Session:
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.fixture(autouse=True)
+def gate(monkeypatch):
+    control = TripAdmissionControl(max_active=1, max_queued=0, max_wait_seconds=0.1, cluster_slots=0)
+    monkeypatch.setattr(trip_admission, "trip_admission", control)
+    return control
+
+
+@pytest.fixture
+def inserts(monkeypatch):
+    calls = []
+    result = SimpleNamespace(value=BookingRequestResult(
+        BookingRequestOutcome.OK, booking_id="b-1", status=BookingStatus.REVIEW_PENDING
+    ))
+
+    def insert(db, **kwargs):
+        calls.append(kwargs)
+        return result.value
+
+    monkeypatch.setattr(trips, "insert_booking_request", insert)
+    return SimpleNamespace(calls=calls, result=result)
+
+
+def _payload(num_travelers=2):
+    return trips.BookingRequest(
+        num_travelers=num_travelers,
+        travelers=[{"name": f"Traveler {i}", "age": 30, "gender": "female"} for i in range(2)],
+        contact_name="Asha",
+        contact_phone="9999999999",
+        contact_email="asha@example.com",
+        price_per_person=5000,
+        total_price=5000 * num_travelers,
+    )
+
+
+def _user():
+    return SimpleNamespace(id="user-1", email="asha@example.com")
+
+
+def test_create_booking_request_inserts_and_commits(inserts):
+    db = _Session()
+
+    response = trips.create_booking_request(
+        "trip-1", _payload(), db=db, current_user=_user(), idempotency_key=None
+    )
+
+    assert response["booking_id"] == "b-1"
+    assert response["status"] == BookingStatus.REVIEW_PENDING
+    assert db.commits == 1
+    [call] = inserts.calls
+    assert call["trip_id"] == "trip-1"
+    assert call["user_id"] == "user-1"
+    assert call["seats"] == 2
+    assert call["total_price"] == 10000
+
+
+def test_rejected_outcome_is_answered_with_its_error(inserts):
+    db = _Session()
+    inserts.result.value = BookingRequestResult(BookingRequestOutcome.SOLD_OUT)
+
+    with pytest.raises(HTTPException) as rejected:
+        trips.create_booking_request(
+            "trip-1", _payload(), db=db, current_user=_user(), idempotency_key=None
+        )
+
+    assert rejected.value.status_code == status.HTTP_409_CONFLICT
+    assert db.commits == 0
+    assert db.rollbacks == 1
+
+
+def test_traveler_count_mismatch_skips_the_insert(inserts):
+    with pytest.raises(HTTPException) as rejected:
+        trips.create_booking_request(
+            "trip-1", _payload(num_travelers=3), db=_Session(), current_user=_user(), idempotency_key=None
+        )
+
+    assert rejected.value.status_code == status.HTTP_400_BAD_REQUEST
+    assert inserts.calls == []
@@ -0,0 +1,107 @@
+"""
+Idempotency-Key handling around booking admission.
+The key storage is replaced by an in-memory table; no database is needed.
+"""
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, status
+
+from app.services import idempotency, trip_admission
+from app.services.trip_admission import TripAdmissionControl, admit_booking
+
+
+class _Session:
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+@pytest.fixture
+def keys(monkeypatch):
+    rows = {}
+
+    def claim(db, *, user_id, key, scope, request_hash, expires_at):
+        if (user_id, key) in rows:
+            return False
+        rows[(user_id, key)] = SimpleNamespace(
+            scope=scope, request_hash=request_hash, status_code=None, response_body=None
+        )
+        return True
+
+    def store(db, *, user_id, key, status_code, body, expires_at):
+        rows[(user_id, key)].status_code = status_code
+        rows[(user_id, key)].response_body = body
+
+    monkeypatch.setattr(idempotency, "claim_idempotency_key", claim)
+    monkeypatch.setattr(idempotency, "get_idempotency_record", lambda db, *, user_id, key: rows.get((user_id, key)))
+    monkeypatch.setattr(idempotency, "store_idempotent_response", store)
+    monkeypatch.setattr(idempotency, "release_idempotency_key", lambda db, *, user_id, key: rows.pop((user_id, key), None))
+    return rows
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    control = TripAdmissionControl(max_active=1, max_queued=0, max_wait_seconds=0.1, cluster_slots=0)
+    monkeypatch.setattr(trip_admission, "trip_admission", control)
+    return control
+
+
+def _book(db, calls):
+    def handler():
+        with admit_booking(db, "trip-1"):
+            calls.append("booked")
+            return {"booking_id": "b-1"}
+
+    return idempotency.run_idempotent(
+        db,
+        key="key-1",
+        user_id="user-1",
+        scope="POST /trips/{trip_id}/bookings",
+        request={"trip_id": "trip-1"},
+        handler=handler,
+        status_code=status.HTTP_201_CREATED,
+    )
+
+
+def test_retry_after_admission_429_is_admitted(keys, gate):
+    db = _Session()
+    calls = []
+
+    # Another request holds the trip's only slot: this one is turned away.
+    with gate.admit(db, "trip-1"):
+        with pytest.raises(HTTPException) as rejected:
+            _book(db, calls)
+    assert rejected.value.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert "Retry-After" in rejected.value.headers
+    assert ("user-1", "key-1") not in keys
+
+    response = _book(db, calls)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert idempotency.REPLAYED_HEADER.lower() not in response.headers
+    assert calls == ["booked"]
+
+    replay = _book(db, calls)
+    assert replay.headers[idempotency.REPLAYED_HEADER] == "true"
+    assert replay.body == response.body
+    assert calls == ["booked"]
+
+
+def test_client_error_is_stored_and_replayed(keys):
+    db = _Session()
+
+    def sold_out():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Not enough seats available")
+
+    def create():
+        return idempotency.run_idempotent(
+            db, key="key-2", user_id="user-1", scope="POST /bookings", request={}, handler=sold_out
+        )
+
+    with pytest.raises(HTTPException):
+        create()
+    replay = create()
+    assert replay.status_code == status.HTTP_409_CONFLICT
+    assert replay.headers[idempotency.REPLAYED_HEADER] == "true"
@@ -0,0 +1,74 @@
+"""
+Per-trip admission gate bookkeeping. Cluster slots are off, so no database
+is needed.
+"""
+import threading
+
+import pytest
+
+from app.services.trip_admission import AdmissionRejected, TripAdmissionControl
+
+
+class _Session:
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class _FailingSession(_Session):
+    def commit(self):
+        raise RuntimeError("connection lost")
+
+
+def _control():
+    return TripAdmissionControl(max_active=1, max_queued=1, max_wait_seconds=0.5, cluster_slots=0)
+
+
+def test_failed_commit_while_queueing_keeps_the_slot():
+    control = _control()
+
+    with control.admit(_Session(), "trip-1"):
+        with pytest.raises(RuntimeError):
+            with control.admit(_FailingSession(), "trip-1"):
+                pass
+        assert control.stats()["trips"] == {"trip-1": {"active": 1, "queued": 0}}
+
+    assert control.stats()["trips"] == {}
+    with control.admit(_Session(), "trip-1"):
+        pass
+
+
+def test_slot_handed_to_a_failed_waiter_is_passed_on():
+    control = _control()
+    holder = control.admit(_Session(), "trip-1")
+    holder.__enter__()
+
+    class _ReleasingSession(_Session):
+        def commit(self):
+            # The holder leaves, handing its slot to this queued request,
+            # before the commit fails.
+            holder.__exit__(None, None, None)
+            raise RuntimeError("connection lost")
+
+    with pytest.raises(RuntimeError):
+        with control.admit(_ReleasingSession(), "trip-1"):
+            pass
+
+    assert control.stats()["trips"] == {}
+    with control.admit(_Session(), "trip-1"):
+        pass
+
+
+def test_queued_request_times_out():
+    control = TripAdmissionControl(max_active=1, max_queued=1, max_wait_seconds=0.05, cluster_slots=0)
+    admitted = threading.Event()
+
+    with control.admit(_Session(), "trip-1"):
+        with pytest.raises(AdmissionRejected) as rejected:
+            with control.admit(_Session(), "trip-1"):
+                admitted.set()
+    assert rejected.value.reason == "timeout"
+    assert not admitted.is_set()
+    assert control.stats()["trips"] == {}